@@ -4,11 +4,15 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_limiter import FastAPILimiter
 
-from app.models.model_loader import load_models
-from app.routers import sentiment, url_fetch
-from app.services.aspect_service import get_nlp_model
+from app.routers import jobs, sentiment, url_fetch
+from app.services.inference_executor import shutdown_inference_executor
+from app.services.parse_pool import shutdown_parse_pool
+from app.services.sentiment_service import get_cascade_stats
+from app.services.startup import get_component_status, start_background_loading
+from app.utils.cache import get_cache_stats
 from app.utils.logging_config import setup_logging
-from app.utils.redis_client import get_redis_client
+from app.utils.redis_client import get_redis_client, redis_breaker
+from app.utils.single_flight import get_single_flight_stats
 
 setup_logging()
 
@@ -19,20 +23,10 @@ async def lifespan(app: FastAPI):
 
     logger = logging.getLogger(__name__)
 
-    # Load models with error handling - don't block startup
-    try:
-        logger.info("Starting model loading...")
-        load_models()
-        logger.info("Models loaded successfully")
-    except Exception as e:
-        logger.error(f"Failed to load models during startup: {e}")
-        logger.warning("App will start but model endpoints may fail until models are loaded")
-
-    # Ensure spaCy model is loaded at startup so readiness is verified early
-    try:
-        get_nlp_model()
-    except Exception as e:
-        logger.warning(f"Failed to load spaCy model: {e}")
+    # Load and warm up models in the background - don't block startup. Endpoints
+    # answer 503 until the components they need are loaded; see /readiness.
+    logger.info("Starting background model loading...")
+    start_background_loading()
 
     # Initialize Redis and rate limiter with graceful fallback
     try:
@@ -49,6 +43,8 @@ async def lifespan(app: FastAPI):
         await FastAPILimiter.close()
     except Exception:
         pass
+    shutdown_inference_executor()
+    shutdown_parse_pool()
 
 
 app = FastAPI(
@@ -68,6 +64,7 @@ app.add_middleware(
 
 app.include_router(sentiment.router, prefix="/api", tags=["sentiment"])
 app.include_router(url_fetch.router, prefix="/api", tags=["url"])
+app.include_router(jobs.router, prefix="/api", tags=["jobs"])
 
 
 @app.get("/health")
@@ -78,10 +75,27 @@ async def health_check():
 
 @app.get("/readiness")
 async def readiness_check():
-    """Readiness check - verifies models and dependencies are loaded."""
-    from app.models.model_loader import _emotion_model, _sentiment_model
-
-    if _sentiment_model is None or _emotion_model is None:
-        return {"status": "not_ready", "reason": "models_loading"}
-
-    return {"status": "ready"}
+    """Readiness check - reports per-component load state and timings."""
+    components = get_component_status()
+    # Redis is optional: with the breaker open the API serves from the local cache
+    redis_status = redis_breaker.status()
+
+    if any(c["state"] != "ready" for c in components.values()):
+        return {
+            "status": "not_ready",
+            "reason": "models_loading",
+            "components": components,
+            "redis": redis_status,
+        }
+
+    return {"status": "ready", "components": components, "redis": redis_status}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Per-worker counters, such as hits and misses for each cache tier."""
+    return {
+        "cache": get_cache_stats(),
+        "single_flight": get_single_flight_stats(),
+        "sentiment_cascade": get_cascade_stats(),
+    }
@@ -1,5 +1,7 @@
 import logging
+import os
 
+import torch
 from transformers import AutoModelForSequenceClassification, AutoTokenizer
 
 logger = logging.getLogger(__name__)
@@ -7,41 +9,123 @@ logger = logging.getLogger(__name__)
 SENTIMENT_MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment-latest"
 EMOTION_MODEL_NAME = "j-hartmann/emotion-english-distilroberta-base"
 
+# Set to "int8" to load models with dynamically quantized Linear layers
+MODEL_QUANTIZATION = os.getenv("MODEL_QUANTIZATION", "none").lower()
+SUPPORTED_QUANTIZATION = ("none", "int8")
+
+# "torch" (default) or "onnx"; each model can override it individually
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch").lower()
+SENTIMENT_INFERENCE_BACKEND = os.getenv("SENTIMENT_INFERENCE_BACKEND", INFERENCE_BACKEND).lower()
+EMOTION_INFERENCE_BACKEND = os.getenv("EMOTION_INFERENCE_BACKEND", INFERENCE_BACKEND).lower()
+
 _sentiment_tokenizer: AutoTokenizer | None = None
 _sentiment_model: AutoModelForSequenceClassification | None = None
 _emotion_tokenizer: AutoTokenizer | None = None
 _emotion_model: AutoModelForSequenceClassification | None = None
 
 
+class ModelNotReadyError(RuntimeError):
+    """Raised when a model is requested before it has finished loading."""
+
+
 def load_models() -> None:
     """Load both sentiment and emotion models globally."""
+    load_sentiment_model()
+    load_emotion_model()
+
+
+def preload_shared_models() -> None:
+    """Load models in the gunicorn master so forked workers share their weights.
+
+    Only PyTorch-backed models are preloaded: ONNX Runtime sessions start thread
+    pools that do not survive fork(), so ONNX-backed models are left for each
+    worker to load.
+    """
+    if SENTIMENT_INFERENCE_BACKEND == "torch":
+        load_sentiment_model()
+    if EMOTION_INFERENCE_BACKEND == "torch":
+        load_emotion_model()
+
+    for model in (_sentiment_model, _emotion_model):
+        if isinstance(model, torch.nn.Module):
+            # Weights are never written after load; make that explicit so
+            # nothing (e.g. autograd bookkeeping) touches the shared pages
+            model.requires_grad_(False)
+
+
+def load_sentiment_model() -> None:
+    """Load the sentiment tokenizer and model if not loaded yet."""
     global _sentiment_tokenizer, _sentiment_model
-    global _emotion_tokenizer, _emotion_model
 
     if _sentiment_tokenizer is None or _sentiment_model is None:
         logger.info(f"Loading sentiment model: {SENTIMENT_MODEL_NAME}")
-        _sentiment_tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL_NAME)
-        _sentiment_model = AutoModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL_NAME)
-        _sentiment_model.eval()
+        _sentiment_tokenizer, _sentiment_model = load_classifier(
+            SENTIMENT_MODEL_NAME, backend=SENTIMENT_INFERENCE_BACKEND
+        )
         logger.info("Sentiment model loaded successfully")
 
+
+def load_emotion_model() -> None:
+    """Load the emotion tokenizer and model if not loaded yet."""
+    global _emotion_tokenizer, _emotion_model
+
     if _emotion_tokenizer is None or _emotion_model is None:
         logger.info(f"Loading emotion model: {EMOTION_MODEL_NAME}")
-        _emotion_tokenizer = AutoTokenizer.from_pretrained(EMOTION_MODEL_NAME)
-        _emotion_model = AutoModelForSequenceClassification.from_pretrained(EMOTION_MODEL_NAME)
-        _emotion_model.eval()
+        _emotion_tokenizer, _emotion_model = load_classifier(
+            EMOTION_MODEL_NAME, backend=EMOTION_INFERENCE_BACKEND
+        )
         logger.info("Emotion model loaded successfully")
 
 
+def load_classifier(
+    model_name: str, quantization: str = MODEL_QUANTIZATION, backend: str = "torch"
+) -> tuple[AutoTokenizer, AutoModelForSequenceClassification]:
+    """Load a tokenizer and sequence-classification model ready for inference.
+
+    With ``backend="onnx"`` the model is served through ONNX Runtime, falling
+    back to PyTorch if onnxruntime is missing or the export fails.
+    """
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+
+    if quantization not in SUPPORTED_QUANTIZATION:
+        logger.warning(f"Unknown MODEL_QUANTIZATION '{quantization}', loading {model_name} in fp32")
+        quantization = "none"
+
+    if backend == "onnx":
+        try:
+            from app.models.onnx_backend import load_onnx_classifier
+
+            return tokenizer, load_onnx_classifier(model, model_name, quantization)
+        except Exception as e:
+            logger.warning(f"ONNX backend unavailable for {model_name}, using PyTorch: {e}")
+    elif backend != "torch":
+        logger.warning(f"Unknown inference backend '{backend}' for {model_name}, using PyTorch")
+
+    if quantization == "int8":
+        logger.info(f"Applying dynamic INT8 quantization to {model_name}")
+        model = quantize_int8(model)
+
+    return tokenizer, model
+
+
+def quantize_int8(
+    model: AutoModelForSequenceClassification,
+) -> AutoModelForSequenceClassification:
+    """Replace Linear layers with dynamically quantized INT8 equivalents."""
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
 def get_sentiment_model() -> tuple[AutoTokenizer, AutoModelForSequenceClassification]:
     """Get the loaded sentiment tokenizer and model."""
     if _sentiment_tokenizer is None or _sentiment_model is None:
-        raise RuntimeError("Sentiment model not loaded. Call load_models() first.")
+        raise ModelNotReadyError("Sentiment model not loaded. Call load_models() first.")
     return _sentiment_tokenizer, _sentiment_model
 
 
 def get_emotion_model() -> tuple[AutoTokenizer, AutoModelForSequenceClassification]:
     """Get the loaded emotion tokenizer and model."""
     if _emotion_tokenizer is None or _emotion_model is None:
-        raise RuntimeError("Emotion model not loaded. Call load_models() first.")
+        raise ModelNotReadyError("Emotion model not loaded. Call load_models() first.")
     return _emotion_tokenizer, _emotion_model
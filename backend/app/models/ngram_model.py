@@ -0,0 +1,141 @@
+"""Linear classifier over hashed word n-grams, the cheap first stage of the cascade.
+
+The model is distilled from the transformer: it is trained on the transformer's
+own probabilities for our traffic (see ``app.tools.cascade``), and answers on
+its own only when it is confident. Features are word unigrams and bigrams
+hashed with CRC32, which is stable across processes, into a fixed-size space.
+Prediction is a sparse dot product in NumPy and costs microseconds per text.
+"""
+
+import logging
+import os
+import re
+import zlib
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Path to a model saved by ``python -m app.tools.cascade train``; unset disables the cascade
+SENTIMENT_CASCADE_MODEL = os.getenv("SENTIMENT_CASCADE_MODEL", "")
+SENTIMENT_CASCADE_THRESHOLD = float(os.getenv("SENTIMENT_CASCADE_THRESHOLD", "0.9"))
+
+DEFAULT_FEATURES = 2**18
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+class HashedNgramModel:
+    """Multinomial logistic regression over hashed unigram and bigram counts."""
+
+    def __init__(
+        self,
+        labels: tuple[str, ...],
+        n_features: int = DEFAULT_FEATURES,
+        weights: np.ndarray | None = None,
+        bias: np.ndarray | None = None,
+    ):
+        self.labels = tuple(labels)
+        self.n_features = n_features
+        self.weights = (
+            weights
+            if weights is not None
+            else np.zeros((n_features, len(self.labels)), dtype=np.float32)
+        )
+        self.bias = bias if bias is not None else np.zeros(len(self.labels), dtype=np.float32)
+
+    def features(self, text: str) -> tuple[np.ndarray, np.ndarray]:
+        """Hashed feature indices and their L2-normalized counts."""
+        tokens = _TOKEN_RE.findall(text.lower())
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        if not grams:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        hashed = [zlib.crc32(gram.encode()) % self.n_features for gram in grams]
+        indices, counts = np.unique(np.array(hashed, dtype=np.int64), return_counts=True)
+        values = counts.astype(np.float32)
+        return indices, values / np.linalg.norm(values)
+
+    def _logits(self, indices: np.ndarray, values: np.ndarray) -> np.ndarray:
+        return values @ self.weights[indices] + self.bias
+
+    def predict_proba(self, texts: list[str]) -> np.ndarray:
+        """Probability rows in ``self.labels`` order, one per text."""
+        logits = np.array(
+            [self._logits(*self.features(text)) for text in texts], dtype=np.float32
+        ).reshape(len(texts), len(self.labels))
+        return _softmax(logits)
+
+    def fit(
+        self,
+        texts: list[str],
+        targets: np.ndarray,
+        epochs: int = 10,
+        learning_rate: float = 0.5,
+        batch_size: int = 32,
+        seed: int = 0,
+    ) -> "HashedNgramModel":
+        """Train with mini-batch SGD on soft targets (rows of teacher probabilities)."""
+        features = [self.features(text) for text in texts]
+        targets = np.asarray(targets, dtype=np.float32)
+        rng = np.random.default_rng(seed)
+
+        for _ in range(epochs):
+            order = rng.permutation(len(texts))
+            for start in range(0, len(order), batch_size):
+                batch = order[start : start + batch_size]
+                logits = np.array([self._logits(*features[i]) for i in batch])
+                # Gradient of the cross-entropy w.r.t. the logits
+                grad = (_softmax(logits) - targets[batch]) / len(batch)
+                for row, i in enumerate(batch):
+                    indices, values = features[i]
+                    self.weights[indices] -= learning_rate * np.outer(values, grad[row])
+                self.bias -= learning_rate * grad.sum(axis=0)
+        return self
+
+    def save(self, path: str) -> None:
+        # Store only the non-zero rows; most hash buckets are never used
+        rows = np.flatnonzero(np.any(self.weights != 0, axis=1))
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                labels=np.array(self.labels),
+                n_features=self.n_features,
+                rows=rows,
+                weights=self.weights[rows],
+                bias=self.bias,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "HashedNgramModel":
+        with np.load(path) as data:
+            n_features = int(data["n_features"])
+            labels = tuple(str(label) for label in data["labels"])
+            weights = np.zeros((n_features, len(labels)), dtype=np.float32)
+            weights[data["rows"]] = data["weights"]
+            return cls(labels, n_features, weights, data["bias"].astype(np.float32))
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+
+_sentiment_cascade: HashedNgramModel | None = None
+_sentiment_cascade_loaded = False
+
+
+def get_sentiment_cascade() -> HashedNgramModel | None:
+    """The first-stage sentiment model, or None when the cascade is disabled."""
+    global _sentiment_cascade, _sentiment_cascade_loaded
+    if not _sentiment_cascade_loaded:
+        _sentiment_cascade_loaded = True
+        if SENTIMENT_CASCADE_MODEL:
+            try:
+                _sentiment_cascade = HashedNgramModel.load(SENTIMENT_CASCADE_MODEL)
+                logger.info(
+                    f"Sentiment cascade enabled with {SENTIMENT_CASCADE_MODEL} "
+                    f"(threshold {SENTIMENT_CASCADE_THRESHOLD})"
+                )
+            except Exception as e:
+                logger.warning(f"Failed to load sentiment cascade model, disabling it: {e}")
+    return _sentiment_cascade
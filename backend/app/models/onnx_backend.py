@@ -0,0 +1,143 @@
+"""ONNX Runtime inference backend for the sequence-classification models."""
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+ONNX_CACHE_DIR = Path(os.getenv("ONNX_CACHE_DIR", Path.home() / ".cache" / "bert-proj" / "onnx"))
+ONNX_OPSET = 14
+
+
+class _LogitsOnly(torch.nn.Module):
+    """Export wrapper that returns bare logits instead of a ModelOutput."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+
+
+class OnnxSequenceClassifier:
+    """ONNX Runtime session that behaves like a Hugging Face sequence classifier.
+
+    It keeps the original ``config`` (and so ``id2label``) and returns an object
+    with ``logits``, so services and batching code use it unchanged.
+    """
+
+    def __init__(self, session, config):
+        self.session = session
+        self.config = config
+
+    def __call__(self, input_ids, attention_mask, **_) -> SimpleNamespace:
+        # token_type_ids are all zeros for single-sequence classification
+        logits = self.session.run(
+            ["logits"],
+            {"input_ids": input_ids.numpy(), "attention_mask": attention_mask.numpy()},
+        )[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+    def eval(self) -> "OnnxSequenceClassifier":
+        return self
+
+
+def _model_revision(model) -> str:
+    """The Hub commit the weights came from, else a hash of the weights themselves."""
+    commit_hash = getattr(model.config, "_commit_hash", None)
+    if commit_hash:
+        return commit_hash
+    digest = hashlib.sha256()
+    for name, tensor in model.state_dict().items():
+        digest.update(name.encode())
+        digest.update(tensor.detach().cpu().numpy().tobytes())
+    return f"weights-{digest.hexdigest()[:16]}"
+
+
+def _model_dir(model, model_name: str) -> Path:
+    # A new model revision or opset gets a fresh export instead of a stale graph
+    revision = f"{_model_revision(model)}-opset{ONNX_OPSET}"
+    return ONNX_CACHE_DIR / model_name.replace("/", "--") / revision
+
+
+def export_onnx(model, model_name: str) -> Path:
+    """Export a model to ONNX once and return the cached graph path.
+
+    Exports are cached per model revision and opset.
+    """
+    path = _model_dir(model, model_name) / "model.onnx"
+    if path.exists():
+        return path
+
+    logger.info(f"Exporting {model_name} to ONNX at {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    dummy = torch.ones((1, 8), dtype=torch.long)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with torch.no_grad():
+        # export() restores the wrapper's train/eval mode afterwards, which must stay eval
+        torch.onnx.export(
+            _LogitsOnly(model).eval(),
+            (dummy, dummy),
+            str(tmp_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+            },
+            opset_version=ONNX_OPSET,
+        )
+    # Rename last so concurrent workers never load a half-written graph
+    os.replace(tmp_path, path)
+    return path
+
+
+def _quantize_onnx(path: Path) -> Path:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantized = path.with_name("model.int8.onnx")
+    if not quantized.exists():
+        logger.info(f"Quantizing ONNX graph {path} to INT8")
+        tmp_path = quantized.with_suffix(f".{os.getpid()}.tmp")
+        quantize_dynamic(str(path), str(tmp_path), weight_type=QuantType.QInt8)
+        os.replace(tmp_path, quantized)
+    return quantized
+
+
+def load_onnx_classifier(model, model_name: str, quantization: str = "none"):
+    """Build an ONNX Runtime classifier from a loaded PyTorch model.
+
+    The exported graph and its optimized form are cached under ``ONNX_CACHE_DIR``
+    so only the first start pays for export and graph optimization; a new model
+    revision, opset or ONNX Runtime version is exported or optimized again.
+    """
+    import onnxruntime as ort
+
+    path = export_onnx(model, model_name)
+    if quantization == "int8":
+        path = _quantize_onnx(path)
+
+    # Optimized graphs are specific to the ONNX Runtime version that wrote them
+    optimized = path.with_name(f"{path.stem}.optimized.ort-{ort.__version__}.onnx")
+    options = ort.SessionOptions()
+    save_to = None
+    if optimized.exists():
+        path = optimized
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+    else:
+        save_to = optimized.with_suffix(f".{os.getpid()}.tmp")
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.optimized_model_filepath = str(save_to)
+
+    session = ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+    if save_to is not None and save_to.exists():
+        os.replace(save_to, optimized)
+    logger.info(f"ONNX Runtime session ready for {model_name} ({path.name})")
+    return OnnxSequenceClassifier(session, model.config)
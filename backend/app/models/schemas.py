@@ -1,5 +1,10 @@
+from typing import Annotated, Any
+
 from pydantic import BaseModel, Field, field_validator
 
+from app.services.job_service import JOB_MAX_TEXTS
+from app.services.stream_service import MAX_TEXT_LENGTH
+
 
 class SentimentRequest(BaseModel):
     text: str = Field(..., min_length=1, max_length=10000)
@@ -51,8 +56,96 @@ class EmotionResponse(BaseModel):
     )
 
 
+class SentimentWindow(BaseModel):
+    start: int = Field(..., description="Character offset where the window starts")
+    end: int = Field(..., description="Character offset just past the window")
+    tokens: int = Field(..., description="Text tokens in the window; its weight in the total")
+    sentiment: str
+    scores: dict[str, float]
+    confidence: float
+    probabilities: dict[str, float]
+
+
+class EmotionWindow(BaseModel):
+    start: int = Field(..., description="Character offset where the window starts")
+    end: int = Field(..., description="Character offset just past the window")
+    tokens: int = Field(..., description="Text tokens in the window; its weight in the total")
+    emotion: str
+    probabilities: dict[str, float]
+
+
+class LongSentimentResult(SentimentResponse):
+    windows: list[SentimentWindow]
+
+
+class LongEmotionResult(EmotionResponse):
+    windows: list[EmotionWindow]
+
+
+class LongDocumentResponse(BaseModel):
+    sentiment: LongSentimentResult
+    emotion: LongEmotionResult
+    total_windows: int
+
+
+class DocumentSentence(BaseModel):
+    index: int
+    text: str
+    start: int
+    end: int
+    sentiment: str
+    scores: dict[str, float]
+    emotion: str
+    probabilities: dict[str, float]
+    risk_flags: list[str]
+
+
+class IncrementalAnalysisResponse(BaseModel):
+    text: str
+    sentiment: SentimentResponse
+    emotion: EmotionResponse
+    risk_analysis: RiskAnalysis
+    sentences: list[DocumentSentence]
+    total_sentences: int
+    sentences_recomputed: int = Field(
+        ..., description="Sentences run through the models because they were not cached"
+    )
+    sentences_reused: int = Field(..., description="Sentences answered from the cache")
+
+
+class ArcRequest(BaseModel):
+    text: str = Field(..., min_length=1, max_length=10000)
+    include_sentiment: bool = Field(False, description="Also score each sentence's sentiment")
+
+    @field_validator("text")
+    @classmethod
+    def validate_text(cls, v: str) -> str:
+        if not v.strip():
+            raise ValueError("Text cannot be empty or whitespace only")
+        return v.strip()
+
+
+class ArcSentence(BaseModel):
+    index: int
+    text: str
+    start: int = Field(..., description="Character offset of the sentence in the text")
+    end: int = Field(..., description="Character offset just past the sentence")
+    emotion: str
+    probabilities: dict[str, float]
+    intensity: float = Field(..., description="Probability of the sentence's dominant emotion")
+    sentiment: str | None = None
+    sentiment_scores: dict[str, float] | None = None
+
+
+class EmotionalArcResponse(BaseModel):
+    text: str
+    sentences: list[ArcSentence]
+    total_sentences: int
+
+
 class BulkAnalysisRequest(BaseModel):
     texts: list[str] = Field(..., min_items=1, max_items=100)
+    include_risk: bool = Field(False, description="Also run risk detection on every text")
 
     @field_validator("texts")
     @classmethod
@@ -68,6 +161,9 @@ class BulkAnalysisItem(BaseModel):
     scores: dict[str, float]
     emotion: str
     probabilities: dict[str, float]
+    risk_analysis: RiskAnalysis | None = Field(
+        None, description="Risk analysis results (with include_risk)"
+    )
 
 
 class BulkAnalysisResponse(BaseModel):
@@ -75,6 +171,55 @@ class BulkAnalysisResponse(BaseModel):
     total: int
     successful: int
     failed: int
+    flag_counts: dict[str, int] | None = Field(
+        None, description="Number of analyzed texts raising each risk flag (with include_risk)"
+    )
+
+
+class JobRequest(BaseModel):
+    texts: list[Annotated[str, Field(max_length=MAX_TEXT_LENGTH)]] = Field(
+        ..., min_length=1, max_length=JOB_MAX_TEXTS
+    )
+    include_risk: bool = Field(False, description="Also run risk detection on every text")
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str = Field(..., description="queued, running, completed or failed")
+    total: int
+    processed: int = Field(..., description="Texts analyzed so far")
+    errors: int = Field(..., description="Texts that could not be analyzed")
+    chunks: int
+    chunks_completed: int
+    chunks_failed: int = Field(..., description="Chunks that ran out of attempts")
+    progress: float
+    include_risk: bool
+    created_at: float
+    updated_at: float
+    last_error: str | None = None
+
+
+class JobResultItem(BaseModel):
+    index: int
+    id: Any = None
+    sentiment: str | None = None
+    scores: dict[str, float] | None = None
+    emotion: str | None = None
+    probabilities: dict[str, float] | None = None
+    risk_analysis: RiskAnalysis | None = None
+    error: str | None = None
+
+
+class JobResultsResponse(BaseModel):
+    job_id: str
+    status: str
+    offset: int
+    limit: int
+    total: int
+    results: list[JobResultItem] = Field(
+        ..., description="Results in the page whose chunks have completed, by index"
+    )
+    next_offset: int | None = None
 
 
 class AspectSentiment(BaseModel):
@@ -99,3 +244,10 @@ class AspectAnalysisResponse(BaseModel):
     aspects: list[AspectSentiment]
     overall_sentiment: OverallSentiment
     total_aspects: int
+
+
+class BulkAspectAnalysisResponse(BaseModel):
+    results: list[AspectAnalysisResponse]
+    total: int
+    successful: int
+    failed: int
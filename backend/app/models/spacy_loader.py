@@ -0,0 +1,51 @@
+"""Load the spaCy pipeline used for aspect extraction.
+
+Kept free of torch and transformers imports so parse worker processes can
+load spaCy without pulling in the sentiment models.
+"""
+
+import logging
+
+import spacy
+
+logger = logging.getLogger(__name__)
+
+# Components not used by aspect extraction. The attribute ruler stays: it maps
+# tagger output to the coarse POS tags that noun detection and noun_chunks need
+SPACY_DISABLED_COMPONENTS = ["lemmatizer"]
+
+
+def load_spacy_model() -> spacy.Language:
+    """Load en_core_web_sm, downloading it if needed, or fall back to a blank pipeline."""
+    try:
+        logger.info("Loading spaCy model...")
+        nlp = spacy.load("en_core_web_sm", disable=SPACY_DISABLED_COMPONENTS)
+        logger.info("spaCy model loaded successfully")
+    except OSError as e:
+        logger.warning(f"spaCy model not found: {e}, trying to download...")
+        try:
+            import subprocess
+            import sys
+
+            result = subprocess.run(
+                [sys.executable, "-m", "spacy", "download", "en_core_web_sm"],
+                capture_output=True,
+                text=True,
+                timeout=300,
+            )
+            if result.returncode == 0:
+                nlp = spacy.load("en_core_web_sm", disable=SPACY_DISABLED_COMPONENTS)
+                logger.info("spaCy model downloaded and loaded")
+            else:
+                raise Exception(f"Download failed: {result.stderr}")
+        except Exception as download_error:
+            logger.error(f"Failed to download spaCy model: {download_error}")
+            logger.info("Falling back to basic English model with minimal components...")
+            try:
+                nlp = spacy.blank("en")
+                nlp.add_pipe("sentencizer")
+                logger.info("Using basic spaCy model")
+            except Exception as fallback_error:
+                logger.error(f"Failed to create fallback model: {fallback_error}")
+                raise
+    return nlp
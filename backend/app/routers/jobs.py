@@ -0,0 +1,135 @@
+"""Asynchronous batch job router.
+
+Jobs are analyzed by ``app.services.job_worker`` processes, not by the API
+workers; these endpoints only queue jobs and report on them.
+"""
+
+import json
+import logging
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+
+from app.models.schemas import JobRequest, JobResultsResponse, JobStatusResponse
+from app.routers.sentiment import _rate_limit_5_60, _unavailable
+from app.services.job_service import JobInputError, JobNotFoundError, get_job_queue
+from app.services.stream_service import parse_csv, parse_ndjson, read_lines
+from app.utils.redis_client import RedisUnavailableError
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+UPLOAD_READ_SIZE = 64 * 1024
+
+
+def _job_error(e: Exception) -> HTTPException:
+    if isinstance(e, JobNotFoundError):
+        return HTTPException(status_code=404, detail=str(e))
+    if isinstance(e, JobInputError):
+        return HTTPException(status_code=400, detail=str(e))
+    if isinstance(e, RedisUnavailableError):
+        return _unavailable(e)
+    logger.error(f"Error in job request: {e}", exc_info=True)
+    return HTTPException(status_code=500, detail=f"Error in job request: {str(e)}")
+
+
+@router.post("/jobs", response_model=JobStatusResponse, status_code=202)
+async def create_job(
+    request: JobRequest,
+    rate_limiter: None = Depends(_rate_limit_5_60),
+):
+    async def items():
+        for index, text in enumerate(request.texts):
+            yield index, None, text
+
+    try:
+        queue = get_job_queue()
+        job_id = await queue.create_job(items(), include_risk=request.include_risk)
+        return await queue.get_status(job_id)
+    except Exception as e:
+        raise _job_error(e)
+
+
+@router.post("/jobs/upload", response_model=JobStatusResponse, status_code=202)
+async def upload_job(
+    file: UploadFile = File(..., description="NDJSON, or CSV with a header row"),
+    include_risk: bool = Query(False),
+    rate_limiter: None = Depends(_rate_limit_5_60),
+):
+    """Queue a job from an NDJSON or CSV file, in the streaming bulk endpoint's format."""
+    is_csv = "csv" in (file.content_type or "") or (file.filename or "").endswith(".csv")
+    parse = parse_csv if is_csv else parse_ndjson
+
+    async def chunks():
+        while chunk := await file.read(UPLOAD_READ_SIZE):
+            yield chunk
+
+    try:
+        queue = get_job_queue()
+        job_id = await queue.create_job(parse(read_lines(chunks())), include_risk=include_risk)
+        return await queue.get_status(job_id)
+    except Exception as e:
+        raise _job_error(e)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    try:
+        return await get_job_queue().get_status(job_id)
+    except Exception as e:
+        raise _job_error(e)
+
+
+@router.get("/jobs/{job_id}/results", response_model=JobResultsResponse)
+async def get_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    try:
+        queue = get_job_queue()
+        status = await queue.get_status(job_id)
+        results = await queue.get_results(job_id, offset, limit)
+    except Exception as e:
+        raise _job_error(e)
+
+    return JobResultsResponse(
+        job_id=job_id,
+        status=status["status"],
+        offset=offset,
+        limit=limit,
+        total=status["total"],
+        results=results,
+        next_offset=offset + limit if offset + limit < status["total"] else None,
+    )
+
+
+@router.get("/jobs/{job_id}/results/stream")
+async def stream_job_results(job_id: str):
+    """All completed results as NDJSON, ordered by index."""
+    queue = get_job_queue()
+    try:
+        await queue.get_meta(job_id)
+    except Exception as e:
+        raise _job_error(e)
+
+    async def results():
+        async for record in queue.iter_results(job_id):
+            yield json.dumps(record) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@router.post("/jobs/{job_id}/retry", response_model=JobStatusResponse)
+async def retry_job(
+    job_id: str,
+    rate_limiter: None = Depends(_rate_limit_5_60),
+):
+    """Queue the chunks that ran out of attempts for another round of attempts."""
+    try:
+        queue = get_job_queue()
+        await queue.retry_failed(job_id)
+        return await queue.get_status(job_id)
+    except Exception as e:
+        raise _job_error(e)
@@ -1,22 +1,39 @@
+import asyncio
+import json
 import logging
+from collections import Counter
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi_limiter.depends import RateLimiter
 
+from app.models.model_loader import ModelNotReadyError
 from app.models.schemas import (
+    ArcRequest,
     AspectAnalysisResponse,
     BulkAnalysisItem,
     BulkAnalysisRequest,
     BulkAnalysisResponse,
+    BulkAspectAnalysisResponse,
+    EmotionalArcResponse,
     EmotionRequest,
     EmotionResponse,
+    IncrementalAnalysisResponse,
+    LongDocumentResponse,
     SentimentRequest,
     SentimentResponse,
 )
+from app.services.analysis_pipeline import get_analysis_pipeline
+from app.services.arc_service import get_arc_service
 from app.services.aspect_service import get_aspect_service
 from app.services.emotion_service import get_emotion_service
+from app.services.incremental_service import get_incremental_service
+from app.services.inference_executor import InferenceQueueFullError
 from app.services.risk_service import get_risk_service
 from app.services.sentiment_service import get_sentiment_service
+from app.services.stream_service import StreamAnalyzer, parse_csv, parse_ndjson, read_lines
+from app.utils.redis_client import RedisUnavailableError, call_redis
+from app.utils.streaming import BodyStreamingResponse
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +54,11 @@ async def _maybe_rate_limit(
         # If RateLimiter internals aren't available, skip limiting
         return
     limiter = RateLimiter(times=times, seconds=seconds)
-    await limiter(request, response)
+    try:
+        await call_redis(lambda: limiter(request, response))
+    except RedisUnavailableError:
+        # Fail open: an unreachable Redis should not take the API down with it
+        return
 
 
 async def _rate_limit_10_60(request: Request, response: Response):
@@ -48,32 +69,30 @@ async def _rate_limit_5_60(request: Request, response: Response):
     await _maybe_rate_limit(request, response, times=5, seconds=60)
 
 
+def _unavailable(e: Exception) -> HTTPException:
+    """Answer 503 quickly while models are loading or the inference queue is full."""
+    logger.warning(f"Rejecting request: {e}")
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
 @router.post("/analysis/sentiment", response_model=SentimentResponse)
 async def analyze_sentiment(
     request: SentimentRequest,
     rate_limiter: None = Depends(_rate_limit_10_60),
 ):
     try:
-        sentiment_service = get_sentiment_service()
-        emotion_service = get_emotion_service()
-        risk_service = get_risk_service()
-
-        # Get sentiment and emotion from BERT models
-        sentiment_result = await sentiment_service.analyze(request.text)
-        emotion_result = await emotion_service.analyze(request.text)
-
-        # Perform risk analysis using BERT outputs + pattern matching
-        risk_analysis = risk_service.detect_risks(
-            request.text,
-            sentiment_result["sentiment"],
-            emotion_result["emotion"],
-            sentiment_result.get("scores", {}),
-        )
+        # Sentiment and emotion from BERT models in parallel, then risk analysis
+        # using BERT outputs + pattern matching
+        result = await get_analysis_pipeline().analyze(request.text)
+        sentiment_result = result["sentiment"]
+        risk_analysis = result["risk_analysis"]
 
         logger.info(f"Risk analysis for text '{request.text[:50]}...': {risk_analysis}")
         response = SentimentResponse(**sentiment_result, risk_analysis=risk_analysis)
         logger.info(f"Response includes risk_analysis: {response.risk_analysis is not None}")
         return response
+    except (InferenceQueueFullError, ModelNotReadyError) as e:
+        raise _unavailable(e)
     except Exception as e:
         logger.error(f"Error analyzing sentiment: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error analyzing sentiment: {str(e)}")
@@ -88,11 +107,68 @@ async def analyze_emotion(
         service = get_emotion_service()
         result = await service.analyze(request.text)
         return EmotionResponse(**result)
+    except (InferenceQueueFullError, ModelNotReadyError) as e:
+        raise _unavailable(e)
     except Exception as e:
         logger.error(f"Error analyzing emotion: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error analyzing emotion: {str(e)}")
 
 
+@router.post("/analysis/arc", response_model=EmotionalArcResponse)
+async def analyze_arc(
+    request: ArcRequest,
+    rate_limiter: None = Depends(_rate_limit_10_60),
+):
+    try:
+        service = get_arc_service()
+        result = await service.analyze_arc(request.text, request.include_sentiment)
+        return EmotionalArcResponse(**result)
+    except (InferenceQueueFullError, ModelNotReadyError) as e:
+        raise _unavailable(e)
+    except Exception as e:
+        logger.error(f"Error analyzing emotional arc: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error analyzing emotional arc: {str(e)}")
+
+
+@router.post("/analysis/incremental", response_model=IncrementalAnalysisResponse)
+async def analyze_incremental(
+    request: SentimentRequest,
+    rate_limiter: None = Depends(_rate_limit_10_60),
+):
+    """Analyze a document sentence by sentence, reusing cached sentences from earlier edits."""
+    try:
+        result = await get_incremental_service().analyze_document(request.text)
+        return IncrementalAnalysisResponse(**result)
+    except (InferenceQueueFullError, ModelNotReadyError) as e:
+        raise _unavailable(e)
+    except Exception as e:
+        logger.error(f"Error in incremental analysis: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error in incremental analysis: {str(e)}")
+
+
+@router.post("/analysis/long", response_model=LongDocumentResponse)
+async def analyze_long_document(
+    request: SentimentRequest,
+    rate_limiter: None = Depends(_rate_limit_5_60),
+):
+    """Sentiment and emotion of a whole long text, scored over overlapping token windows."""
+    try:
+        sentiment_result, emotion_result = await asyncio.gather(
+            get_sentiment_service().analyze_long(request.text),
+            get_emotion_service().analyze_long(request.text),
+        )
+        return LongDocumentResponse(
+            sentiment=sentiment_result,
+            emotion=emotion_result,
+            total_windows=len(sentiment_result["windows"]),
+        )
+    except (InferenceQueueFullError, ModelNotReadyError) as e:
+        raise _unavailable(e)
+    except Exception as e:
+        logger.error(f"Error in long-document analysis: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error in long-document analysis: {str(e)}")
+
+
 @router.post("/analysis/bulk", response_model=BulkAnalysisResponse)
 async def analyze_bulk(
     request: BulkAnalysisRequest,
@@ -102,41 +178,106 @@ async def analyze_bulk(
         sentiment_service = get_sentiment_service()
         emotion_service = get_emotion_service()
 
-        results = []
-        successful = 0
+        sentiment_results = await sentiment_service.analyze_batch(request.texts)
+        emotion_results = await emotion_service.analyze_batch(request.texts)
+
+        analyzed = []
         failed = 0
 
-        for text in request.texts:
-            try:
-                sentiment_result = await sentiment_service.analyze(text)
-                emotion_result = await emotion_service.analyze(text)
-
-                results.append(
-                    BulkAnalysisItem(
-                        text=text,
-                        sentiment=sentiment_result["sentiment"],
-                        scores=sentiment_result["scores"],
-                        emotion=emotion_result["emotion"],
-                        probabilities=emotion_result["probabilities"],
-                    )
-                )
-                successful += 1
-            except Exception as e:
-                logger.warning(f"Failed to analyze text: {text[:50]}... Error: {e}")
+        for text, sentiment_result, emotion_result in zip(
+            request.texts, sentiment_results, emotion_results, strict=True
+        ):
+            error = next(
+                (r for r in (sentiment_result, emotion_result) if isinstance(r, Exception)),
+                None,
+            )
+            if error is not None:
+                logger.warning(f"Failed to analyze text: {text[:50]}... Error: {error}")
                 failed += 1
                 continue
+            analyzed.append((text, sentiment_result, emotion_result))
+
+        risk_results = [None] * len(analyzed)
+        flag_counts = None
+        if request.include_risk:
+            # Pattern scanning is CPU-bound; keep it off the event loop
+            risk_results = await asyncio.to_thread(
+                get_risk_service().detect_risks_batch,
+                [text for text, _, _ in analyzed],
+                [sentiment["sentiment"] for _, sentiment, _ in analyzed],
+                [emotion["emotion"] for _, _, emotion in analyzed],
+                [sentiment.get("scores", {}) for _, sentiment, _ in analyzed],
+            )
+            flag_counts = dict(Counter(flag for risk in risk_results for flag in risk["flags"]))
+
+        results = [
+            BulkAnalysisItem(
+                text=text,
+                sentiment=sentiment_result["sentiment"],
+                scores=sentiment_result["scores"],
+                emotion=emotion_result["emotion"],
+                probabilities=emotion_result["probabilities"],
+                risk_analysis=risk_analysis,
+            )
+            for (text, sentiment_result, emotion_result), risk_analysis in zip(
+                analyzed, risk_results, strict=True
+            )
+        ]
 
         return BulkAnalysisResponse(
             results=results,
             total=len(request.texts),
-            successful=successful,
+            successful=len(results),
             failed=failed,
+            flag_counts=flag_counts,
         )
+    except (InferenceQueueFullError, ModelNotReadyError) as e:
+        raise _unavailable(e)
     except Exception as e:
         logger.error(f"Error in bulk analysis: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error in bulk analysis: {str(e)}")
 
 
+@router.post("/analysis/bulk/stream")
+async def analyze_bulk_stream(
+    request: Request,
+    order: Literal["input", "completion"] = Query("input"),
+    include_risk: bool = Query(False),
+    rate_limiter: None = Depends(_rate_limit_5_60),
+):
+    """Analyze an NDJSON or CSV body of any length, streaming NDJSON results back.
+
+    Each result line carries the ``index`` of its input row (and its ``id`` when
+    given); rows that could not be analyzed get an ``error`` instead of results.
+    """
+    content_type = request.headers.get("content-type", "")
+    parse = parse_csv if "csv" in content_type else parse_ndjson
+    analyzer = StreamAnalyzer(include_risk=include_risk)
+
+    async def results(body):
+        items = parse(read_lines(body))
+        async for record in analyzer.analyze(items, ordered=order == "input"):
+            yield json.dumps(record) + "\n"
+
+    return BodyStreamingResponse(request, results, media_type="application/x-ndjson")
+
+
+def _aspect_response(result: dict[str, any]) -> AspectAnalysisResponse:
+    if result.get("message"):
+        return AspectAnalysisResponse(
+            text=result["text"],
+            aspects=[],
+            overall_sentiment={
+                "sentiment": "neutral",
+                "confidence": 0.0,
+                "probabilities": {"positive": 0.33, "negative": 0.33, "neutral": 0.34},
+            },
+            total_aspects=0,
+        )
+
+    return AspectAnalysisResponse(**result)
+
+
 @router.post("/analysis/aspects", response_model=AspectAnalysisResponse)
 async def analyze_aspects(
     request: SentimentRequest,
@@ -145,25 +286,45 @@ async def analyze_aspects(
     try:
         service = get_aspect_service()
         result = await service.analyze_aspects(request.text)
-
-        if result.get("message"):
-            return AspectAnalysisResponse(
-                text=result["text"],
-                aspects=[],
-                overall_sentiment={
-                    "sentiment": "neutral",
-                    "confidence": 0.0,
-                    "probabilities": {"positive": 0.33, "negative": 0.33, "neutral": 0.34},
-                },
-                total_aspects=0,
-            )
-
-        return AspectAnalysisResponse(**result)
+        return _aspect_response(result)
+    except (InferenceQueueFullError, ModelNotReadyError) as e:
+        raise _unavailable(e)
     except Exception as e:
         logger.error(f"Error analyzing aspects: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error analyzing aspects: {str(e)}")
 
 
+@router.post("/analysis/aspects/bulk", response_model=BulkAspectAnalysisResponse)
+async def analyze_aspects_bulk(
+    request: BulkAnalysisRequest,
+    rate_limiter: None = Depends(_rate_limit_5_60),
+):
+    try:
+        service = get_aspect_service()
+        aspect_results = await service.analyze_aspects_bulk(request.texts)
+
+        results = []
+        failed = 0
+        for text, result in zip(request.texts, aspect_results, strict=True):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to analyze aspects: {text[:50]}... Error: {result}")
+                failed += 1
+                continue
+            results.append(_aspect_response(result))
+
+        return BulkAspectAnalysisResponse(
+            results=results,
+            total=len(request.texts),
+            successful=len(results),
+            failed=failed,
+        )
+    except (InferenceQueueFullError, ModelNotReadyError) as e:
+        raise _unavailable(e)
+    except Exception as e:
+        logger.error(f"Error in bulk aspect analysis: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error in bulk aspect analysis: {str(e)}")
+
+
 @router.post("/analyze", response_model=SentimentResponse)
 async def analyze(
     request: SentimentRequest,
@@ -171,23 +332,15 @@ async def analyze(
 ):
     """Compatibility endpoint: POST /api/analyze -> runs sentiment analysis with risk detection."""
     try:
-        sentiment_service = get_sentiment_service()
-        emotion_service = get_emotion_service()
-        risk_service = get_risk_service()
-
-        # Get sentiment and emotion from BERT models
-        sentiment_result = await sentiment_service.analyze(request.text)
-        emotion_result = await emotion_service.analyze(request.text)
-
-        # Perform risk analysis using BERT outputs + pattern matching
-        risk_analysis = risk_service.detect_risks(
-            request.text,
-            sentiment_result["sentiment"],
-            emotion_result["emotion"],
-            sentiment_result.get("scores", {}),
-        )
+        # Sentiment and emotion from BERT models in parallel, then risk analysis
+        # using BERT outputs + pattern matching
+        result = await get_analysis_pipeline().analyze(request.text)
+        sentiment_result = result["sentiment"]
+        risk_analysis = result["risk_analysis"]
 
         return SentimentResponse(**sentiment_result, risk_analysis=risk_analysis)
+    except (InferenceQueueFullError, ModelNotReadyError) as e:
+        raise _unavailable(e)
     except Exception as e:
         logger.error(f"Error analyzing sentiment: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error analyzing sentiment: {str(e)}")
@@ -0,0 +1,77 @@
+"""Fused sentiment + emotion + risk analysis for a single text."""
+
+import logging
+
+from app.services.emotion_service import get_emotion_batcher, get_emotion_service
+from app.services.risk_service import get_risk_service
+from app.services.sentiment_service import (
+    cached_sentiment_usable,
+    get_sentiment_batcher,
+    get_sentiment_service,
+)
+from app.utils.cache import cache_get_many
+from app.utils.single_flight import compute_once_many
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisPipeline:
+    """Run sentiment, emotion and risk detection with one cache lookup.
+
+    Both cache keys are read with a single MGET, missing results are computed
+    concurrently (coalesced with identical in-flight requests) and cached in
+    one pipeline, and the model outputs then feed risk detection.
+    """
+
+    def __init__(self):
+        self.sentiment_service = get_sentiment_service()
+        self.emotion_service = get_emotion_service()
+        self.risk_service = get_risk_service()
+
+    async def analyze(self, text: str) -> dict[str, any]:
+        sentiment_key = self.sentiment_service._get_cache_key(text)
+        emotion_key = self.emotion_service._get_cache_key(text)
+
+        sentiment_result, emotion_result = await cache_get_many([sentiment_key, emotion_key])
+        if sentiment_result is not None and not cached_sentiment_usable(sentiment_result):
+            sentiment_result = None
+
+        if sentiment_result is None or emotion_result is None:
+            logger.info("Cache miss, computing sentiment and emotion")
+            jobs = {}
+            if sentiment_result is None:
+                jobs[sentiment_key] = lambda: get_sentiment_batcher().submit(text)
+            if emotion_result is None:
+                jobs[emotion_key] = lambda: get_emotion_batcher().submit(text)
+
+            # Leases, result writes and lease releases each take one round trip for both
+            fresh = await compute_once_many(jobs)
+
+            sentiment_result = sentiment_result or fresh[sentiment_key]
+            emotion_result = emotion_result or fresh[emotion_key]
+        else:
+            logger.info("Cache hit")
+
+        risk_analysis = self.risk_service.detect_risks(
+            text,
+            sentiment_result["sentiment"],
+            emotion_result["emotion"],
+            sentiment_result.get("scores", {}),
+        )
+
+        return {
+            "sentiment": sentiment_result,
+            "emotion": emotion_result,
+            "risk_analysis": risk_analysis,
+        }
+
+
+_analysis_pipeline: AnalysisPipeline | None = None
+
+
+def get_analysis_pipeline() -> AnalysisPipeline:
+    """Get or create the analysis pipeline singleton."""
+    global _analysis_pipeline
+    if _analysis_pipeline is None:
+        _analysis_pipeline = AnalysisPipeline()
+    return _analysis_pipeline
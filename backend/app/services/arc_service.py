@@ -0,0 +1,62 @@
+"""Sentence-level emotional arc of a text."""
+
+import asyncio
+import logging
+
+from app.services.aspect_service import get_nlp_model
+from app.services.emotion_service import get_emotion_service
+from app.services.sentences import split_sentences
+from app.services.sentiment_service import get_sentiment_service
+
+logger = logging.getLogger(__name__)
+
+
+class EmotionalArcService:
+    """Score every sentence of a text with the emotion (and sentiment) model.
+
+    Sentences come from the spaCy pipeline and are scored through the services'
+    batch paths, so each sentence is cached on its own under the same key as a
+    single-text request and all uncached sentences share one padded batch.
+    """
+
+    def __init__(self):
+        self.emotion_service = get_emotion_service()
+        self.sentiment_service = get_sentiment_service()
+        get_nlp_model(blocking=False)
+
+    async def analyze_arc(self, text: str, include_sentiment: bool = False) -> dict[str, any]:
+        spans = await split_sentences(text)
+        sentences = [text[start:end] for start, end in spans]
+
+        jobs = [self.emotion_service.analyze_batch(sentences)]
+        if include_sentiment:
+            jobs.append(self.sentiment_service.analyze_batch(sentences))
+        emotion_results, *sentiment_results = await asyncio.gather(*jobs)
+        sentiment_results = sentiment_results[0] if sentiment_results else [None] * len(spans)
+
+        arc = []
+        for index, ((start, end), sentence, emotion, sentiment) in enumerate(
+            zip(spans, sentences, emotion_results, sentiment_results, strict=True)
+        ):
+            for result in (emotion, sentiment):
+                if isinstance(result, Exception):
+                    raise result
+            arc.append(
+                {
+                    "index": index,
+                    "text": sentence,
+                    "start": start,
+                    "end": end,
+                    "emotion": emotion["emotion"],
+                    "probabilities": emotion["probabilities"],
+                    "intensity": max(emotion["probabilities"].values()),
+                    "sentiment": sentiment["sentiment"] if sentiment else None,
+                    "sentiment_scores": sentiment["scores"] if sentiment else None,
+                }
+            )
+
+        return {"text": text, "sentences": arc, "total_sentences": len(arc)}
+
+
+def get_arc_service() -> EmotionalArcService:
+    return EmotionalArcService()
@@ -1,126 +1,135 @@
+import asyncio
 import logging
+import os
 import re
+import threading
 
 import spacy
 
+from app.models.model_loader import ModelNotReadyError
+from app.models.spacy_loader import load_spacy_model
+from app.services.parse_pool import get_parse_pool, parse_pool_enabled
+from app.services.parsed_document import ParsedDocument, parse_document, parse_documents
 from app.services.sentiment_service import get_sentiment_service
 
 logger = logging.getLogger(__name__)
 
+SPACY_PIPE_BATCH_SIZE = int(os.getenv("SPACY_PIPE_BATCH_SIZE", "64"))
+SPACY_PIPE_PROCESSES = int(os.getenv("SPACY_PIPE_PROCESSES", "1"))
+
 nlp: spacy.Language | None = None
+_nlp_lock = threading.Lock()
+_nlp_load_error: Exception | None = None
+
+
+def get_nlp_model(blocking: bool = True):
+    """Get the spaCy pipeline, loading it on first use.
+
+    With ``blocking=False`` nothing is loaded on the calling thread: until the
+    background loader has succeeded ``ModelNotReadyError`` is raised, also when
+    its load failed.
+    """
+    if nlp is not None:
+        return nlp
+    if not blocking:
+        if _nlp_load_error is not None:
+            raise ModelNotReadyError(f"spaCy model failed to load: {_nlp_load_error}")
+        raise ModelNotReadyError("spaCy model is still loading")
+    with _nlp_lock:
+        return _load_nlp_model()
 
 
-def get_nlp_model():
-    global nlp
+def _load_nlp_model():
+    global nlp, _nlp_load_error
     if nlp is None:
         try:
-            logger.info("Loading spaCy model...")
-            nlp = spacy.load("en_core_web_sm")
-            logger.info("spaCy model loaded successfully")
-        except OSError as e:
-            logger.warning(f"spaCy model not found: {e}, trying to download...")
-            try:
-                import subprocess
-                import sys
-
-                result = subprocess.run(
-                    [sys.executable, "-m", "spacy", "download", "en_core_web_sm"],
-                    capture_output=True,
-                    text=True,
-                    timeout=300,
-                )
-                if result.returncode == 0:
-                    nlp = spacy.load("en_core_web_sm")
-                    logger.info("spaCy model downloaded and loaded")
-                else:
-                    raise Exception(f"Download failed: {result.stderr}")
-            except Exception as download_error:
-                logger.error(f"Failed to download spaCy model: {download_error}")
-                logger.info("Falling back to basic English model with minimal components...")
-                try:
-                    nlp = spacy.blank("en")
-                    nlp.add_pipe("sentencizer")
-                    logger.info("Using basic spaCy model")
-                except Exception as fallback_error:
-                    logger.error(f"Failed to create fallback model: {fallback_error}")
-                    raise
+            nlp = load_spacy_model()
+        except Exception as e:
+            _nlp_load_error = e
+            raise
+        _nlp_load_error = None
     return nlp
 
 
 class AspectService:
     def __init__(self):
         self.sentiment_service = get_sentiment_service()
-        get_nlp_model()
+        get_nlp_model(blocking=False)
+
+    def parse(self, text: str) -> ParsedDocument:
+        """Parse a text once; pass the result to the methods below to reuse it."""
+        return parse_document(get_nlp_model(), text)
 
-    def extract_aspects(self, text: str) -> list[dict[str, any]]:
+    def extract_aspects(
+        self, text: str, document: ParsedDocument | None = None
+    ) -> list[dict[str, any]]:
         """Extract noun phrases and named entities as aspects."""
-        nlp_model = get_nlp_model()
-        doc = nlp_model(text)
+        if document is None:
+            document = self.parse(text)
 
         aspects = []
         seen_aspects = set()
 
         # Extract named entities
-        for ent in doc.ents:
-            if ent.label_ in ["PERSON", "ORG", "PRODUCT", "EVENT", "WORK_OF_ART", "LAW"]:
-                aspect_text = ent.text.strip()
+        for ent_text, ent_label, ent_start, ent_end in document.entities:
+            if ent_label in ["PERSON", "ORG", "PRODUCT", "EVENT", "WORK_OF_ART", "LAW"]:
+                aspect_text = ent_text.strip()
                 if len(aspect_text) > 1 and aspect_text.lower() not in seen_aspects:
                     aspects.append(
                         {
                             "text": aspect_text,
                             "type": "entity",
-                            "label": ent.label_,
-                            "start": ent.start_char,
-                            "end": ent.end_char,
+                            "label": ent_label,
+                            "start": ent_start,
+                            "end": ent_end,
                         }
                     )
                     seen_aspects.add(aspect_text.lower())
 
-        # Extract noun phrases (if available)
-        try:
-            for chunk in doc.noun_chunks:
-                chunk_text = chunk.text.strip()
-                if (
-                    len(chunk_text) > 2
-                    and chunk_text.lower() not in seen_aspects
-                    and chunk_text.lower() not in ["i", "you", "he", "she", "it", "we", "they"]
-                ):
-                    # Filter out very common words
-                    if not re.match(r"^(the|a|an|this|that|these|those)\s+", chunk_text.lower()):
-                        aspects.append(
-                            {
-                                "text": chunk_text,
-                                "type": "noun_phrase",
-                                "label": "NOUN_PHRASE",
-                                "start": chunk.start_char,
-                                "end": chunk.end_char,
-                            }
-                        )
-                        seen_aspects.add(chunk_text.lower())
-        except Exception:
-            pass
+        # Extract noun phrases (empty when the pipeline has no parser)
+        for chunk_text, chunk_start, chunk_end in document.noun_chunks:
+            chunk_text = chunk_text.strip()
+            if (
+                len(chunk_text) > 2
+                and chunk_text.lower() not in seen_aspects
+                and chunk_text.lower() not in ["i", "you", "he", "she", "it", "we", "they"]
+            ):
+                # Filter out very common words
+                if not re.match(r"^(the|a|an|this|that|these|those)\s+", chunk_text.lower()):
+                    aspects.append(
+                        {
+                            "text": chunk_text,
+                            "type": "noun_phrase",
+                            "label": "NOUN_PHRASE",
+                            "start": chunk_start,
+                            "end": chunk_end,
+                        }
+                    )
+                    seen_aspects.add(chunk_text.lower())
 
         # Extract important adjectives + nouns (aspect-like patterns)
-        for token in doc:
-            if token.pos_ == "NOUN" and token.dep_ in ["nsubj", "dobj", "pobj"]:
-                noun_text = token.text.strip()
+        for token_text, token_dep, token_idx in document.nouns:
+            if token_dep in ["nsubj", "dobj", "pobj"]:
+                noun_text = token_text.strip()
                 if len(noun_text) > 2 and noun_text.lower() not in seen_aspects:
                     aspects.append(
                         {
                             "text": noun_text,
                             "type": "noun",
                             "label": "NOUN",
-                            "start": token.idx,
-                            "end": token.idx + len(noun_text),
+                            "start": token_idx,
+                            "end": token_idx + len(noun_text),
                         }
                     )
                     seen_aspects.add(noun_text.lower())
 
         # Remove duplicates and sort by position
         unique_aspects = []
+        unique_texts = set()
         for aspect in sorted(aspects, key=lambda x: x["start"]):
-            if aspect["text"].lower() not in [a["text"].lower() for a in unique_aspects]:
+            if aspect["text"].lower() not in unique_texts:
                 unique_aspects.append(aspect)
+                unique_texts.add(aspect["text"].lower())
 
         # If no aspects found by spaCy, apply a lightweight heuristic fallback
         if not unique_aspects:
@@ -168,31 +177,28 @@ class AspectService:
                     "too",
                 ]
             )
-            words = re.findall(r"[A-Za-z]+(?:'[A-Za-z]+)?", text)
+            # Keep each word's offsets so candidates are located without searching the text
+            words = list(re.finditer(r"[A-Za-z]+(?:'[A-Za-z]+)?", text))
             candidates = []
             for i in range(len(words) - 1):
-                w1 = words[i].lower()
-                w2 = words[i + 1].lower()
+                w1 = words[i].group().lower()
+                w2 = words[i + 1].group().lower()
                 if w1 not in stopwords and w2 not in stopwords and len(w1) > 2 and len(w2) > 2:
-                    cand = f"{w1} {w2}"
-                    candidates.append(cand)
+                    candidates.append((f"{w1} {w2}", words[i].start(), words[i + 1].end()))
 
             seen = set()
             heuristics = []
-            for idx, cand in enumerate(candidates):
+            for cand, start, end in candidates:
                 if cand in seen:
                     continue
                 seen.add(cand)
-                # find position in text (first occurrence)
-                m = re.search(re.escape(cand), text, flags=re.IGNORECASE)
-                start = m.start() if m else 0
                 heuristics.append(
                     {
                         "text": cand,
                         "type": "heuristic",
                         "label": "HEURISTIC",
                         "start": start,
-                        "end": start + len(cand),
+                        "end": end,
                     }
                 )
                 if len(heuristics) >= 10:
@@ -203,7 +209,13 @@ class AspectService:
 
         return unique_aspects[:10]  # Limit to top 10 aspects
 
-    def extract_context(self, text: str, aspect: dict[str, any], window: int = 50) -> str:
+    def extract_context(
+        self,
+        text: str,
+        aspect: dict[str, any],
+        window: int = 50,
+        document: ParsedDocument | None = None,
+    ) -> str:
         """Extract context around an aspect for sentiment analysis."""
         start = max(0, aspect["start"] - window)
         end = min(len(text), aspect["end"] + window)
@@ -211,24 +223,19 @@ class AspectService:
         context = text[start:end]
 
         # Try to get sentence containing the aspect
-        nlp_model = get_nlp_model()
-        doc = nlp_model(text)
-        for sent in doc.sents:
-            if sent.start_char <= aspect["start"] <= sent.end_char:
-                return sent.text.strip()
+        if document is None:
+            document = self.parse(text)
+        sentence = document.sentence_at(aspect["start"])
+        if sentence is not None:
+            return sentence.strip()
 
         return context.strip()
 
-    async def analyze_aspect_sentiment(self, text: str, aspect: dict[str, any]) -> dict[str, any]:
-        """Analyze sentiment for a specific aspect."""
-        context = self.extract_context(text, aspect)
-
-        # Create aspect-specific prompt
-        aspect_text = aspect["text"]
-        prompt = f"{aspect_text}: {context}"
-
-        sentiment_result = await self.sentiment_service.analyze(prompt)
+    def build_prompt(self, aspect: dict[str, any], context: str) -> str:
+        """Create the aspect-specific prompt scored by the sentiment model."""
+        return f"{aspect['text']}: {context}"
 
+    def _aspect_sentiment(self, sentiment_result: dict[str, any], context: str) -> dict[str, any]:
         scores = sentiment_result["scores"]
         confidence = max(scores.values())
 
@@ -239,10 +246,27 @@ class AspectService:
             "context": context,
         }
 
-    async def analyze_aspects(self, text: str) -> dict[str, any]:
-        """Perform aspect-based sentiment analysis."""
-        aspects = self.extract_aspects(text)
-
+    async def analyze_aspect_sentiment(
+        self, text: str, aspect: dict[str, any], document: ParsedDocument | None = None
+    ) -> dict[str, any]:
+        """Analyze sentiment for a specific aspect."""
+        context = self.extract_context(text, aspect, document=document)
+        sentiment_result = await self.sentiment_service.analyze(self.build_prompt(aspect, context))
+        return self._aspect_sentiment(sentiment_result, context)
+
+    def _prepare(self, text: str, document: ParsedDocument) -> tuple[list[dict], list[str]]:
+        """Aspects of a parsed text and the context sentence of each."""
+        aspects = self.extract_aspects(text, document)
+        contexts = [self.extract_context(text, aspect, document=document) for aspect in aspects]
+        return aspects, contexts
+
+    def _assemble(
+        self,
+        text: str,
+        aspects: list[dict[str, any]],
+        contexts: list[str],
+        sentiment_results: list[dict[str, any] | Exception],
+    ) -> dict[str, any]:
         if not aspects:
             return {
                 "text": text,
@@ -252,8 +276,12 @@ class AspectService:
             }
 
         aspect_results = []
-        for aspect in aspects:
-            sentiment_result = await self.analyze_aspect_sentiment(text, aspect)
+        for aspect, context, sentiment_result in zip(
+            aspects, contexts, sentiment_results, strict=True
+        ):
+            if isinstance(sentiment_result, Exception):
+                raise sentiment_result
+            sentiment_result = self._aspect_sentiment(sentiment_result, context)
             aspect_results.append(
                 {
                     "aspect": aspect["text"],
@@ -277,6 +305,60 @@ class AspectService:
             "total_aspects": len(aspect_results),
         }
 
+    async def analyze_aspects(self, text: str) -> dict[str, any]:
+        """Perform aspect-based sentiment analysis."""
+        # Parse once; aspect extraction and every context lookup share it
+        if parse_pool_enabled():
+            document = (await get_parse_pool().parse([text]))[0]
+        else:
+            document = self.parse(text)
+        aspects, contexts = self._prepare(text, document)
+
+        # Score every aspect prompt together: one cache multi-get, one lease
+        # pipeline so other workers wait instead of recomputing, one batched
+        # forward pass for the misses and one pipelined cache write
+        prompts = [self.build_prompt(aspect, context) for aspect, context in zip(aspects, contexts)]
+        sentiment_results = await self.sentiment_service.analyze_batch(prompts) if prompts else []
+
+        return self._assemble(text, aspects, contexts, sentiment_results)
+
+    async def analyze_aspects_bulk(self, texts: list[str]) -> list[dict[str, any] | Exception]:
+        """Aspect-based analysis of many texts; failed texts are returned as exceptions.
+
+        Texts are parsed with ``nlp.pipe`` (in the parse pool if enabled, else in a
+        background thread) and the aspect prompts of all of them are scored in
+        one sentiment batch.
+        """
+        if parse_pool_enabled():
+            documents = await get_parse_pool().parse(texts)
+        else:
+            documents = await asyncio.to_thread(
+                parse_documents,
+                get_nlp_model(),
+                texts,
+                SPACY_PIPE_BATCH_SIZE,
+                SPACY_PIPE_PROCESSES,
+            )
+        prepared = [self._prepare(text, document) for text, document in zip(texts, documents)]
+
+        prompts = [
+            self.build_prompt(aspect, context)
+            for aspects, contexts in prepared
+            for aspect, context in zip(aspects, contexts)
+        ]
+        sentiment_results = await self.sentiment_service.analyze_batch(prompts) if prompts else []
+
+        results = []
+        offset = 0
+        for text, (aspects, contexts) in zip(texts, prepared):
+            own_results = sentiment_results[offset : offset + len(aspects)]
+            offset += len(aspects)
+            try:
+                results.append(self._assemble(text, aspects, contexts, own_results))
+            except Exception as e:
+                results.append(e)
+        return results
+
     def _calculate_overall_sentiment(self, aspect_results: list[dict[str, any]]) -> dict[str, any]:
         """Calculate overall sentiment from aspect sentiments."""
         if not aspect_results:
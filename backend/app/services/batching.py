@@ -0,0 +1,265 @@
+"""Dynamic micro-batching for transformer inference."""
+
+import asyncio
+import logging
+import os
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import torch
+import torch.nn.functional as F  # noqa: N812
+
+from app.services.inference_executor import get_inference_executor
+from app.utils.cache import cache_get_many
+from app.utils.single_flight import compute_many_once
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "16"))
+MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "5"))
+BULK_BATCH_SIZE = int(os.getenv("INFERENCE_BULK_BATCH_SIZE", "32"))
+# Tokens shared by consecutive windows in long-document mode
+LONG_DOCUMENT_STRIDE = int(os.getenv("LONG_DOCUMENT_STRIDE", "128"))
+
+
+def predict_proba(tokenizer, model, texts: list[str]) -> list[list[float]]:
+    """Run a single padded forward pass and return one probability row per text."""
+    inputs = tokenizer(texts, return_tensors="pt", truncation=True, max_length=512, padding=True)
+
+    with torch.inference_mode():
+        outputs = model(**inputs)
+        probabilities = F.softmax(outputs.logits, dim=-1)
+
+    return probabilities.tolist()
+
+
+def predict_proba_bucketed(
+    tokenizer, model, texts: list[str], batch_size: int = BULK_BATCH_SIZE
+) -> list[list[float] | Exception]:
+    """Run texts through the model in length-bucketed, padded mini-batches.
+
+    All texts are tokenized once, sorted by token length and cut into mini-batches
+    so that padding stays small. Results are returned in input order; a text whose
+    mini-batch and solo retry both fail gets the exception in place of its row.
+    """
+    encodings = tokenizer(texts, truncation=True, max_length=512)
+    order = sorted(range(len(texts)), key=lambda i: len(encodings["input_ids"][i]))
+    results: list[list[float] | Exception] = [None] * len(texts)
+
+    for start in range(0, len(order), max(1, batch_size)):
+        bucket = order[start : start + batch_size]
+        try:
+            rows = _forward(model, _pad(encodings, bucket, tokenizer.pad_token_id))
+        except Exception as e:
+            logger.warning(f"Mini-batch of {len(bucket)} failed, retrying items one by one: {e}")
+            rows = []
+            for i in bucket:
+                try:
+                    rows.append(_forward(model, _pad(encodings, [i], tokenizer.pad_token_id))[0])
+                except Exception as item_error:
+                    rows.append(item_error)
+
+        for i, row in zip(bucket, rows, strict=True):
+            results[i] = row
+
+    return results
+
+
+def _pad(encodings, indices: list[int], pad_token_id: int) -> dict[str, torch.Tensor]:
+    width = max(len(encodings["input_ids"][i]) for i in indices)
+    batch = {}
+    for key in encodings.keys():
+        pad_value = pad_token_id if key == "input_ids" else 0
+        rows = [encodings[key][i] for i in indices]
+        batch[key] = torch.tensor([row + [pad_value] * (width - len(row)) for row in rows])
+    return batch
+
+
+def _forward(model, inputs: dict[str, torch.Tensor]) -> list[list[float]]:
+    return F.softmax(_forward_logits(model, inputs), dim=-1).tolist()
+
+
+def _forward_logits(model, inputs: dict[str, torch.Tensor]) -> torch.Tensor:
+    with torch.inference_mode():
+        return model(**inputs).logits
+
+
+def predict_windows(
+    tokenizer,
+    model,
+    text: str,
+    max_length: int = 512,
+    stride: int = LONG_DOCUMENT_STRIDE,
+    batch_size: int = BULK_BATCH_SIZE,
+) -> dict[str, any]:
+    """Cover a whole text with overlapping token windows and score them together.
+
+    The text is tokenized once into windows of ``max_length`` tokens, each
+    sharing ``stride`` tokens with the previous one, and the windows run through
+    the model in padded mini-batches. Window logits are averaged weighted by each
+    window's token count. A text that fits in one window gets exactly the same
+    probabilities as ``predict_proba``.
+
+    Returns ``{"probabilities": [...], "windows": [{"start", "end", "tokens",
+    "probabilities"}]}`` with character offsets into ``text``.
+    """
+    encodings = tokenizer(
+        text,
+        truncation=True,
+        max_length=max_length,
+        stride=min(stride, max_length // 2),
+        return_overflowing_tokens=True,
+        return_offsets_mapping=True,
+    )
+    inputs = {key: encodings[key] for key in tokenizer.model_input_names if key in encodings}
+    indices = list(range(len(inputs["input_ids"])))
+
+    logits = torch.cat(
+        [
+            _forward_logits(
+                model, _pad(inputs, indices[start : start + batch_size], tokenizer.pad_token_id)
+            )
+            for start in range(0, len(indices), max(1, batch_size))
+        ]
+    )
+
+    windows = []
+    for offsets in encodings["offset_mapping"]:
+        # Special tokens map to empty (0, 0) spans
+        spans = [(begin, end) for begin, end in offsets if end > begin]
+        windows.append(
+            {
+                "start": spans[0][0] if spans else 0,
+                "end": spans[-1][1] if spans else 0,
+                "tokens": len(spans),
+            }
+        )
+
+    weights = torch.tensor([max(1, window["tokens"]) for window in windows], dtype=logits.dtype)
+    combined = (logits * weights.unsqueeze(-1)).sum(dim=0) / weights.sum()
+
+    for window, probabilities in zip(windows, F.softmax(logits, dim=-1).tolist(), strict=True):
+        window["probabilities"] = probabilities
+    return {"probabilities": F.softmax(combined, dim=-1).tolist(), "windows": windows}
+
+
+async def analyze_cached_batch(
+    texts: list[str],
+    cache_key_fn: Callable[[str], str],
+    compute_fn: Callable[[list[str]], Awaitable[list[Any]]],
+    computed: set[int] | None = None,
+    usable: Callable[[Any], bool] | None = None,
+) -> list[Any]:
+    """Resolve texts through the result cache, computing all misses in one call.
+
+    Cached results are fetched with a single multi-get and fresh results written
+    back in one pipeline. Each distinct uncached text is computed once, and texts
+    already being computed for another request, in this worker or under another
+    worker's single-flight lease, are awaited.
+    Positions whose result this call computed (the first occurrence of each
+    computed text) are added to ``computed`` if given. Cached results rejected
+    by ``usable`` are recomputed.
+    """
+    keys = [cache_key_fn(text) for text in texts]
+    try:
+        results = await cache_get_many(keys, usable=usable)
+    except Exception as e:
+        logger.warning(f"Cache lookup failed for batch of {len(keys)}: {e}")
+        results = [None] * len(keys)
+
+    missing = {keys[i]: texts[i] for i, result in enumerate(results) if result is None}
+    if not missing:
+        return results
+
+    logger.info(f"Cache miss for {len(missing)} of {len(texts)} texts, computing batch")
+    led: set[str] = set()
+    by_key = await compute_many_once(missing, compute_fn, led, usable)
+
+    for i, result in enumerate(results):
+        if result is not None:
+            continue
+        results[i] = by_key[keys[i]]
+        if keys[i] in led:
+            # Later duplicates of the text reuse this position's result
+            led.discard(keys[i])
+            if computed is not None:
+                computed.add(i)
+
+    return results
+
+
+class MicroBatcher:
+    """Gather concurrent inference requests into batches.
+
+    Callers ``await submit(text)``. Pending texts are flushed through ``batch_fn``
+    as soon as ``max_batch_size`` texts are queued or ``max_wait_ms`` has passed
+    since the first one arrived, and each caller receives its own result. Batches
+    run on the inference executor, so the event loop stays free meanwhile.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[str]], list[Any]],
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait_ms: float = MAX_WAIT_MS,
+        name: str = "model",
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.name = name
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._running: set[asyncio.Task] = set()
+
+    async def submit(self, text: str) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Pending work from a previous (closed) event loop can never complete
+            self._pending = []
+            self._timer = None
+            self._loop = loop
+
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = self._pending[: self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size :]
+        if self._pending:
+            self._timer = self._loop.call_later(self.max_wait, self._flush)
+
+        # Drop callers that went away while waiting
+        batch = [(text, future) for text, future in batch if not future.done()]
+        if not batch:
+            return
+
+        task = self._loop.create_task(self._run_batch(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        logger.debug(f"Running {self.name} batch of {len(batch)}")
+        try:
+            results = await get_inference_executor().run(self.batch_fn, [text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results, strict=True):
+            if not future.done():
+                future.set_result(result)
@@ -1,52 +1,112 @@
 import hashlib
-import json
 import logging
 
-import torch
-import torch.nn.functional as F  # noqa: N812
-
 from app.models.model_loader import get_emotion_model
-from app.utils.redis_client import get_redis_client
+from app.services.batching import (
+    MicroBatcher,
+    analyze_cached_batch,
+    predict_proba,
+    predict_proba_bucketed,
+    predict_windows,
+)
+from app.services.inference_client import (
+    RemoteBatcher,
+    get_inference_client,
+    inference_server_enabled,
+)
+from app.services.inference_executor import get_inference_executor
+from app.utils.cache import cache_get
+from app.utils.single_flight import compute_once
 
 logger = logging.getLogger(__name__)
 
 
 class EmotionService:
     def __init__(self):
-        self.tokenizer, self.model = get_emotion_model()
-        self.id2label = self.model.config.id2label
+        # With a shared inference server the models live in that process instead
+        if not inference_server_enabled():
+            self.tokenizer, self.model = get_emotion_model()
+            self.id2label = self.model.config.id2label
 
     def _get_cache_key(self, text: str) -> str:
         text_hash = hashlib.sha256(text.encode()).hexdigest()
-        return f"emotion:{text_hash}"
+        return f"emotion:v2:{text_hash}"
+
+    def _get_long_cache_key(self, text: str) -> str:
+        text_hash = hashlib.sha256(text.encode()).hexdigest()
+        return f"emotion:long:v1:{text_hash}"
 
     async def analyze(self, text: str) -> dict[str, any]:
         cache_key = self._get_cache_key(text)
-        redis_client = await get_redis_client()
 
-        cached_result = await redis_client.get(cache_key)
+        cached_result = await cache_get(cache_key)
         if cached_result:
             logger.info("Cache hit")
-            return json.loads(cached_result)
+            return cached_result
 
         logger.info("Cache miss, computing emotion")
-        result = self._compute_emotion(text)
+        return await compute_once(cache_key, lambda: get_emotion_batcher().submit(text))
 
-        await redis_client.setex(cache_key, 3600, json.dumps(result))
-        return result
+    async def analyze_batch(
+        self, texts: list[str], computed: set[int] | None = None
+    ) -> list[dict[str, any] | Exception]:
+        """Analyze many texts at once; failed items are returned as exceptions.
 
-    def _compute_emotion(self, text: str) -> dict[str, any]:
-        inputs = self.tokenizer(
-            text, return_tensors="pt", truncation=True, max_length=512, padding=True
-        )
+        Indexes of texts this call computed, not cached or shared, are added to ``computed``.
+        """
+        return await analyze_cached_batch(texts, self._get_cache_key, self._infer_bulk, computed)
+
+    async def analyze_long(self, text: str) -> dict[str, any]:
+        """Analyze the whole of a long text with overlapping windows, with per-window results."""
+        cache_key = self._get_long_cache_key(text)
+
+        cached_result = await cache_get(cache_key)
+        if cached_result:
+            logger.info("Cache hit")
+            return cached_result
 
-        with torch.inference_mode():
-            outputs = self.model(**inputs)
-            logits = outputs.logits
-            probabilities = F.softmax(logits, dim=-1)
+        logger.info("Cache miss, computing long-document emotion")
+        return await compute_once(cache_key, lambda: self._infer_long(text))
 
-        probs = probabilities[0].tolist()
+    async def _infer_long(self, text: str) -> dict[str, any]:
+        if inference_server_enabled():
+            return (await get_inference_client().infer("emotion", [text], long=True))[0]
+        return await get_inference_executor().run(self._compute_emotion_long, text)
 
+    async def _infer_bulk(self, texts: list[str]) -> list[dict[str, any] | Exception]:
+        if inference_server_enabled():
+            return await get_inference_client().infer("emotion", texts, bulk=True)
+        return await get_inference_executor().run(self._compute_emotion_bulk, texts)
+
+    def _compute_emotion(self, text: str) -> dict[str, any]:
+        return self._compute_emotion_batch([text])[0]
+
+    def _compute_emotion_batch(self, texts: list[str]) -> list[dict[str, any]]:
+        return [
+            self._build_result(probs) for probs in predict_proba(self.tokenizer, self.model, texts)
+        ]
+
+    def _compute_emotion_bulk(self, texts: list[str]) -> list[dict[str, any] | Exception]:
+        return [
+            probs if isinstance(probs, Exception) else self._build_result(probs)
+            for probs in predict_proba_bucketed(self.tokenizer, self.model, texts)
+        ]
+
+    def _compute_emotion_long(self, text: str) -> dict[str, any]:
+        scored = predict_windows(self.tokenizer, self.model, text)
+        result = self._build_result(scored["probabilities"])
+        result["windows"] = [
+            {
+                "start": window["start"],
+                "end": window["end"],
+                "tokens": window["tokens"],
+                **self._build_result(window["probabilities"]),
+            }
+            for window in scored["windows"]
+        ]
+        return result
+
+    def _build_result(self, probs: list[float]) -> dict[str, any]:
         emotion_probs = {}
         for idx, prob in enumerate(probs):
             label = self.id2label.get(idx, "").lower()
@@ -62,3 +122,20 @@ class EmotionService:
 
 def get_emotion_service() -> EmotionService:
     return EmotionService()
+
+
+# Shared across requests so concurrent cache misses land in the same batch
+_emotion_batcher: MicroBatcher | None = None
+
+
+def get_emotion_batcher() -> MicroBatcher | RemoteBatcher:
+    """Get or create the emotion micro-batcher singleton."""
+    global _emotion_batcher
+    if _emotion_batcher is None and inference_server_enabled():
+        _emotion_batcher = RemoteBatcher("emotion")
+    elif _emotion_batcher is None:
+        _emotion_batcher = MicroBatcher(
+            lambda texts: get_emotion_service()._compute_emotion_batch(texts),
+            name="emotion",
+        )
+    return _emotion_batcher
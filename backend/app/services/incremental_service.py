@@ -0,0 +1,128 @@
+"""Incremental document analysis built from sentence-level results.
+
+Each sentence is analyzed and cached on its own, so re-submitting a document
+after a small edit only runs the new or changed sentences through the models.
+Document-level results are aggregated from the sentences.
+"""
+
+import asyncio
+import logging
+
+from app.services.aspect_service import get_nlp_model
+from app.services.emotion_service import get_emotion_service
+from app.services.risk_service import get_risk_service
+from app.services.sentences import split_sentences
+from app.services.sentiment_service import build_sentiment_result, get_sentiment_service
+
+logger = logging.getLogger(__name__)
+
+RISK_LEVELS = ("low", "medium", "high")
+
+
+class IncrementalAnalysisService:
+    """Sentiment, emotion and risk of a document from cached per-sentence results."""
+
+    def __init__(self):
+        self.sentiment_service = get_sentiment_service()
+        self.emotion_service = get_emotion_service()
+        self.risk_service = get_risk_service()
+        get_nlp_model(blocking=False)
+
+    async def analyze_document(self, text: str) -> dict[str, any]:
+        spans = await split_sentences(text)
+        sentences = [text[start:end] for start, end in spans]
+
+        # Positions each model computed for this request, as opposed to reused
+        sentiment_computed: set[int] = set()
+        emotion_computed: set[int] = set()
+        sentiment_results, emotion_results = await asyncio.gather(
+            self.sentiment_service.analyze_batch(sentences, sentiment_computed),
+            self.emotion_service.analyze_batch(sentences, emotion_computed),
+        )
+        for result in (*sentiment_results, *emotion_results):
+            if isinstance(result, Exception):
+                raise result
+
+        # Pattern scanning a sentence is cheaper than a cache round trip, and its
+        # model inputs above are already cached, so risk is recomputed per sentence
+        risks = await asyncio.to_thread(
+            self.risk_service.detect_risks_batch,
+            sentences,
+            [result["sentiment"] for result in sentiment_results],
+            [result["emotion"] for result in emotion_results],
+            [result["scores"] for result in sentiment_results],
+        )
+
+        recomputed = len(sentiment_computed | emotion_computed)
+        logger.info(f"Document of {len(sentences)} sentences, {recomputed} recomputed")
+
+        return {
+            "text": text,
+            **self._aggregate(sentences, sentiment_results, emotion_results, risks),
+            "sentences": [
+                {
+                    "index": index,
+                    "text": sentence,
+                    "start": start,
+                    "end": end,
+                    "sentiment": sentiment["sentiment"],
+                    "scores": sentiment["scores"],
+                    "emotion": emotion["emotion"],
+                    "probabilities": emotion["probabilities"],
+                    "risk_flags": risk["flags"],
+                }
+                for index, ((start, end), sentence, sentiment, emotion, risk) in enumerate(
+                    zip(spans, sentences, sentiment_results, emotion_results, risks, strict=True)
+                )
+            ],
+            "total_sentences": len(sentences),
+            "sentences_recomputed": recomputed,
+            "sentences_reused": len(sentences) - recomputed,
+        }
+
+    def _aggregate(
+        self,
+        sentences: list[str],
+        sentiment_results: list[dict[str, any]],
+        emotion_results: list[dict[str, any]],
+        risks: list[dict[str, any]],
+    ) -> dict[str, any]:
+        """Document-level results: length-weighted sentence scores and the worst risk."""
+        total_length = sum(len(sentence) for sentence in sentences) or 1
+        weights = [len(sentence) / total_length for sentence in sentences]
+
+        scores = {"positive": 0.0, "neutral": 0.0, "negative": 0.0}
+        emotion_probs: dict[str, float] = {}
+        for weight, sentiment, emotion in zip(weights, sentiment_results, emotion_results):
+            for label in scores:
+                scores[label] += sentiment["scores"].get(label, 0.0) * weight
+            for label, prob in emotion["probabilities"].items():
+                emotion_probs[label] = emotion_probs.get(label, 0.0) + prob * weight
+
+        flags = list(dict.fromkeys(flag for risk in risks for flag in risk["flags"]))
+        worst = max(
+            risks,
+            key=lambda risk: (RISK_LEVELS.index(risk["risk_level"]), risk["risk_score"]),
+            default={"risk_level": "low", "risk_score": 0.0},
+        )
+
+        return {
+            "sentiment": build_sentiment_result(scores),
+            "emotion": {
+                "emotion": max(emotion_probs.items(), key=lambda x: x[1])[0]
+                if emotion_probs
+                else "neutral",
+                "probabilities": emotion_probs,
+            },
+            "risk_analysis": {
+                "has_risk": len(flags) > 0,
+                "risk_level": worst["risk_level"],
+                "risk_score": worst["risk_score"],
+                "flags": flags,
+                "recommendations": self.risk_service.generate_recommendations(flags),
+            },
+        }
+
+
+def get_incremental_service() -> IncrementalAnalysisService:
+    return IncrementalAnalysisService()
@@ -0,0 +1,162 @@
+"""Client side of the shared out-of-process inference server.
+
+When ``INFERENCE_SERVER_SOCKET`` is set, API workers do not load the
+transformers themselves: they send texts over a Unix domain socket to the
+inference server, which owns the models and batches requests from all workers
+together. Several comma-separated sockets spread load across model replicas.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import socket
+import struct
+import time
+
+from app.models.model_loader import ModelNotReadyError
+from app.services.inference_executor import InferenceQueueFullError
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_SERVER_SOCKETS = [
+    path.strip() for path in os.getenv("INFERENCE_SERVER_SOCKET", "").split(",") if path.strip()
+]
+INFERENCE_SERVER_TIMEOUT = float(os.getenv("INFERENCE_SERVER_TIMEOUT", "30"))
+
+_HEADER = struct.Struct("!I")
+
+
+def inference_server_enabled() -> bool:
+    return bool(INFERENCE_SERVER_SOCKETS)
+
+
+async def read_message(reader: asyncio.StreamReader) -> dict | None:
+    """Read one length-prefixed JSON message, or None at end of stream."""
+    try:
+        header = await reader.readexactly(_HEADER.size)
+    except asyncio.IncompleteReadError:
+        return None
+    (length,) = _HEADER.unpack(header)
+    return json.loads(await reader.readexactly(length))
+
+
+def encode_message(message: dict) -> bytes:
+    payload = json.dumps(message).encode()
+    return _HEADER.pack(len(payload)) + payload
+
+
+def _remote_error(error: dict) -> Exception:
+    """Rebuild a server-side failure so routers answer it as they would locally.
+
+    Not-ready and queue-full conditions keep their types (answered with 503);
+    anything else becomes a ``RuntimeError``.
+    """
+    if error.get("type") == "ModelNotReadyError":
+        return ModelNotReadyError(error["error"])
+    if error.get("type") in ("InferenceQueueFullError", "ParseQueueFullError"):
+        return InferenceQueueFullError(error["error"])
+    return RuntimeError(error["error"])
+
+
+class InferenceClient:
+    """Send inference requests to the inference server(s)."""
+
+    def __init__(self, socket_paths: list[str], timeout: float = INFERENCE_SERVER_TIMEOUT):
+        self.socket_paths = socket_paths
+        self.timeout = timeout
+        self._next_path = itertools.cycle(socket_paths)
+
+    async def _request(self, message: dict) -> dict:
+        path = next(self._next_path)
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_unix_connection(path), timeout=self.timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise ModelNotReadyError(f"Inference server at {path} is unavailable: {e}") from e
+
+        try:
+            writer.write(encode_message(message))
+            await writer.drain()
+            response = await asyncio.wait_for(read_message(reader), timeout=self.timeout)
+        except asyncio.TimeoutError as e:
+            # The server is up but too busy to answer in time
+            raise InferenceQueueFullError(
+                f"Inference server at {path} did not answer within {self.timeout}s"
+            ) from e
+        except (OSError, asyncio.IncompleteReadError) as e:
+            raise ModelNotReadyError(f"Inference server at {path} failed: {e}") from e
+        finally:
+            writer.close()
+
+        if response is None:
+            raise ModelNotReadyError(f"Inference server at {path} closed the connection")
+        if "error" in response:
+            raise _remote_error(response)
+        return response
+
+    async def infer(
+        self, model: str, texts: list[str], bulk: bool = False, long: bool = False
+    ) -> list:
+        """Run texts through a model on the server.
+
+        ``bulk=True`` uses the length-bucketed bulk path; its failed items come back
+        as exceptions in place of results, like the in-process bulk path.
+        ``long=True`` scores each text whole with overlapping windows.
+        """
+        response = await self._request(
+            {"op": "infer", "model": model, "texts": texts, "bulk": bulk, "long": long}
+        )
+        return [
+            _remote_error(result) if isinstance(result, dict) and "error" in result else result
+            for result in response["results"]
+        ]
+
+    def wait_until_ready(self, deadline_seconds: float = 120) -> None:
+        """Block until every configured server answers a ping (used at startup)."""
+        deadline = time.monotonic() + deadline_seconds
+        for path in self.socket_paths:
+            while True:
+                try:
+                    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                        sock.settimeout(max(min(self.timeout, deadline - time.monotonic()), 0.1))
+                        sock.connect(path)
+                        sock.sendall(encode_message({"op": "ping"}))
+                        header = sock.recv(_HEADER.size, socket.MSG_WAITALL)
+                        if len(header) == _HEADER.size:
+                            break
+                        problem = "connection closed before answering a ping"
+                except OSError as e:
+                    problem = e
+                if time.monotonic() > deadline:
+                    raise ModelNotReadyError(
+                        f"Inference server at {path} is unavailable: {problem}"
+                    )
+                time.sleep(min(1, max(deadline - time.monotonic(), 0)))
+            logger.info(f"Inference server at {path} is ready")
+
+
+class RemoteBatcher:
+    """Stand-in for a local MicroBatcher that forwards single texts to the server.
+
+    The server batches texts from all API workers together.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+
+    async def submit(self, text: str) -> dict:
+        return (await get_inference_client().infer(self.model, [text]))[0]
+
+
+_inference_client: InferenceClient | None = None
+
+
+def get_inference_client() -> InferenceClient:
+    """Get or create the inference client singleton."""
+    global _inference_client
+    if _inference_client is None:
+        _inference_client = InferenceClient(INFERENCE_SERVER_SOCKETS)
+    return _inference_client
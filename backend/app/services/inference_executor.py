@@ -0,0 +1,95 @@
+"""Dedicated thread pool for blocking model inference."""
+
+import asyncio
+import logging
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+# Two threads let the sentiment and emotion passes of one request overlap
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", "2"))
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", "32"))
+
+
+class InferenceQueueFullError(RuntimeError):
+    """Raised when the inference queue cannot take more work."""
+
+
+class InferenceExecutor:
+    """Run inference jobs on a fixed pool of threads behind a bounded queue.
+
+    Torch intra-op threads are split evenly across the pool so that concurrent
+    forward passes do not oversubscribe the CPU. Submitting while ``max_queue``
+    jobs are already waiting raises ``InferenceQueueFullError`` right away.
+    """
+
+    def __init__(self, threads: int = INFERENCE_THREADS, max_queue: int = INFERENCE_QUEUE_SIZE):
+        self.threads = max(1, threads)
+        self.max_queue = max(0, max_queue)
+        self.intra_op_threads = max(1, torch.get_num_threads() // self.threads)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.threads,
+            thread_name_prefix="inference",
+            initializer=torch.set_num_threads,
+            initargs=(self.intra_op_threads,),
+        )
+        self._outstanding = 0
+        self._lock = threading.Lock()
+        logger.info(
+            f"Inference executor started with {self.threads} thread(s), "
+            f"{self.intra_op_threads} intra-op thread(s) each, queue size {self.max_queue}"
+        )
+
+    @property
+    def queued(self) -> int:
+        """Number of submitted jobs not yet picked up by a thread."""
+        return max(0, self._outstanding - self.threads)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._outstanding >= self.threads + self.max_queue:
+                raise InferenceQueueFullError(
+                    f"Inference queue is full ({self.max_queue} jobs waiting)"
+                )
+            self._outstanding += 1
+
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # The slot is held until the job itself ends: a cancelled caller does not
+        # stop a job that is already running on a thread
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self._outstanding -= 1
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_inference_executor: InferenceExecutor | None = None
+
+
+def get_inference_executor() -> InferenceExecutor:
+    """Get or create the inference executor singleton."""
+    global _inference_executor
+    if _inference_executor is None:
+        _inference_executor = InferenceExecutor()
+    return _inference_executor
+
+
+def shutdown_inference_executor() -> None:
+    global _inference_executor
+    if _inference_executor is not None:
+        _inference_executor.shutdown()
+        _inference_executor = None
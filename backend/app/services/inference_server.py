@@ -0,0 +1,131 @@
+"""Standalone inference server shared by all API workers on a host.
+
+Usage:
+    python -m app.services.inference_server --socket /tmp/bert-inference.sock
+
+The server loads the sentiment and emotion models once and serves
+length-prefixed JSON requests over a Unix domain socket. Single-text requests
+from every connected worker go through the same micro-batchers, so batching
+happens across workers. API workers use it when ``INFERENCE_SERVER_SOCKET``
+points at the socket.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+from collections.abc import Awaitable, Callable
+
+from app.models.model_loader import get_emotion_model, get_sentiment_model, load_models
+from app.services import inference_client
+from app.services.emotion_service import get_emotion_batcher, get_emotion_service
+from app.services.inference_client import encode_message, read_message
+from app.services.sentiment_service import get_sentiment_batcher, get_sentiment_service
+from app.services.startup import warm_classifier
+from app.utils.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+SubmitFn = Callable[[str], Awaitable[dict]]
+BulkFn = Callable[[list[str]], Awaitable[list]]
+LongFn = Callable[[str], Awaitable[dict]]
+
+
+class InferenceServer:
+    """Serve ``infer`` and ``ping`` requests for a set of named models."""
+
+    def __init__(
+        self,
+        models: dict[str, tuple[SubmitFn, BulkFn]],
+        long_models: dict[str, LongFn] | None = None,
+    ):
+        self.models = models
+        self.long_models = long_models or {}
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while (message := await read_message(reader)) is not None:
+                writer.write(encode_message(await self.handle_message(message)))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_message(self, message: dict) -> dict:
+        if message.get("op") == "ping":
+            return {"ok": True, "models": sorted(self.models)}
+
+        if message.get("model") not in self.models:
+            return {"error": f"Unknown model: {message.get('model')}", "type": "ValueError"}
+        submit, bulk = self.models[message["model"]]
+
+        try:
+            if message.get("long"):
+                if message["model"] not in self.long_models:
+                    raise ValueError(f"No long-document mode for model: {message['model']}")
+                long = self.long_models[message["model"]]
+                results = await asyncio.gather(*(long(text) for text in message["texts"]))
+            elif message.get("bulk"):
+                results = await bulk(message["texts"])
+                results = [
+                    {"error": str(r), "type": type(r).__name__} if isinstance(r, Exception) else r
+                    for r in results
+                ]
+            else:
+                results = await asyncio.gather(*(submit(text) for text in message["texts"]))
+        except Exception as e:
+            logger.warning(f"Inference request failed: {e}")
+            return {"error": str(e), "type": type(e).__name__}
+
+        return {"results": results}
+
+
+def _local_models() -> dict[str, tuple[SubmitFn, BulkFn]]:
+    return {
+        "sentiment": (get_sentiment_batcher().submit, get_sentiment_service()._infer_bulk),
+        "emotion": (get_emotion_batcher().submit, get_emotion_service()._infer_bulk),
+    }
+
+
+def _local_long_models() -> dict[str, LongFn]:
+    return {
+        "sentiment": get_sentiment_service()._infer_long,
+        "emotion": get_emotion_service()._infer_long,
+    }
+
+
+async def serve(socket_path: str) -> None:
+    server = InferenceServer(_local_models(), _local_long_models())
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    unix_server = await asyncio.start_unix_server(server.handle_connection, path=socket_path)
+    logger.info(f"Inference server listening on {socket_path}")
+    async with unix_server:
+        await unix_server.serve_forever()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Shared inference server for API workers")
+    parser.add_argument(
+        "--socket",
+        default=os.getenv("INFERENCE_SERVER_LISTEN", "/tmp/bert-inference.sock"),
+        help="Unix domain socket path to listen on",
+    )
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    # This process owns the models, so it must never forward to another server
+    inference_client.INFERENCE_SERVER_SOCKETS = []
+
+    load_models()
+    warm_classifier(get_sentiment_model)
+    warm_classifier(get_emotion_model)
+    asyncio.run(serve(args.socket))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,444 @@
+"""Asynchronous batch jobs on a Redis work queue.
+
+A job's texts are split into chunks stored in Redis and references to the
+chunks are pushed onto a shared queue. Job workers (``app.services.job_worker``)
+claim chunks, run them through batched sentiment, emotion and risk analysis
+and store the results per chunk. The API only records jobs and serves their
+progress and results, so long-running scoring never occupies request workers.
+
+Keys, all expiring ``JOB_TTL_SECONDS`` after the job is created:
+    job:{id}              hash of job metadata and progress counters
+    job:{id}:input:{n}    JSON rows ``[index, id, text]`` of chunk n
+    job:{id}:result:{n}   compact JSON result rows of chunk n
+    job:{id}:attempts     hash of claim attempts per chunk
+    job:{id}:done         set of completed chunks
+    job:{id}:failed       set of chunks that ran out of attempts
+    jobs:queue            list of ``{id}:{n}`` chunk references
+    jobs:processing       sorted set of claimed references by lease deadline
+
+A claimed chunk whose lease runs out (its worker died) is put back on the
+queue by the next worker that looks, and counts as a failed attempt. Claiming,
+completing and releasing a chunk each run as one Lua script, so a worker dying
+between two commands cannot lose a chunk or leave it both done and failed.
+"""
+
+import json
+import logging
+import os
+import time
+import uuid
+from collections.abc import AsyncIterator
+
+from app.services.risk_service import get_risk_service
+from app.services.stream_service import StreamItem
+from app.utils import redis_client
+from app.utils.redis_client import call_redis, get_job_redis_client
+from app.utils.result_codec import EMOTION_LABELS, SENTIMENT_LABELS
+
+logger = logging.getLogger(__name__)
+
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", "64"))
+JOB_MAX_TEXTS = int(os.getenv("JOB_MAX_TEXTS", "100000"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "86400"))
+
+QUEUE_KEY = "jobs:queue"
+PROCESSING_KEY = "jobs:processing"
+
+RISK_LEVELS = ("low", "medium", "high")
+
+# The scripts derive job keys from the chunk reference, so they expect a
+# single Redis instance rather than a cluster.
+
+# KEYS: queue, processing; ARGV: now, lease deadline, ttl.
+# Pops references until one belongs to a live job and is not done yet, and
+# leases it. Returns {ref, attempt, include_risk, input} or nil.
+_CLAIM_SCRIPT = """
+while true do
+    local ref = redis.call('lpop', KEYS[1])
+    if not ref then
+        return nil
+    end
+    local job_id, chunk = string.match(ref, '^(.*):(%d+)$')
+    local job = 'job:' .. job_id
+    local include_risk = redis.call('hget', job, 'include_risk')
+    local payload = redis.call('get', job .. ':input:' .. chunk)
+    if include_risk and payload and redis.call('sismember', job .. ':done', chunk) == 0 then
+        redis.call('zadd', KEYS[2], ARGV[2], ref)
+        local attempt = redis.call('hincrby', job .. ':attempts', chunk, 1)
+        redis.call('expire', job .. ':attempts', ARGV[3])
+        redis.call('hsetnx', job, 'started_at', ARGV[1])
+        return {ref, attempt, include_risk, payload}
+    end
+end
+"""
+
+# KEYS: processing; ARGV: ref, results, processed, errors, now, ttl.
+# Returns 1 if this call completed the chunk, 0 if it was already done.
+_COMPLETE_SCRIPT = """
+local job_id, chunk = string.match(ARGV[1], '^(.*):(%d+)$')
+local job = 'job:' .. job_id
+redis.call('zrem', KEYS[1], ARGV[1])
+if redis.call('exists', job) == 0 then
+    return 0
+end
+redis.call('set', job .. ':result:' .. chunk, ARGV[2], 'EX', ARGV[6])
+redis.call('hset', job, 'updated_at', ARGV[5])
+-- Counters only move once per chunk, even if an expired lease let it run twice
+if redis.call('sadd', job .. ':done', chunk) == 0 then
+    return 0
+end
+redis.call('expire', job .. ':done', ARGV[6])
+redis.call('srem', job .. ':failed', chunk)
+redis.call('hincrby', job, 'processed', ARGV[3])
+redis.call('hincrby', job, 'errors', ARGV[4])
+return 1
+"""
+
+# KEYS: processing, queue; ARGV: ref, error, now, max attempts, ttl.
+# Only the caller that removes the lease releases the chunk, and never once it
+# is done. Returns {outcome, attempts}: outcome 1 requeued, 2 failed, 0 nothing.
+_RELEASE_SCRIPT = """
+if redis.call('zrem', KEYS[1], ARGV[1]) == 0 then
+    return {0, 0}
+end
+local job_id, chunk = string.match(ARGV[1], '^(.*):(%d+)$')
+local job = 'job:' .. job_id
+if redis.call('exists', job) == 0 or redis.call('sismember', job .. ':done', chunk) == 1 then
+    return {0, 0}
+end
+redis.call('hset', job, 'last_error', ARGV[2], 'updated_at', ARGV[3])
+local attempts = tonumber(redis.call('hget', job .. ':attempts', chunk) or '0')
+if attempts < tonumber(ARGV[4]) then
+    redis.call('rpush', KEYS[2], ARGV[1])
+    return {1, attempts}
+end
+redis.call('sadd', job .. ':failed', chunk)
+redis.call('expire', job .. ':failed', ARGV[5])
+return {2, attempts}
+"""
+
+# KEYS: failed, attempts, queue; ARGV: job id. Returns how many chunks were queued.
+_RETRY_SCRIPT = """
+local chunks = redis.call('smembers', KEYS[1])
+for _, chunk in ipairs(chunks) do
+    redis.call('srem', KEYS[1], chunk)
+    redis.call('hset', KEYS[2], chunk, 0)
+    redis.call('rpush', KEYS[3], ARGV[1] .. ':' .. chunk)
+end
+return #chunks
+"""
+
+
+class JobNotFoundError(Exception):
+    """The job does not exist or has expired."""
+
+
+class JobInputError(ValueError):
+    """The submitted texts cannot be turned into a job."""
+
+
+def encode_results(records: list[dict[str, any]]) -> str:
+    """Compact JSON rows for a chunk's result records.
+
+    ``[index, id, sentiment, scores, emotion, probabilities, risk]`` with labels
+    as indexes into the label tuples, scores and probabilities as lists in label
+    order and risk as ``[level, score, flags]`` or null; ``[index, id, error]``
+    for rows that could not be analyzed.
+    """
+    rows = []
+    for record in records:
+        row_id = record.get("id")
+        if "error" in record:
+            rows.append([record["index"], row_id, record["error"]])
+            continue
+        risk = record.get("risk_analysis")
+        rows.append(
+            [
+                record["index"],
+                row_id,
+                SENTIMENT_LABELS.index(record["sentiment"]),
+                [round(record["scores"].get(label, 0.0), 6) for label in SENTIMENT_LABELS],
+                EMOTION_LABELS.index(record["emotion"]),
+                [round(record["probabilities"].get(label, 0.0), 6) for label in EMOTION_LABELS],
+                (
+                    [RISK_LEVELS.index(risk["risk_level"]), risk["risk_score"], risk["flags"]]
+                    if risk
+                    else None
+                ),
+            ]
+        )
+    return json.dumps(rows, separators=(",", ":"))
+
+
+def decode_results(payload: str) -> list[dict[str, any]]:
+    """Rebuild result records from ``encode_results`` rows."""
+    records = []
+    for row in json.loads(payload):
+        record = {"index": row[0]}
+        if row[1] is not None:
+            record["id"] = row[1]
+        if len(row) == 3:
+            record["error"] = row[2]
+            records.append(record)
+            continue
+        _, _, sentiment, scores, emotion, probabilities, risk = row
+        record.update(
+            sentiment=SENTIMENT_LABELS[sentiment],
+            scores=dict(zip(SENTIMENT_LABELS, scores)),
+            emotion=EMOTION_LABELS[emotion],
+            probabilities=dict(zip(EMOTION_LABELS, probabilities)),
+        )
+        if risk is not None:
+            level, score, flags = risk
+            record["risk_analysis"] = {
+                "has_risk": len(flags) > 0,
+                "risk_level": RISK_LEVELS[level],
+                "risk_score": score,
+                "flags": flags,
+                "recommendations": get_risk_service().generate_recommendations(flags),
+            }
+        records.append(record)
+    return records
+
+
+def _encode_inputs(items: list[StreamItem]) -> str:
+    rows = [
+        [index, row_id, None, str(text)] if isinstance(text, Exception) else [index, row_id, text]
+        for index, row_id, text in items
+    ]
+    return json.dumps(rows, separators=(",", ":"))
+
+
+def _decode_inputs(payload: str) -> list[StreamItem]:
+    return [
+        (row[0], row[1], ValueError(row[3]) if len(row) == 4 else row[2])
+        for row in json.loads(payload)
+    ]
+
+
+class JobQueue:
+    """Create jobs, hand their chunks to workers and report their progress.
+
+    Redis calls use the job queue's own client and circuit breaker, so slow
+    chunk transfers neither time out at the cache's tight limits nor open the
+    breaker interactive traffic depends on. An unreachable Redis surfaces as
+    ``RedisUnavailableError``.
+    """
+
+    def __init__(self, client=None, chunk_size: int = JOB_CHUNK_SIZE):
+        self._client = client
+        self.chunk_size = chunk_size
+
+    async def _redis(self):
+        return self._client if self._client is not None else await get_job_redis_client()
+
+    async def _call(self, method: str, *args, **kwargs):
+        redis = await self._redis()
+        return await call_redis(
+            lambda: getattr(redis, method)(*args, **kwargs), redis_client.job_redis_breaker
+        )
+
+    async def _script(self, script: str, keys: list[str], *args):
+        return await self._call("eval", script, len(keys), *keys, *args)
+
+    async def create_job(self, items: AsyncIterator[StreamItem], include_risk: bool = False) -> str:
+        """Store the texts chunk by chunk and queue the chunks; returns the job id."""
+        job_id = uuid.uuid4().hex
+        chunks = 0
+        total = 0
+        batch = []
+        try:
+            async for item in items:
+                total += 1
+                if total > JOB_MAX_TEXTS:
+                    raise JobInputError(f"A job can hold at most {JOB_MAX_TEXTS} texts")
+                batch.append(item)
+                if len(batch) >= self.chunk_size:
+                    await self._store_chunk(job_id, chunks, batch)
+                    chunks, batch = chunks + 1, []
+            if batch:
+                await self._store_chunk(job_id, chunks, batch)
+                chunks += 1
+            if not chunks:
+                raise JobInputError("A job needs at least one text")
+        except Exception:
+            if chunks:
+                await self._call(
+                    "delete", *(self._key(job_id, f"input:{n}") for n in range(chunks))
+                )
+            raise
+
+        now = time.time()
+        await self._call(
+            "hset",
+            self._key(job_id),
+            mapping={
+                "total": total,
+                "chunks": chunks,
+                "chunk_size": self.chunk_size,
+                "include_risk": int(include_risk),
+                "processed": 0,
+                "errors": 0,
+                "created_at": now,
+                "updated_at": now,
+            },
+        )
+        await self._call("expire", self._key(job_id), JOB_TTL_SECONDS)
+        await self._call("rpush", QUEUE_KEY, *(f"{job_id}:{n}" for n in range(chunks)))
+        logger.info(f"Queued job {job_id} with {total} texts in {chunks} chunks")
+        return job_id
+
+    async def _store_chunk(self, job_id: str, chunk: int, items: list[StreamItem]) -> None:
+        await self._call(
+            "set", self._key(job_id, f"input:{chunk}"), _encode_inputs(items), ex=JOB_TTL_SECONDS
+        )
+
+    async def claim(self) -> dict[str, any] | None:
+        """Lease the next chunk off the queue, or None when the queue is empty."""
+        now = time.time()
+        claimed = await self._script(
+            _CLAIM_SCRIPT,
+            [QUEUE_KEY, PROCESSING_KEY],
+            now,
+            now + JOB_LEASE_SECONDS,
+            JOB_TTL_SECONDS,
+        )
+        if claimed is None:
+            return None
+        ref, attempt, include_risk, payload = claimed
+        job_id, chunk = ref.rsplit(":", 1)
+        return {
+            "job_id": job_id,
+            "chunk": int(chunk),
+            "attempt": attempt,
+            "include_risk": include_risk == "1",
+            "items": _decode_inputs(payload),
+        }
+
+    async def complete_chunk(self, job_id: str, chunk: int, records: list[dict[str, any]]) -> None:
+        errors = sum(1 for record in records if "error" in record)
+        await self._script(
+            _COMPLETE_SCRIPT,
+            [PROCESSING_KEY],
+            f"{job_id}:{chunk}",
+            encode_results(records),
+            len(records) - errors,
+            errors,
+            time.time(),
+            JOB_TTL_SECONDS,
+        )
+
+    async def fail_chunk(self, job_id: str, chunk: int, error: Exception | str) -> None:
+        """Put the chunk back on the queue, or mark it failed once out of attempts."""
+        await self._release(f"{job_id}:{chunk}", error)
+
+    async def _release(self, ref: str, error: Exception | str) -> bool:
+        """Release a leased chunk; False if its lease was already released or it is done."""
+        outcome, attempts = await self._script(
+            _RELEASE_SCRIPT,
+            [PROCESSING_KEY, QUEUE_KEY],
+            ref,
+            str(error),
+            time.time(),
+            JOB_MAX_ATTEMPTS,
+            JOB_TTL_SECONDS,
+        )
+        if outcome == 1:
+            logger.warning(f"Chunk {ref} failed, retrying: {error}")
+        elif outcome == 2:
+            logger.error(f"Chunk {ref} failed after {attempts} attempts: {error}")
+        return outcome != 0
+
+    async def requeue_expired(self) -> int:
+        """Release chunks whose worker's lease ran out; returns how many."""
+        released = 0
+        for ref in await self._call("zrangebyscore", PROCESSING_KEY, "-inf", time.time()):
+            released += await self._release(ref, "Worker lease expired")
+        return released
+
+    async def retry_failed(self, job_id: str) -> int:
+        """Queue the chunks that ran out of attempts again; returns how many."""
+        await self.get_meta(job_id)
+        retried = await self._script(
+            _RETRY_SCRIPT,
+            [self._key(job_id, "failed"), self._key(job_id, "attempts"), QUEUE_KEY],
+            job_id,
+        )
+        if retried:
+            logger.info(f"Retrying {retried} failed chunks of job {job_id}")
+        return retried
+
+    async def get_meta(self, job_id: str) -> dict[str, str]:
+        meta = await self._call("hgetall", self._key(job_id))
+        if not meta:
+            raise JobNotFoundError(f"Job {job_id} not found")
+        return meta
+
+    async def get_status(self, job_id: str) -> dict[str, any]:
+        meta = await self.get_meta(job_id)
+        chunks = int(meta["chunks"])
+        done = await self._call("scard", self._key(job_id, "done"))
+        failed = await self._call("scard", self._key(job_id, "failed"))
+
+        if done == chunks:
+            status = "completed"
+        elif done + failed == chunks:
+            status = "failed"
+        elif "started_at" in meta:
+            status = "running"
+        else:
+            status = "queued"
+
+        return {
+            "job_id": job_id,
+            "status": status,
+            "total": int(meta["total"]),
+            "processed": int(meta["processed"]),
+            "errors": int(meta["errors"]),
+            "chunks": chunks,
+            "chunks_completed": done,
+            "chunks_failed": failed,
+            "progress": done / chunks,
+            "include_risk": meta["include_risk"] == "1",
+            "created_at": float(meta["created_at"]),
+            "updated_at": float(meta["updated_at"]),
+            "last_error": meta.get("last_error"),
+        }
+
+    async def get_results(self, job_id: str, offset: int, limit: int) -> list[dict[str, any]]:
+        """Results of the texts in ``[offset, offset + limit)`` whose chunks are done."""
+        meta = await self.get_meta(job_id)
+        chunk_size = int(meta["chunk_size"])
+        end = min(offset + limit, int(meta["total"]))
+        if offset >= end:
+            return []
+        keys = [
+            self._key(job_id, f"result:{n}")
+            for n in range(offset // chunk_size, (end - 1) // chunk_size + 1)
+        ]
+        return [
+            record
+            for payload in await self._call("mget", keys)
+            if payload is not None
+            for record in decode_results(payload)
+            if offset <= record["index"] < end
+        ]
+
+    async def iter_results(self, job_id: str) -> AsyncIterator[dict[str, any]]:
+        """All completed results, one chunk in memory at a time."""
+        meta = await self.get_meta(job_id)
+        for chunk in range(int(meta["chunks"])):
+            payload = await self._call("get", self._key(job_id, f"result:{chunk}"))
+            if payload is not None:
+                for record in decode_results(payload):
+                    yield record
+
+    @staticmethod
+    def _key(job_id: str, suffix: str | None = None) -> str:
+        return f"job:{job_id}:{suffix}" if suffix else f"job:{job_id}"
+
+
+def get_job_queue() -> JobQueue:
+    return JobQueue()
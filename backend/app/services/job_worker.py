@@ -0,0 +1,130 @@
+"""Worker processes for the batch job queue.
+
+Usage:
+    python -m app.services.job_worker --processes 2
+
+Each process claims chunks from the job queue in Redis and runs them through
+batched sentiment, emotion and risk analysis. On SIGTERM or SIGINT a process
+finishes the chunk it holds and exits. Processes load their own models,
+or forward inference to the shared inference server when
+``INFERENCE_SERVER_SOCKET`` is set, which keeps one copy of the weights on the
+host however many workers run.
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+
+from app.models.model_loader import get_emotion_model, get_sentiment_model, load_models
+from app.services import inference_client
+from app.services.job_service import JobQueue, get_job_queue
+from app.services.startup import warm_classifier
+from app.services.stream_service import StreamAnalyzer
+from app.utils.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKER_PROCESSES = int(os.getenv("JOB_WORKER_PROCESSES", "1"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+
+
+class JobWorker:
+    """Claim chunks from the job queue and analyze them until stopped."""
+
+    def __init__(self, queue: JobQueue | None = None, poll_interval: float = JOB_POLL_INTERVAL):
+        self.queue = queue or get_job_queue()
+        self.poll_interval = poll_interval
+
+    async def process_next(self) -> bool:
+        """Analyze one chunk; returns False when the queue was empty."""
+        await self.queue.requeue_expired()
+        claim = await self.queue.claim()
+        if claim is None:
+            return False
+
+        job_id, chunk = claim["job_id"], claim["chunk"]
+        analyzer = StreamAnalyzer(include_risk=claim["include_risk"], raise_errors=True)
+        try:
+            records = await analyzer.analyze_batch(claim["items"])
+        except Exception as e:
+            await self.queue.fail_chunk(job_id, chunk, e)
+        else:
+            await self.queue.complete_chunk(job_id, chunk, records)
+            logger.info(f"Completed chunk {chunk} of job {job_id}")
+        return True
+
+    async def run(self, stop: asyncio.Event | None = None) -> None:
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            try:
+                if await self.process_next():
+                    continue
+            except Exception as e:
+                # Redis is unreachable or the breaker is open; back off and try again
+                logger.warning(f"Job worker could not reach the queue: {e}")
+            try:
+                await asyncio.wait_for(stop.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+async def _serve() -> None:
+    """Run a worker until SIGTERM or SIGINT, finishing the chunk in hand first."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+    await JobWorker().run(stop)
+    logger.info(f"Job worker {os.getpid()} stopped")
+
+
+def _run_worker() -> None:
+    setup_logging()
+    if not inference_client.inference_server_enabled():
+        load_models()
+        warm_classifier(get_sentiment_model)
+        warm_classifier(get_emotion_model)
+    logger.info(f"Job worker {os.getpid()} waiting for chunks")
+    asyncio.run(_serve())
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Worker processes for the batch job queue")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=JOB_WORKER_PROCESSES,
+        help="Worker processes to run; each loads its own models unless using the inference server",
+    )
+    args = parser.parse_args(argv)
+
+    if args.processes <= 1:
+        _run_worker()
+        return
+
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_run_worker) for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+
+    def stop(signum, frame):
+        # Each worker stops after its current chunk
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # The terminal sent SIGINT to the workers too; wait for them to stop
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
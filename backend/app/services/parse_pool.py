@@ -0,0 +1,142 @@
+"""Optional process pool that runs spaCy parsing off the API worker's GIL.
+
+With ``SPACY_PROCESS_POOL_SIZE`` > 0, aspect analysis sends texts to a pool of
+processes that each load spaCy once, and gets back ``ParsedDocument`` tables.
+Long documents then no longer stall the event loop, and parsing can use cores
+the API workers leave idle.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from app.models.model_loader import ModelNotReadyError
+from app.services import parse_worker
+from app.services.inference_executor import InferenceQueueFullError
+from app.services.parsed_document import ParsedDocument
+
+logger = logging.getLogger(__name__)
+
+SPACY_PROCESS_POOL_SIZE = int(os.getenv("SPACY_PROCESS_POOL_SIZE", "0"))
+SPACY_PROCESS_QUEUE_SIZE = int(os.getenv("SPACY_PROCESS_QUEUE_SIZE", "32"))
+
+
+class ParseQueueFullError(InferenceQueueFullError):
+    """Raised when the parse pool already has too many chunks waiting."""
+
+
+class ParsePool:
+    """Bounded process pool for spaCy parsing.
+
+    Texts are split into chunks of ``chunk_size`` that are parsed in parallel.
+    At most ``processes + max_queue`` chunks may be outstanding; beyond that
+    ``parse`` rejects immediately instead of queueing without limit. If a pool
+    process dies, the pool is replaced and the requests it was serving fail
+    with ``ModelNotReadyError``.
+    """
+
+    def __init__(self, processes: int, max_queue: int, chunk_size: int = 16):
+        self.processes = processes
+        self.max_queue = max_queue
+        self.chunk_size = chunk_size
+        self._executor = self._create_executor()
+        self._outstanding = 0
+        self._lock = threading.Lock()
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # spawn: forking an API worker would copy its threads and model state
+        return ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=parse_worker.init_worker,
+        )
+
+    def _replace_broken(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            # Concurrent requests see the same broken pool; only the first replaces it
+            if self._executor is not executor:
+                return
+            logger.error("spaCy parse pool process died, starting a new pool")
+            self._executor = self._create_executor()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _reserve(self, chunks: int) -> None:
+        with self._lock:
+            if self._outstanding + chunks > self.processes + self.max_queue:
+                raise ParseQueueFullError(
+                    f"Parse queue is full ({self._outstanding} chunks outstanding)"
+                )
+            self._outstanding += chunks
+
+    def _release(self, _future=None, chunks: int = 1) -> None:
+        with self._lock:
+            self._outstanding -= chunks
+
+    async def parse(self, texts: list[str]) -> list[ParsedDocument]:
+        chunks = [texts[i : i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        self._reserve(len(chunks))
+
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        futures = []
+        try:
+            for chunk in chunks:
+                future = executor.submit(parse_worker.parse_texts, chunk, self.chunk_size)
+                future.add_done_callback(self._release)
+                futures.append(asyncio.wrap_future(future, loop=loop))
+        except BrokenProcessPool as e:
+            self._replace_broken(executor)
+            raise ModelNotReadyError("spaCy parse pool is restarting") from e
+        finally:
+            # Submitted chunks give their reservation back when they finish
+            self._release(chunks=len(chunks) - len(futures))
+
+        try:
+            results = await asyncio.gather(*futures)
+        except BrokenProcessPool as e:
+            self._replace_broken(executor)
+            raise ModelNotReadyError("spaCy parse pool is restarting") from e
+
+        documents = []
+        for chunk_documents in results:
+            documents.extend(chunk_documents)
+        return documents
+
+    def warm(self) -> None:
+        """Start every pool process and wait until each has loaded spaCy."""
+        wait(
+            [
+                self._executor.submit(parse_worker.parse_texts, ["warmup"], 1)
+                for _ in range(self.processes)
+            ]
+        )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def parse_pool_enabled() -> bool:
+    return SPACY_PROCESS_POOL_SIZE > 0
+
+
+_parse_pool: ParsePool | None = None
+
+
+def get_parse_pool() -> ParsePool:
+    """Get or create the parse pool singleton."""
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ParsePool(SPACY_PROCESS_POOL_SIZE, SPACY_PROCESS_QUEUE_SIZE)
+        logger.info(f"Started spaCy parse pool with {SPACY_PROCESS_POOL_SIZE} processes")
+    return _parse_pool
+
+
+def shutdown_parse_pool() -> None:
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown()
+        _parse_pool = None
@@ -0,0 +1,21 @@
+"""Functions run inside spaCy parse pool processes.
+
+This module is imported by every pool process, so it only depends on spaCy
+and the plain-data document model.
+"""
+
+from app.models.spacy_loader import load_spacy_model
+from app.services.parsed_document import ParsedDocument, parse_documents
+
+_nlp = None
+
+
+def init_worker() -> None:
+    """Load spaCy once when the pool process starts."""
+    global _nlp
+    _nlp = load_spacy_model()
+
+
+def parse_texts(texts: list[str], batch_size: int) -> list[ParsedDocument]:
+    # Only the offset tables travel back to the API worker, not the spaCy Doc
+    return parse_documents(_nlp, texts, batch_size)
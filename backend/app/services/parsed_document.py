@@ -0,0 +1,86 @@
+"""Plain-data view of a spaCy parse, built once per text.
+
+Aspect extraction and context lookup only need entity, noun-chunk, noun and
+sentence offsets, so a request parses its text once and works from this
+compact structure instead of re-running the pipeline. It holds only strings,
+ints and lists, so it is cheap to keep and to pickle.
+"""
+
+import bisect
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ParsedDocument:
+    text: str
+    # (text, label, start_char, end_char)
+    entities: list[tuple[str, str, int, int]] = field(default_factory=list)
+    # (text, start_char, end_char)
+    noun_chunks: list[tuple[str, int, int]] = field(default_factory=list)
+    # (text, dep, idx) for every NOUN token
+    nouns: list[tuple[str, str, int]] = field(default_factory=list)
+    # Sorted, non-overlapping sentence boundaries
+    sentence_starts: list[int] = field(default_factory=list)
+    sentence_ends: list[int] = field(default_factory=list)
+
+    def sentence_at(self, offset: int) -> str | None:
+        """Text of the first sentence whose span contains ``offset`` (end inclusive)."""
+        i = bisect.bisect_left(self.sentence_ends, offset)
+        if i < len(self.sentence_starts) and self.sentence_starts[i] <= offset:
+            return self.text[self.sentence_starts[i] : self.sentence_ends[i]]
+        return None
+
+    def sentence_spans(self) -> list[tuple[int, int]]:
+        """Character spans of the non-blank sentences, or the whole text if unsplit.
+
+        Spans are trimmed of surrounding whitespace, which spaCy keeps as tokens.
+        """
+        bounds = list(zip(self.sentence_starts, self.sentence_ends)) or [(0, len(self.text))]
+        spans = []
+        for start, end in bounds:
+            sentence = self.text[start:end]
+            if sentence.strip():
+                start += len(sentence) - len(sentence.lstrip())
+                end -= len(sentence) - len(sentence.rstrip())
+                spans.append((start, end))
+        return spans
+
+
+def parse_document(nlp, text: str) -> ParsedDocument:
+    """Run the spaCy pipeline over ``text`` and keep what aspect analysis needs."""
+    return from_spacy_doc(nlp(text))
+
+
+def parse_documents(
+    nlp, texts: list[str], batch_size: int = 64, n_process: int = 1
+) -> list[ParsedDocument]:
+    """Parse many texts with ``nlp.pipe``, which batches them through the pipeline."""
+    return [
+        from_spacy_doc(doc) for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+    ]
+
+
+def from_spacy_doc(doc) -> ParsedDocument:
+    document = ParsedDocument(
+        text=doc.text,
+        entities=[(ent.text, ent.label_, ent.start_char, ent.end_char) for ent in doc.ents],
+        nouns=[(token.text, token.dep_, token.idx) for token in doc if token.pos_ == "NOUN"],
+    )
+
+    # Pipelines without a parser (e.g. the blank fallback) cannot give noun chunks
+    try:
+        document.noun_chunks = [
+            (chunk.text, chunk.start_char, chunk.end_char) for chunk in doc.noun_chunks
+        ]
+    except Exception:
+        pass
+
+    try:
+        for sent in doc.sents:
+            document.sentence_starts.append(sent.start_char)
+            document.sentence_ends.append(sent.end_char)
+    except ValueError:
+        # No sentence boundaries set; context falls back to a character window
+        pass
+
+    return document
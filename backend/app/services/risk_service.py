@@ -4,13 +4,74 @@ import logging
 import re
 from typing import Any
 
+import numpy as np
+
+try:
+    # Private to the re package; without it every pattern is scanned unfiltered
+    from re import _parser as sre_parse
+except ImportError:
+    sre_parse = None
+
 logger = logging.getLogger(__name__)
 
+# Lowercase characters that IGNORECASE matches against ASCII letters (dotless i
+# and long s). Texts containing them skip the literal prefilter to stay exact.
+_CASEFOLD_EXCEPTIONS = ("\u0131", "\u017f")
+
+# (pattern category, flag, score per matching pattern), in the order
+# detect_risks adds them; extreme_negativity is scored separately
+_CATEGORY_WEIGHTS = [
+    ("nuclear", "nuclear_threat", 0.6),
+    ("war", "war_conflict", 0.5),
+    ("escalation", "conflict_escalation", 0.45),
+    ("terrorism", "terrorism_extremism", 0.55),
+    ("violence", "violence_threat", 0.35),
+    ("self_harm", "self_harm", 0.5),
+    ("hate_speech", "cyberbullying", 0.4),
+    ("depression", "mental_health_distress", 0.35),
+]
+_HIGH_RISK_EMOTIONS = ["anger", "fear", "sadness", "disgust"]
+
+
+def _literal_prefixes(items, prefixes: set[str]) -> tuple[set[str], bool]:
+    """Extend ``prefixes`` with the literal text every match of ``items`` starts with.
+
+    Returns the prefixes and whether a non-literal element ended them early.
+    """
+    for op, av in items:
+        if op is sre_parse.AT:
+            continue  # \b and friends are zero-width
+        if op is sre_parse.LITERAL:
+            prefixes = {prefix + chr(av).lower() for prefix in prefixes}
+        elif op is sre_parse.SUBPATTERN:
+            prefixes, stopped = _literal_prefixes(av[-1], prefixes)
+            if stopped:
+                return prefixes, True
+        elif op is sre_parse.BRANCH:
+            branches = [_literal_prefixes(branch, prefixes) for branch in av[1]]
+            prefixes = set().union(*(branch_prefixes for branch_prefixes, _ in branches))
+            if any(stopped for _, stopped in branches):
+                return prefixes, True
+        else:
+            return prefixes, True
+    return prefixes, False
+
+
+def pattern_prefixes(pattern: str) -> set[str] | None:
+    """Literal strings one of which starts every match of ``pattern``, if derivable."""
+    if sre_parse is None:
+        return None
+    try:
+        prefixes, _ = _literal_prefixes(sre_parse.parse(pattern), {""})
+    except Exception:
+        return None
+    return None if "" in prefixes else prefixes
+
 
 class RiskDetectionService:
     """Service for detecting risk flags in text content."""
 
-    def __init__(self):
+    def __init__(self, prefilter: bool = True):
         """Initialize risk detection patterns."""
         # Nuclear and WMD threat patterns (CRITICAL - Global Security)
         self.nuclear_patterns = [
@@ -202,6 +263,33 @@ class RiskDetectionService:
             ],
         }
 
+        # Literal prefilter: a pattern can only match if the text contains one of
+        # the literal strings its matches start with. Substring checks run in C,
+        # so most patterns are ruled out without running the regex at all.
+        self.prefilter = prefilter
+        self.pattern_prefixes = {
+            category: [pattern_prefixes(p.pattern) for p in patterns]
+            for category, patterns in self.compiled_patterns.items()
+        }
+
+    def count_matches(self, text_lower: str) -> dict[str, int]:
+        """Number of patterns in each category that match the lowercased text."""
+        use_prefilter = self.prefilter and not any(c in text_lower for c in _CASEFOLD_EXCEPTIONS)
+        counts = {}
+        for category, patterns in self.compiled_patterns.items():
+            count = 0
+            for pattern, prefixes in zip(patterns, self.pattern_prefixes[category]):
+                if (
+                    use_prefilter
+                    and prefixes is not None
+                    and not any(prefix in text_lower for prefix in prefixes)
+                ):
+                    continue
+                if pattern.search(text_lower):
+                    count += 1
+            counts[category] = count
+        return counts
+
     def detect_risks(
         self, text: str, sentiment: str, emotion: str, sentiment_scores: dict = None
     ) -> dict[str, Any]:
@@ -218,6 +306,7 @@ class RiskDetectionService:
             Dictionary containing risk analysis results
         """
         text_lower = text.lower()
+        match_counts = self.count_matches(text_lower)
         flags = []
         risk_level = "low"
         risk_score = 0.0
@@ -228,75 +317,55 @@ class RiskDetectionService:
             negative_confidence = sentiment_scores.get("negative", 0.0)
 
         # Check for nuclear threats (CRITICAL - Global Security)
-        nuclear_matches = sum(
-            1 for pattern in self.compiled_patterns["nuclear"] if pattern.search(text_lower)
-        )
+        nuclear_matches = match_counts["nuclear"]
         if nuclear_matches > 0:
             flags.append("nuclear_threat")
             risk_score += nuclear_matches * 0.6  # Highest weight
 
         # Check for war/military conflict (SDG 16: Peace & Conflict)
-        war_matches = sum(
-            1 for pattern in self.compiled_patterns["war"] if pattern.search(text_lower)
-        )
+        war_matches = match_counts["war"]
         if war_matches > 0:
             flags.append("war_conflict")
             risk_score += war_matches * 0.5
 
         # Check for escalation language (Conflict Early Warning)
-        escalation_matches = sum(
-            1 for pattern in self.compiled_patterns["escalation"] if pattern.search(text_lower)
-        )
+        escalation_matches = match_counts["escalation"]
         if escalation_matches > 0:
             flags.append("conflict_escalation")
             risk_score += escalation_matches * 0.45
 
         # Check for terrorism (Critical Security)
-        terrorism_matches = sum(
-            1 for pattern in self.compiled_patterns["terrorism"] if pattern.search(text_lower)
-        )
+        terrorism_matches = match_counts["terrorism"]
         if terrorism_matches > 0:
             flags.append("terrorism_extremism")
             risk_score += terrorism_matches * 0.55
 
         # Check for violence (SDG 16: Direct Violence)
-        violence_matches = sum(
-            1 for pattern in self.compiled_patterns["violence"] if pattern.search(text_lower)
-        )
+        violence_matches = match_counts["violence"]
         if violence_matches > 0:
             flags.append("violence_threat")
             risk_score += violence_matches * 0.35
 
         # Check for self-harm (Critical - highest priority)
-        self_harm_matches = sum(
-            1 for pattern in self.compiled_patterns["self_harm"] if pattern.search(text_lower)
-        )
+        self_harm_matches = match_counts["self_harm"]
         if self_harm_matches > 0:
             flags.append("self_harm")
             risk_score += self_harm_matches * 0.5
 
         # Check for hate speech/cyberbullying (SDG 16: Online Abuse)
-        hate_matches = sum(
-            1 for pattern in self.compiled_patterns["hate_speech"] if pattern.search(text_lower)
-        )
+        hate_matches = match_counts["hate_speech"]
         if hate_matches > 0:
             flags.append("cyberbullying")
             risk_score += hate_matches * 0.4
 
         # Check for depression indicators (SDG 3: Mental Health)
-        depression_matches = sum(
-            1 for pattern in self.compiled_patterns["depression"] if pattern.search(text_lower)
-        )
+        depression_matches = match_counts["depression"]
         if depression_matches > 0:
             flags.append("mental_health_distress")
             risk_score += depression_matches * 0.35
 
         # Check for extreme negativity
-        extreme_neg_matches = sum(
-            1
-            for pattern in self.compiled_patterns["extreme_negativity"]
-            if pattern.search(text_lower)
-        )
+        extreme_neg_matches = match_counts["extreme_negativity"]
         if extreme_neg_matches >= 2:  # Multiple negative indicators
             flags.append("extreme_negativity")
             risk_score += 0.2
@@ -324,15 +393,11 @@ class RiskDetectionService:
 
         if emotion == "anger" and sentiment == "negative":
             # Anger + negative = potential violence/conflict
-            if "violence_threat" not in flags and any(
-                pattern.search(text_lower) for pattern in self.compiled_patterns["violence"]
-            ):
+            if "violence_threat" not in flags and violence_matches > 0:
                 flags.append("violence_threat")
                 risk_score += 0.15
 
-        if emotion == "disgust" and any(
-            pattern.search(text_lower) for pattern in self.compiled_patterns["hate_speech"]
-        ):
+        if emotion == "disgust" and hate_matches > 0:
             # Disgust + hate patterns = stronger cyberbullying indicator
             risk_score += 0.15
 
@@ -345,7 +410,7 @@ class RiskDetectionService:
             risk_level = "low"
 
         # Generate recommendations
-        recommendations = self._generate_recommendations(flags)
+        recommendations = self.generate_recommendations(flags)
 
         return {
             "has_risk": len(flags) > 0,
@@ -355,7 +420,103 @@ class RiskDetectionService:
             "recommendations": recommendations,
         }
 
-    def _generate_recommendations(self, flags: list[str]) -> list[str]:
+    def detect_risks_batch(
+        self,
+        texts: list[str],
+        sentiments: list[str],
+        emotions: list[str],
+        sentiment_scores: list[dict] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Batch form of ``detect_risks`` with the score arithmetic done in NumPy.
+
+        Each text is still scanned with the risk patterns once; the weights,
+        sentiment and emotion bonuses and level thresholds are then applied to
+        the whole batch at once. Scores are accumulated in the same order as
+        ``detect_risks``, so results are identical to calling it per text.
+        """
+        if not texts:
+            return []
+        if sentiment_scores is None:
+            sentiment_scores = [{}] * len(texts)
+
+        counts = [self.count_matches(text.lower()) for text in texts]
+        sentiment = np.array(sentiments)
+        emotion = np.array(emotions)
+        negative = sentiment == "negative"
+        negative_confidence = np.array(
+            [(scores or {}).get("negative", 0.0) for scores in sentiment_scores], dtype=float
+        )
+
+        risk_score = np.zeros(len(texts))
+        flag_columns = {}
+        category_counts = {}
+        for category, flag, weight in _CATEGORY_WEIGHTS:
+            matches = np.array([c[category] for c in counts])
+            category_counts[category] = matches
+            flag_columns[flag] = matches > 0
+            risk_score += np.where(matches > 0, matches * weight, 0.0)
+
+        extreme = np.array([c["extreme_negativity"] for c in counts]) >= 2
+        flag_columns["extreme_negativity"] = extreme
+        risk_score += np.where(extreme, 0.2, 0.0)
+
+        risk_score += np.select(
+            [
+                negative & (negative_confidence > 0.8),
+                negative & (negative_confidence > 0.6),
+                negative,
+            ],
+            [0.25, 0.15, 0.1],
+            0.0,
+        )
+        risk_score += np.where(np.isin(emotion, _HIGH_RISK_EMOTIONS), 0.2, 0.0)
+
+        # Emotion + sentiment combinations, as in detect_risks
+        distress_from_emotion = (
+            (emotion == "sadness")
+            & negative
+            & (negative_confidence > 0.7)
+            & ~flag_columns["mental_health_distress"]
+        )
+        risk_score += np.where(distress_from_emotion, 0.2, 0.0)
+
+        violence_from_emotion = (
+            (emotion == "anger")
+            & negative
+            & ~flag_columns["violence_threat"]
+            & (category_counts["violence"] > 0)
+        )
+        risk_score += np.where(violence_from_emotion, 0.15, 0.0)
+
+        risk_score += np.where(
+            (emotion == "disgust") & (category_counts["hate_speech"] > 0), 0.15, 0.0
+        )
+
+        risk_level = np.select([risk_score >= 0.7, risk_score >= 0.4], ["high", "medium"], "low")
+        capped_score = np.minimum(1.0, risk_score)
+
+        # Pattern flags first, then the flags added by emotion combinations
+        flag_order = [*flag_columns.items()]
+        flag_order += [
+            ("mental_health_distress", distress_from_emotion),
+            ("violence_threat", violence_from_emotion),
+        ]
+        results = []
+        for i in range(len(texts)):
+            flags = [flag for flag, column in flag_order if column[i]]
+            results.append(
+                {
+                    "has_risk": len(flags) > 0,
+                    "risk_level": str(risk_level[i]),
+                    "risk_score": float(capped_score[i]),
+                    "flags": flags,
+                    "recommendations": self.generate_recommendations(flags),
+                }
+            )
+        return results
+
+    def generate_recommendations(self, flags: list[str]) -> list[str]:
         """Generate recommendations based on detected flags."""
         recommendations = []
 
@@ -0,0 +1,16 @@
+"""Sentence splitting shared by the sentence-level services."""
+
+import asyncio
+
+from app.services.aspect_service import get_nlp_model
+from app.services.parse_pool import get_parse_pool, parse_pool_enabled
+from app.services.parsed_document import parse_document
+
+
+async def split_sentences(text: str) -> list[tuple[int, int]]:
+    """Sentence spans of ``text`` from the spaCy pipeline, off the event loop."""
+    if parse_pool_enabled():
+        document = (await get_parse_pool().parse([text]))[0]
+    else:
+        document = await asyncio.to_thread(parse_document, get_nlp_model(), text)
+    return document.sentence_spans()
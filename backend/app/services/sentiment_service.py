@@ -1,85 +1,234 @@
 import hashlib
-import json
 import logging
-
-import torch
-import torch.nn.functional as F  # noqa: N812
+import threading
+from collections.abc import Callable
 
 from app.models.model_loader import get_sentiment_model
-from app.utils.redis_client import get_redis_client
+from app.models.ngram_model import SENTIMENT_CASCADE_THRESHOLD, get_sentiment_cascade
+from app.services.batching import (
+    MicroBatcher,
+    analyze_cached_batch,
+    predict_proba,
+    predict_proba_bucketed,
+    predict_windows,
+)
+from app.services.inference_client import (
+    RemoteBatcher,
+    get_inference_client,
+    inference_server_enabled,
+)
+from app.services.inference_executor import get_inference_executor
+from app.utils.cache import cache_get
+from app.utils.single_flight import compute_once
 
 logger = logging.getLogger(__name__)
 
+# Updated from the inference executor's threads
+_cascade_stats = {"answered": 0, "escalated": 0}
+_cascade_stats_lock = threading.Lock()
+
+
+def get_cascade_stats() -> dict[str, int]:
+    """How many texts the first-stage model answered or sent on to the transformer."""
+    with _cascade_stats_lock:
+        return dict(_cascade_stats)
+
+
+def cached_sentiment_usable(result: dict[str, any]) -> bool:
+    """Whether a cached sentiment result may be served under the current settings.
+
+    Cascade answers are tagged with ``source``; they are only valid while the
+    cascade is enabled and was at least as confident as the current threshold.
+    """
+    if result.get("source") != "cascade":
+        return True
+    return (
+        get_sentiment_cascade() is not None
+        and max(result["scores"].values()) >= SENTIMENT_CASCADE_THRESHOLD
+    )
+
+
+def build_sentiment_result(scores: dict[str, float]) -> dict[str, any]:
+    """Response dict for sentiment scores keyed by positive, neutral and negative."""
+    positive_score = scores.get("positive", 0.0)
+    negative_score = scores.get("negative", 0.0)
+    neutral_score = scores.get("neutral", 0.0)
+
+    if abs(positive_score - negative_score) < 0.15:
+        sentiment = "neutral"
+    else:
+        sentiment = max(scores.items(), key=lambda x: x[1])[0]
+
+    result_scores = {
+        "positive": positive_score,
+        "neutral": neutral_score,
+        "negative": negative_score,
+    }
+
+    # Confidence is the score for the chosen sentiment
+    confidence = float(result_scores.get(sentiment, 0.0))
+
+    # probabilities mirrors scores for backward compatibility with older clients
+    probabilities = dict(result_scores)
+
+    return {
+        "sentiment": sentiment,
+        "scores": result_scores,
+        "confidence": confidence,
+        "probabilities": probabilities,
+    }
+
 
 class SentimentService:
     def __init__(self):
-        self.tokenizer, self.model = get_sentiment_model()
-        self.id2label = self.model.config.id2label
+        # With a shared inference server the models live in that process instead
+        if not inference_server_enabled():
+            self.tokenizer, self.model = get_sentiment_model()
+            self.id2label = self.model.config.id2label
 
     def _get_cache_key(self, text: str) -> str:
         text_hash = hashlib.sha256(text.encode()).hexdigest()
-        return f"sentiment:v3:{text_hash}"
+        return f"sentiment:v4:{text_hash}"
+
+    def _get_long_cache_key(self, text: str) -> str:
+        text_hash = hashlib.sha256(text.encode()).hexdigest()
+        return f"sentiment:long:v1:{text_hash}"
 
     async def analyze(self, text: str) -> dict[str, any]:
         cache_key = self._get_cache_key(text)
-        redis_client = await get_redis_client()
 
-        cached_result = await redis_client.get(cache_key)
-        if cached_result:
+        cached_result = await cache_get(cache_key)
+        if cached_result and cached_sentiment_usable(cached_result):
             logger.info("Cache hit")
-            return json.loads(cached_result)
+            return cached_result
 
         logger.info("Cache miss, computing sentiment")
-        result = self._compute_sentiment(text)
+        return await compute_once(cache_key, lambda: get_sentiment_batcher().submit(text))
 
-        await redis_client.setex(cache_key, 3600, json.dumps(result))
-        return result
+    async def analyze_batch(
+        self, texts: list[str], computed: set[int] | None = None
+    ) -> list[dict[str, any] | Exception]:
+        """Analyze many texts at once; failed items are returned as exceptions.
+
+        Indexes of texts this call computed, not cached or shared, are added to ``computed``.
+        """
+        return await analyze_cached_batch(
+            texts, self._get_cache_key, self._infer_bulk, computed, usable=cached_sentiment_usable
+        )
+
+    async def analyze_long(self, text: str) -> dict[str, any]:
+        """Analyze the whole of a long text with overlapping windows, with per-window results."""
+        cache_key = self._get_long_cache_key(text)
+
+        cached_result = await cache_get(cache_key)
+        if cached_result:
+            logger.info("Cache hit")
+            return cached_result
+
+        logger.info("Cache miss, computing long-document sentiment")
+        return await compute_once(cache_key, lambda: self._infer_long(text))
+
+    async def _infer_long(self, text: str) -> dict[str, any]:
+        if inference_server_enabled():
+            return (await get_inference_client().infer("sentiment", [text], long=True))[0]
+        return await get_inference_executor().run(self._compute_sentiment_long, text)
+
+    async def _infer_bulk(self, texts: list[str]) -> list[dict[str, any] | Exception]:
+        if inference_server_enabled():
+            return await get_inference_client().infer("sentiment", texts, bulk=True)
+        return await get_inference_executor().run(self._compute_sentiment_bulk, texts)
 
     def _compute_sentiment(self, text: str) -> dict[str, any]:
-        inputs = self.tokenizer(
-            text, return_tensors="pt", truncation=True, max_length=512, padding=True
+        return self._compute_sentiment_batch([text])[0]
+
+    def _compute_sentiment_batch(self, texts: list[str]) -> list[dict[str, any]]:
+        return self._with_cascade(
+            texts,
+            lambda rest: [
+                self._build_result(probs)
+                for probs in predict_proba(self.tokenizer, self.model, rest)
+            ],
         )
 
-        with torch.inference_mode():
-            outputs = self.model(**inputs)
-            logits = outputs.logits
-            probabilities = F.softmax(logits, dim=-1)
+    def _compute_sentiment_bulk(self, texts: list[str]) -> list[dict[str, any] | Exception]:
+        return self._with_cascade(
+            texts,
+            lambda rest: [
+                probs if isinstance(probs, Exception) else self._build_result(probs)
+                for probs in predict_proba_bucketed(self.tokenizer, self.model, rest)
+            ],
+        )
 
-        probs = probabilities[0].tolist()
+    def _with_cascade(self, texts: list[str], transformer: Callable[[list[str]], list]) -> list:
+        """Answer confidently classified texts with the first-stage model, if enabled.
+
+        The remaining texts are passed to ``transformer`` together. First-stage
+        answers carry ``source: cascade`` so the cache can tell them apart.
+        """
+        cascade = get_sentiment_cascade()
+        if cascade is None:
+            return transformer(texts)
+
+        results = [None] * len(texts)
+        escalated = []
+        for i, probs in enumerate(cascade.predict_proba(texts)):
+            if probs.max() >= SENTIMENT_CASCADE_THRESHOLD:
+                results[i] = {
+                    **build_sentiment_result(
+                        {label: float(prob) for label, prob in zip(cascade.labels, probs)}
+                    ),
+                    "source": "cascade",
+                }
+            else:
+                escalated.append(i)
+
+        with _cascade_stats_lock:
+            _cascade_stats["answered"] += len(texts) - len(escalated)
+            _cascade_stats["escalated"] += len(escalated)
+        if escalated:
+            rows = transformer([texts[i] for i in escalated])
+            for i, row in zip(escalated, rows, strict=True):
+                results[i] = row
+        return results
+
+    def _compute_sentiment_long(self, text: str) -> dict[str, any]:
+        scored = predict_windows(self.tokenizer, self.model, text)
+        result = self._build_result(scored["probabilities"])
+        result["windows"] = [
+            {
+                "start": window["start"],
+                "end": window["end"],
+                "tokens": window["tokens"],
+                **self._build_result(window["probabilities"]),
+            }
+            for window in scored["windows"]
+        ]
+        return result
 
+    def _build_result(self, probs: list[float]) -> dict[str, any]:
         scores = {}
         for idx, prob in enumerate(probs):
             label = self.id2label.get(idx, "").lower()
             scores[label] = float(prob)
+        return build_sentiment_result(scores)
 
-        positive_score = scores.get("positive", 0.0)
-        negative_score = scores.get("negative", 0.0)
-        neutral_score = scores.get("neutral", 0.0)
-
-        if abs(positive_score - negative_score) < 0.15:
-            sentiment = "neutral"
-        else:
-            sentiment = max(scores.items(), key=lambda x: x[1])[0]
 
-        result_scores = {
-            "positive": positive_score,
-            "neutral": neutral_score,
-            "negative": negative_score,
-        }
-
-        # Confidence is the score for the chosen sentiment
-        confidence = float(result_scores.get(sentiment, 0.0))
+def get_sentiment_service() -> SentimentService:
+    return SentimentService()
 
-        # probabilities mirrors scores for backward compatibility with older clients
-        probabilities = dict(result_scores)
 
-        return {
-            "sentiment": sentiment,
-            "scores": result_scores,
-            "confidence": confidence,
-            "probabilities": probabilities,
-        }
+# Shared across requests so concurrent cache misses land in the same batch
+_sentiment_batcher: MicroBatcher | None = None
 
 
-def get_sentiment_service() -> SentimentService:
-    return SentimentService()
+def get_sentiment_batcher() -> MicroBatcher | RemoteBatcher:
+    """Get or create the sentiment micro-batcher singleton."""
+    global _sentiment_batcher
+    if _sentiment_batcher is None and inference_server_enabled():
+        _sentiment_batcher = RemoteBatcher("sentiment")
+    elif _sentiment_batcher is None:
+        _sentiment_batcher = MicroBatcher(
+            lambda texts: get_sentiment_service()._compute_sentiment_batch(texts),
+            name="sentiment",
+        )
+    return _sentiment_batcher
@@ -0,0 +1,96 @@
+"""Background model loading and warmup with per-component readiness."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+
+from app.models import model_loader
+from app.services.aspect_service import get_nlp_model
+from app.services.batching import predict_proba
+from app.services.inference_client import get_inference_client, inference_server_enabled
+from app.services.parse_pool import get_parse_pool, parse_pool_enabled
+
+logger = logging.getLogger(__name__)
+
+# Token lengths exercised during warmup so the first real requests of each
+# common size do not pay for lazy kernel and allocator initialization
+WARMUP_LENGTHS = (16, 64, 256)
+
+_component_status: dict[str, dict[str, any]] = {
+    name: {"state": "pending"} for name in ("sentiment", "emotion", "spacy")
+}
+_status_lock = threading.Lock()
+
+
+def get_component_status() -> dict[str, dict[str, any]]:
+    """Snapshot of each component's state: pending, loading, warming, ready or failed."""
+    with _status_lock:
+        return {name: dict(status) for name, status in _component_status.items()}
+
+
+def _set_status(name: str, **fields) -> None:
+    with _status_lock:
+        _component_status[name].update(fields)
+
+
+def warm_classifier(getter: Callable) -> None:
+    """Run forward passes at the common sequence lengths."""
+    tokenizer, model = getter()
+    for length in WARMUP_LENGTHS:
+        # Each "warmup" word is roughly one token for both tokenizers
+        predict_proba(tokenizer, model, [" ".join(["warmup"] * length)])
+
+
+def _warm_nlp() -> None:
+    get_nlp_model()("Warmup sentence for the parser. Apple released a new product today.")
+    if parse_pool_enabled():
+        get_parse_pool().warm()
+
+
+def _bring_up(name: str, load: Callable[[], None], warm: Callable[[], None]) -> None:
+    try:
+        _set_status(name, state="loading", error=None)
+        start = time.perf_counter()
+        load()
+        loaded = time.perf_counter()
+        _set_status(name, state="warming", load_seconds=round(loaded - start, 3))
+
+        warm()
+        _set_status(name, state="ready", warmup_seconds=round(time.perf_counter() - loaded, 3))
+        logger.info(f"Component '{name}' ready")
+    except Exception as e:
+        logger.error(f"Failed to bring up component '{name}': {e}", exc_info=True)
+        _set_status(name, state="failed", error=str(e))
+
+
+def start_background_loading() -> list[threading.Thread]:
+    """Load and warm the transformers and the spaCy pipeline concurrently.
+
+    Returns immediately; each component becomes usable as soon as it has loaded,
+    independently of the others.
+    """
+    components = {
+        "sentiment": (
+            model_loader.load_sentiment_model,
+            lambda: warm_classifier(model_loader.get_sentiment_model),
+        ),
+        "emotion": (
+            model_loader.load_emotion_model,
+            lambda: warm_classifier(model_loader.get_emotion_model),
+        ),
+        "spacy": (get_nlp_model, _warm_nlp),
+    }
+    if inference_server_enabled():
+        # The inference server loads and warms the transformers; wait until it answers
+        for name in ("sentiment", "emotion"):
+            components[name] = (get_inference_client().wait_until_ready, lambda: None)
+
+    threads = []
+    for name, (load, warm) in components.items():
+        thread = threading.Thread(
+            target=_bring_up, args=(name, load, warm), name=f"startup-{name}", daemon=True
+        )
+        thread.start()
+        threads.append(thread)
+    return threads
@@ -0,0 +1,296 @@
+"""Streaming bulk analysis over NDJSON or CSV request bodies.
+
+Texts are read from the request body as it arrives, grouped into batches and
+fed through the batched inference path, and results are streamed back as
+NDJSON. At most ``max_in_flight`` batches are being analyzed at a time; while
+the window is full the request body is not read any further, so memory stays
+bounded by the window rather than by the size of the upload.
+"""
+
+import asyncio
+import csv
+import json
+import logging
+import os
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+from app.models.model_loader import ModelNotReadyError
+from app.services.emotion_service import get_emotion_service
+from app.services.inference_executor import InferenceQueueFullError
+from app.services.risk_service import get_risk_service
+from app.services.sentiment_service import get_sentiment_service
+
+logger = logging.getLogger(__name__)
+
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "32"))
+STREAM_MAX_IN_FLIGHT = int(os.getenv("STREAM_MAX_IN_FLIGHT", "4"))
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", str(256 * 1024)))
+MAX_TEXT_LENGTH = 10000
+
+# Row failures that say nothing about the row itself; a retry may succeed
+RETRYABLE_ERRORS = (ModelNotReadyError, InferenceQueueFullError)
+
+# (index, caller-supplied id, text or the reason the row could not be read)
+StreamItem = tuple[int, any, str | Exception]
+
+
+async def read_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int = STREAM_MAX_LINE_BYTES
+) -> AsyncIterator[str | Exception]:
+    """Split a byte stream into decoded lines without buffering the whole body.
+
+    A line longer than ``max_line_bytes`` is dropped as it arrives and a
+    ``ValueError`` is yielded in its place.
+    """
+    pieces: list[bytes] = []
+    size = 0
+    async for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) != -1:
+            size += end - start
+            if size > max_line_bytes:
+                yield _line_too_long(max_line_bytes)
+            else:
+                pieces.append(chunk[start:end])
+                yield _decode_line(b"".join(pieces))
+            pieces, size = [], 0
+            start = end + 1
+        size += len(chunk) - start
+        if size <= max_line_bytes:
+            pieces.append(chunk[start:])
+        else:
+            pieces = []
+    if size > max_line_bytes:
+        yield _line_too_long(max_line_bytes)
+    elif size:
+        yield _decode_line(b"".join(pieces))
+
+
+def _decode_line(line: bytes) -> str:
+    return line.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def _line_too_long(max_line_bytes: int) -> ValueError:
+    return ValueError(f"Line exceeds {max_line_bytes} bytes")
+
+
+async def parse_ndjson(lines: AsyncIterator[str | Exception]) -> AsyncIterator[StreamItem]:
+    """Rows are ``{"text": ..., "id": ...}`` objects or bare JSON strings."""
+    index = 0
+    async for line in lines:
+        if isinstance(line, Exception):
+            yield index, None, line
+            index += 1
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+            if isinstance(row, str):
+                yield index, None, row
+            elif isinstance(row, dict) and isinstance(row.get("text"), str):
+                yield index, row.get("id"), row["text"]
+            else:
+                raise ValueError('Expected a JSON string or an object with a "text" field')
+        except ValueError as e:
+            yield index, None, e
+        index += 1
+
+
+async def parse_csv(
+    lines: AsyncIterator[str | Exception], max_record_chars: int = STREAM_MAX_LINE_BYTES
+) -> AsyncIterator[StreamItem]:
+    """CSV with a header row; texts come from the ``text`` column (else the first)
+    and ids from an optional ``id`` column. Quoted fields may span lines.
+
+    A record whose quote is never closed, or that grows past ``max_record_chars``
+    while one is open, becomes an error row and parsing resumes on the next line.
+    """
+    header = None
+    index = 0
+    record = ""
+    quotes = 0
+    async for line in lines:
+        if isinstance(line, Exception) or len(record) + len(line) > max_record_chars:
+            if not isinstance(line, Exception):
+                line = ValueError(f"Record exceeds {max_record_chars} characters")
+            yield index, None, line
+            index += 1
+            record, quotes = "", 0
+            continue
+        record = f"{record}\n{line}" if record else line
+        quotes += line.count('"')
+        # An odd number of quotes means a quoted field continues on the next line
+        if quotes % 2:
+            continue
+        fields, record, quotes = next(csv.reader([record]), []), "", 0
+        if not fields:
+            continue
+        if header is None:
+            header = fields
+            text_column = header.index("text") if "text" in header else 0
+            id_column = header.index("id") if "id" in header else None
+            continue
+        if text_column < len(fields):
+            row_id = (
+                fields[id_column] if id_column is not None and id_column < len(fields) else None
+            )
+            yield index, row_id, fields[text_column]
+        else:
+            yield index, None, ValueError("Row has no text column")
+        index += 1
+    if record:
+        yield index, None, ValueError("Unterminated quoted field at end of input")
+
+
+class StreamAnalyzer:
+    """Analyze a stream of texts in batches and yield one result record per text.
+
+    Rows that cannot be analyzed get an ``error`` record. With ``raise_errors``,
+    failures of the whole batch, and rows that failed because the model was not
+    ready or its queue was full, are raised instead so the caller can retry the
+    batch; a row the model failed on by itself still becomes an error record.
+    """
+
+    def __init__(
+        self,
+        include_risk: bool = False,
+        batch_size: int = STREAM_BATCH_SIZE,
+        max_in_flight: int = STREAM_MAX_IN_FLIGHT,
+        raise_errors: bool = False,
+    ):
+        self.include_risk = include_risk
+        self.raise_errors = raise_errors
+        self.batch_size = max(1, batch_size)
+        self.max_in_flight = max(1, max_in_flight)
+        self.sentiment_service = get_sentiment_service()
+        self.emotion_service = get_emotion_service()
+
+    async def analyze(
+        self, items: AsyncIterator[StreamItem], ordered: bool = True
+    ) -> AsyncIterator[dict[str, any]]:
+        """Yield records in input order, or as batches complete with ``ordered=False``."""
+        async for record in stream_batches(
+            items, self.analyze_batch, self.batch_size, self.max_in_flight, ordered
+        ):
+            yield record
+
+    async def analyze_batch(self, items: list[StreamItem]) -> list[dict[str, any]]:
+        records = {}
+        valid = []
+        for index, row_id, text in items:
+            if not isinstance(text, Exception):
+                text = text.strip()
+                if not text:
+                    text = ValueError("Text cannot be empty or whitespace only")
+                elif len(text) > MAX_TEXT_LENGTH:
+                    text = ValueError(f"Text exceeds {MAX_TEXT_LENGTH} characters")
+            if isinstance(text, Exception):
+                records[index] = _record(index, row_id, error=str(text))
+            else:
+                valid.append((index, row_id, text))
+
+        if valid:
+            try:
+                await self._analyze_valid(valid, records)
+            except Exception as e:
+                if self.raise_errors:
+                    raise
+                logger.warning(f"Streaming batch of {len(valid)} failed: {e}")
+                for index, row_id, _ in valid:
+                    records[index] = _record(index, row_id, error=str(e))
+
+        return [records[index] for index, _, _ in items]
+
+    async def _analyze_valid(self, valid: list[tuple[int, any, str]], records: dict) -> None:
+        texts = [text for _, _, text in valid]
+        sentiment_results, emotion_results = await asyncio.gather(
+            self.sentiment_service.analyze_batch(texts),
+            self.emotion_service.analyze_batch(texts),
+        )
+
+        analyzed = []
+        for (index, row_id, text), sentiment, emotion in zip(
+            valid, sentiment_results, emotion_results, strict=True
+        ):
+            error = next((r for r in (sentiment, emotion) if isinstance(r, Exception)), None)
+            if error is not None:
+                if self.raise_errors and isinstance(error, RETRYABLE_ERRORS):
+                    raise error
+                records[index] = _record(index, row_id, error=str(error))
+                continue
+            records[index] = _record(
+                index,
+                row_id,
+                sentiment=sentiment["sentiment"],
+                scores=sentiment["scores"],
+                emotion=emotion["emotion"],
+                probabilities=emotion["probabilities"],
+            )
+            analyzed.append((index, text, sentiment, emotion))
+
+        if self.include_risk and analyzed:
+            risks = await asyncio.to_thread(
+                get_risk_service().detect_risks_batch,
+                [text for _, text, _, _ in analyzed],
+                [sentiment["sentiment"] for _, _, sentiment, _ in analyzed],
+                [emotion["emotion"] for _, _, _, emotion in analyzed],
+                [sentiment["scores"] for _, _, sentiment, _ in analyzed],
+            )
+            for (index, _, _, _), risk in zip(analyzed, risks, strict=True):
+                records[index]["risk_analysis"] = risk
+
+
+def _record(index: int, row_id: any, **fields) -> dict[str, any]:
+    record = {"index": index}
+    if row_id is not None:
+        record["id"] = row_id
+    record.update(fields)
+    return record
+
+
+async def stream_batches(
+    items: AsyncIterator[StreamItem],
+    process: Callable[[list[StreamItem]], Awaitable[list[dict]]],
+    batch_size: int,
+    max_in_flight: int,
+    ordered: bool = True,
+) -> AsyncIterator[dict[str, any]]:
+    """Run ``process`` over batches of ``items`` with at most ``max_in_flight`` running.
+
+    Input is only pulled while the window has room, which is what bounds memory.
+    """
+    pending: deque[asyncio.Task] = deque()
+
+    async def drain(until: int):
+        while len(pending) > until:
+            if ordered:
+                done = [pending.popleft()]
+                await done[0]
+            else:
+                finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                done = [task for task in pending if task in finished]
+                for task in done:
+                    pending.remove(task)
+            for task in done:
+                for record in task.result():
+                    yield record
+
+    try:
+        batch = []
+        async for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                pending.append(asyncio.create_task(process(batch)))
+                batch = []
+                async for record in drain(max_in_flight - 1):
+                    yield record
+        if batch:
+            pending.append(asyncio.create_task(process(batch)))
+        async for record in drain(0):
+            yield record
+    finally:
+        # The client went away or the stream failed; stop the remaining batches
+        for task in pending:
+            task.cancel()
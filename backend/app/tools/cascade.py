@@ -0,0 +1,178 @@
+"""Train and evaluate the first-stage sentiment model of the inference cascade.
+
+Usage:
+    python -m app.tools.cascade train --corpus texts.txt --output cascade.npz
+    python -m app.tools.cascade evaluate --corpus held_out.txt --model cascade.npz
+
+The model learns from the transformer's own results for the corpus texts. They
+are read from the result cache, so texts the API has already analyzed cost
+nothing; cached answers of the cascade itself are ignored. With
+``--label-missing`` the remaining texts are run through the transformer
+locally, otherwise they are skipped.
+
+``evaluate`` reports, per confidence threshold, the fraction of texts the
+first stage would answer on its own and how often the final label agrees with
+the transformer's. Pick the threshold for ``SENTIMENT_CASCADE_THRESHOLD`` from
+this report.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from app.models.ngram_model import HashedNgramModel
+from app.services.sentiment_service import SentimentService, build_sentiment_result
+from app.utils.cache import cache_get_many
+from app.utils.logging_config import setup_logging
+from app.utils.result_codec import SENTIMENT_LABELS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLDS = [0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.99]
+
+
+def reference_scores(texts: list[str], label_missing: bool = False) -> list[dict | None]:
+    """The transformer's sentiment scores per text, from the cache or computed locally."""
+    service = SentimentService.__new__(SentimentService)
+    cached = asyncio.run(cache_get_many([service._get_cache_key(text) for text in texts]))
+    # Answers of the first stage itself must not become its own training targets
+    scores = [
+        result["scores"] if result and result.get("source") != "cascade" else None
+        for result in cached
+    ]
+    missing = [i for i, result in enumerate(scores) if result is None]
+    logger.info(f"Found cached results for {len(texts) - len(missing)} of {len(texts)} texts")
+
+    if missing and label_missing:
+        from app.models import model_loader
+        from app.services.batching import predict_proba_bucketed
+
+        model_loader.load_sentiment_model()
+        service.tokenizer, service.model = model_loader.get_sentiment_model()
+        service.id2label = service.model.config.id2label
+        logger.info(f"Labeling {len(missing)} texts with the transformer")
+        rows = predict_proba_bucketed(service.tokenizer, service.model, [texts[i] for i in missing])
+        for i, probs in zip(missing, rows, strict=True):
+            if not isinstance(probs, Exception):
+                scores[i] = service._build_result(probs)["scores"]
+    return scores
+
+
+def evaluate(
+    model: HashedNgramModel,
+    texts: list[str],
+    reference: list[dict],
+    thresholds: list[float],
+) -> list[dict[str, float]]:
+    """Short-circuit rate and label agreement with the transformer per threshold."""
+    probs = model.predict_proba(texts)
+    confidence = probs.max(axis=1)
+    cheap_labels = np.array(
+        [
+            build_sentiment_result(dict(zip(model.labels, map(float, row))))["sentiment"]
+            for row in probs
+        ]
+    )
+    reference_labels = np.array([build_sentiment_result(s)["sentiment"] for s in reference])
+    agrees = cheap_labels == reference_labels
+
+    report = []
+    for threshold in thresholds:
+        answered = confidence >= threshold
+        report.append(
+            {
+                "threshold": threshold,
+                "short_circuited": float(answered.mean()),
+                "agreement_when_answered": (
+                    float(agrees[answered].mean()) if answered.any() else float("nan")
+                ),
+                # Escalated texts get the transformer's own label
+                "overall_agreement": float((agrees | ~answered).mean()),
+            }
+        )
+    return report
+
+
+def _read_corpus(path: Path) -> list[str]:
+    texts = [line.strip() for line in path.read_text().splitlines() if line.strip()]
+    return list(dict.fromkeys(texts))
+
+
+def _labeled(texts: list[str], label_missing: bool) -> tuple[list[str], list[dict]]:
+    scores = reference_scores(texts, label_missing)
+    pairs = [(text, s) for text, s in zip(texts, scores, strict=True) if s is not None]
+    if len(pairs) < len(texts):
+        logger.warning(f"Skipping {len(texts) - len(pairs)} texts without a transformer result")
+    return [text for text, _ in pairs], [s for _, s in pairs]
+
+
+def _print_report(report: list[dict[str, float]]) -> None:
+    print(
+        f"\n  {'threshold':>9} {'short-circuited':>16} {'agree (answered)':>17} {'agree (all)':>12}"
+    )
+    for row in report:
+        print(
+            f"  {row['threshold']:>9.2f} {row['short_circuited']:>16.1%} "
+            f"{row['agreement_when_answered']:>17.2%} {row['overall_agreement']:>12.2%}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = commands.add_parser("train", help="Train a first-stage model")
+    train_parser.add_argument("--output", type=Path, required=True)
+    train_parser.add_argument("--epochs", type=int, default=10)
+    train_parser.add_argument(
+        "--holdout", type=float, default=0.1, help="Fraction of texts kept back for the report"
+    )
+
+    evaluate_parser = commands.add_parser("evaluate", help="Evaluate a trained model")
+    evaluate_parser.add_argument("--model", type=Path, required=True)
+
+    for command in (train_parser, evaluate_parser):
+        command.add_argument("--corpus", type=Path, required=True, help="One text per line")
+        command.add_argument(
+            "--label-missing",
+            action="store_true",
+            help="Run uncached texts through the transformer instead of skipping them",
+        )
+        command.add_argument("--thresholds", type=float, nargs="+", default=DEFAULT_THRESHOLDS)
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    texts, reference = _labeled(_read_corpus(args.corpus), args.label_missing)
+    if not texts:
+        logger.error("No labeled texts to work with")
+        return 1
+
+    if args.command == "train":
+        order = np.random.default_rng(0).permutation(len(texts))
+        n_holdout = int(len(texts) * args.holdout)
+        train_idx, holdout_idx = order[n_holdout:], order[:n_holdout]
+        targets = np.array([[reference[i][label] for label in SENTIMENT_LABELS] for i in train_idx])
+        logger.info(f"Training on {len(train_idx)} texts, holding out {len(holdout_idx)}")
+        model = HashedNgramModel(SENTIMENT_LABELS).fit(
+            [texts[i] for i in train_idx], targets, epochs=args.epochs
+        )
+        model.save(str(args.output))
+        logger.info(f"Saved model to {args.output}")
+        if not len(holdout_idx):
+            return 0
+        texts = [texts[i] for i in holdout_idx]
+        reference = [reference[i] for i in holdout_idx]
+    else:
+        model = HashedNgramModel.load(str(args.model))
+
+    print(f"\nEvaluated on {len(texts)} texts")
+    _print_report(evaluate(model, texts, reference, args.thresholds))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""Compare INT8-quantized models against fp32 on a reference corpus.
+
+Usage:
+    python -m app.tools.quantization_check [--corpus texts.txt] [--model sentiment|emotion|all]
+
+Reports label agreement, probability drift, forward-pass speedup and the
+memory saved by ``MODEL_QUANTIZATION=int8``.
+"""
+
+import argparse
+import gc
+import io
+import logging
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+from app.models.model_loader import EMOTION_MODEL_NAME, SENTIMENT_MODEL_NAME, load_classifier
+from app.services.batching import predict_proba
+from app.utils.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+MODELS = {
+    "sentiment": SENTIMENT_MODEL_NAME,
+    "emotion": EMOTION_MODEL_NAME,
+}
+
+REFERENCE_CORPUS = [
+    "I love this product! It's amazing!",
+    "This is terrible and I hate it.",
+    "The meeting is scheduled for tomorrow at 3 PM.",
+    "I can't believe they cancelled the show, I'm so disappointed.",
+    "What a wonderful surprise, thank you all so much!",
+    "The service was slow but the food was decent.",
+    "I'm scared of what might happen if the storm hits tonight.",
+    "That video was disgusting, I couldn't watch it to the end.",
+    "Honestly I feel nothing about the election results.",
+    "We won the championship!!! Best day ever!",
+    "My flight got delayed again, this airline is the worst.",
+    "The report contains three sections and an appendix.",
+    "I miss my grandmother every single day.",
+    "Wow, I did not expect that plot twist at all.",
+    "Stop calling me, I am furious with you right now.",
+    "The new update fixed the battery drain, great job.",
+    "It's fine I guess, nothing special.",
+    "The documentary on climate change was eye-opening but frightening.",
+    "Thanks for nothing, you ruined the whole weekend.",
+    "Our team shipped the feature on time and customers are happy.",
+    "I feel empty inside and can't connect with anyone anymore.",
+    "The price went up by ten percent last quarter.",
+    "This restaurant never disappoints, the pasta is incredible.",
+    "They lied to us and now everyone is angry.",
+]
+
+
+def _rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _weights_mb(model: torch.nn.Module) -> float:
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / (1024 * 1024)
+
+
+def _median_latency(tokenizer, model, texts: list[str], repeats: int) -> float:
+    predict_proba(tokenizer, model, texts)  # warmup
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict_proba(tokenizer, model, texts)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def compare(
+    tokenizer, fp32_model, int8_model, texts: list[str], repeats: int = 5
+) -> dict[str, float]:
+    """Measure how closely and how fast the INT8 model tracks the fp32 one."""
+    fp32_probs = torch.tensor(predict_proba(tokenizer, fp32_model, texts))
+    int8_probs = torch.tensor(predict_proba(tokenizer, int8_model, texts))
+
+    drift = (fp32_probs - int8_probs).abs()
+    agreement = (fp32_probs.argmax(dim=-1) == int8_probs.argmax(dim=-1)).float().mean()
+
+    fp32_latency = _median_latency(tokenizer, fp32_model, texts, repeats)
+    int8_latency = _median_latency(tokenizer, int8_model, texts, repeats)
+
+    return {
+        "texts": len(texts),
+        "label_agreement": agreement.item(),
+        "max_probability_drift": drift.max().item(),
+        "mean_probability_drift": drift.mean().item(),
+        "fp32_latency_ms": fp32_latency * 1000,
+        "int8_latency_ms": int8_latency * 1000,
+        "speedup": fp32_latency / int8_latency if int8_latency else float("inf"),
+        "fp32_weights_mb": _weights_mb(fp32_model),
+        "int8_weights_mb": _weights_mb(int8_model),
+    }
+
+
+def check_model(model_name: str, texts: list[str], repeats: int) -> dict[str, float]:
+    rss_before = _rss_mb()
+    tokenizer, fp32_model = load_classifier(model_name, quantization="none")
+    fp32_rss = _rss_mb() - rss_before
+
+    # Load a second copy so the fp32 intermediate is released before measuring
+    rss_before = _rss_mb()
+    _, int8_model = load_classifier(model_name, quantization="int8")
+    gc.collect()
+    int8_rss = _rss_mb() - rss_before
+
+    report = compare(tokenizer, fp32_model, int8_model, texts, repeats)
+    report["fp32_rss_mb"] = fp32_rss
+    report["int8_rss_mb"] = int8_rss
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, help="Text file with one reference text per line")
+    parser.add_argument("--model", choices=[*MODELS, "all"], default="all")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per model variant")
+    parser.add_argument(
+        "--min-agreement",
+        type=float,
+        default=0.95,
+        help="Exit non-zero if label agreement falls below this fraction",
+    )
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    texts = REFERENCE_CORPUS
+    if args.corpus:
+        texts = [line.strip() for line in args.corpus.read_text().splitlines() if line.strip()]
+
+    names = list(MODELS) if args.model == "all" else [args.model]
+    passed = True
+    for name in names:
+        logger.info(f"Checking {name} model ({MODELS[name]}) on {len(texts)} texts")
+        report = check_model(MODELS[name], texts, args.repeats)
+        print(f"\n[{name}] {MODELS[name]}")
+        for key, value in report.items():
+            print(
+                f"  {key:<24} {value:.4f}" if isinstance(value, float) else f"  {key:<24} {value}"
+            )
+        passed = passed and report["label_agreement"] >= args.min_agreement
+
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Check that the prefiltered risk scanner matches a full regex scan, and time both.
+
+Usage:
+    python -m app.tools.risk_benchmark [--corpus texts.txt] [--repeats 20]
+
+Every text is scored with each sentiment/emotion combination by
+``RiskDetectionService(prefilter=False)`` (every pattern searched) and by the
+default prefiltered service. Exits non-zero if any result differs.
+"""
+
+import argparse
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from app.services.risk_service import RiskDetectionService
+from app.utils.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+SENTIMENTS = ["positive", "neutral", "negative"]
+EMOTIONS = ["anger", "disgust", "fear", "joy", "neutral", "sadness", "surprise"]
+
+RISK_CORPUS = [
+    "I love this product! It's amazing!",
+    "The meeting is scheduled for tomorrow at 3 PM.",
+    "The service was slow but the food was decent.",
+    "We won the championship!!! Best day ever!",
+    "The report contains three sections and an appendix.",
+    "Stop calling me, I am furious with you right now.",
+    "I feel empty inside and can't connect with anyone anymore.",
+    "The documentary on climate change was eye-opening but frightening.",
+    "The nuclear threshold has been met according to intelligence reports.",
+    "If they keep pushing us, we'll take to the streets and fight back.",
+    "Troops are mobilizing at the border and an invasion seems imminent.",
+    "I want to kill myself, there's no reason to live anymore.",
+    "They should all be eliminated, those people are vermin.",
+    "A bomb threat was called in to the airport this morning.",
+    "Everything is hopeless and I feel worthless every single day.",
+    "I will hurt you if you come near my family again.",
+    "The ICBM test launch raised fears of a wider war.",
+    "This is the worst, most horrible, disgusting thing ever.",
+]
+
+
+def _median_ms(service: RiskDetectionService, cases: list[tuple], repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for text, sentiment, emotion in cases:
+            service.detect_risks(text, sentiment, emotion)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def compare(texts: list[str], repeats: int = 20) -> dict[str, float]:
+    """Score every combination with both scanners and report mismatches and timings."""
+    full = RiskDetectionService(prefilter=False)
+    prefiltered = RiskDetectionService()
+
+    cases = [(text, s, e) for text in texts for s in SENTIMENTS for e in EMOTIONS]
+    mismatches = 0
+    for text, sentiment, emotion in cases:
+        expected = full.detect_risks(text, sentiment, emotion)
+        actual = prefiltered.detect_risks(text, sentiment, emotion)
+        if actual != expected:
+            mismatches += 1
+            logger.error(f"Mismatch for {sentiment}/{emotion}: {text[:80]!r}")
+
+    full_ms = _median_ms(full, cases, repeats)
+    prefiltered_ms = _median_ms(prefiltered, cases, repeats)
+    return {
+        "texts": len(texts),
+        "combinations": len(cases),
+        "mismatches": mismatches,
+        "full_scan_ms": full_ms,
+        "prefiltered_ms": prefiltered_ms,
+        "speedup": full_ms / prefiltered_ms if prefiltered_ms else float("inf"),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, help="Text file with one text per line")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed passes over the corpus")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    texts = RISK_CORPUS
+    if args.corpus:
+        texts = [line.strip() for line in args.corpus.read_text().splitlines() if line.strip()]
+
+    logger.info(f"Comparing risk scanners on {len(texts)} texts")
+    report = compare(texts, args.repeats)
+    for key, value in report.items():
+        print(f"  {key:<16} {value:.4f}" if isinstance(value, float) else f"  {key:<16} {value}")
+    return 0 if report["mismatches"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""Two-tier result cache: a bounded in-process LRU in front of Redis.
+
+Both tiers use the same keys, so the version in a key prefix (``sentiment:v4:``)
+invalidates the local tier as well. Local entries never outlive their Redis
+counterpart: results read from Redis are kept locally only for the key's
+remaining Redis TTL. Redis holds the compact binary encoding from
+``result_codec``; the local tier holds the decoded dicts.
+
+When Redis is unreachable (or its circuit breaker is open) the helpers fall
+back to the local tier alone instead of failing the request.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from app.utils.redis_client import RedisUnavailableError, call_redis, get_binary_redis_client
+from app.utils.result_codec import decode_result, encode_result
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = 3600
+
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "10000"))
+LOCAL_CACHE_MAX_BYTES = int(os.getenv("LOCAL_CACHE_MAX_MB", "64")) * 1024 * 1024
+
+
+class LocalCache:
+    """LRU cache bounded by entry count and approximate payload bytes, with TTLs.
+
+    The byte size of an entry is the length of its encoded payload, which is close
+    enough to keep the cache inside its budget without measuring Python objects.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        # key -> (value, size, expires_at)
+        self._entries: OrderedDict[str, tuple[dict, int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, record_stats: bool = True) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += record_stats
+                return None
+            self._entries.move_to_end(key)
+            self.hits += record_stats
+            return entry[0]
+
+    def set(self, key: str, value: dict, size: int, ttl: float) -> None:
+        if ttl <= 0 or size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + ttl)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+
+_local_cache = LocalCache(LOCAL_CACHE_MAX_ENTRIES, LOCAL_CACHE_MAX_BYTES)
+_redis_hits = 0
+_redis_misses = 0
+
+
+def get_cache_stats() -> dict[str, any]:
+    """Hit and miss counters for each cache tier in this worker."""
+    return {
+        "local": {
+            "hits": _local_cache.hits,
+            "misses": _local_cache.misses,
+            "entries": len(_local_cache),
+            "bytes": _local_cache.bytes,
+        },
+        "redis": {"hits": _redis_hits, "misses": _redis_misses},
+    }
+
+
+def _log_unavailable(action: str, error: RedisUnavailableError) -> None:
+    # While the breaker is open every request would log; only report real failures
+    if error.__cause__ is not None:
+        logger.warning(f"Redis cache {action} failed, using local cache only: {error}")
+
+
+async def cache_get(key: str) -> dict | None:
+    """Fetch one cached result, checking the local tier first."""
+    return (await cache_get_many([key]))[0]
+
+
+async def cache_set(key: str, value: dict, ttl: int = CACHE_TTL) -> None:
+    await cache_set_many({key: value}, ttl)
+
+
+async def cache_get_many(
+    keys: list[str],
+    record_stats: bool = True,
+    usable: Callable[[dict], bool] | None = None,
+) -> list[dict | None]:
+    """Fetch several cached results; local misses go to Redis in one round trip.
+
+    Reads with ``record_stats=False`` (such as polling for a result another
+    worker is computing) are left out of the hit and miss counters. Entries
+    rejected by ``usable`` are treated as misses in both tiers.
+    """
+    global _redis_hits, _redis_misses
+    if not keys:
+        return []
+
+    results = [_local_cache.get(key, record_stats) for key in keys]
+    if usable is not None:
+        results = [r if r is None or usable(r) else None for r in results]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if not missing:
+        return results
+
+    async def fetch():
+        redis_client = await get_binary_redis_client()
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.mget([keys[i] for i in missing])
+            for i in missing:
+                pipe.pttl(keys[i])
+            return await pipe.execute()
+
+    try:
+        values, *ttls_ms = await call_redis(fetch)
+    except RedisUnavailableError as e:
+        _log_unavailable("read", e)
+        return results
+
+    for i, value, ttl_ms in zip(missing, values, ttls_ms, strict=True):
+        if not value:
+            _redis_misses += record_stats
+            continue
+        try:
+            results[i] = decode_result(value)
+        except ValueError as e:
+            # Written by another codec version or corrupt; recomputing overwrites it
+            logger.warning(f"Ignoring undecodable cache entry {keys[i]}: {e}")
+            _redis_misses += record_stats
+            continue
+        if usable is not None and not usable(results[i]):
+            results[i] = None
+            _redis_misses += record_stats
+            continue
+        _redis_hits += record_stats
+        # PTTL is -1 for a key without expiry and -2 if it expired since the MGET
+        ttl = CACHE_TTL if ttl_ms == -1 else ttl_ms / 1000
+        _local_cache.set(keys[i], results[i], len(value), ttl)
+    return results
+
+
+async def cache_set_many(items: dict[str, dict], ttl: int = CACHE_TTL) -> None:
+    """Write several results to both tiers; Redis gets one pipelined transaction."""
+    if not items:
+        return
+    encoded = {key: encode_result(value) for key, value in items.items()}
+    for key, value in items.items():
+        _local_cache.set(key, value, len(encoded[key]), ttl)
+
+    async def store():
+        redis_client = await get_binary_redis_client()
+        async with redis_client.pipeline() as pipe:
+            for key, payload in encoded.items():
+                pipe.setex(key, ttl, payload)
+            await pipe.execute()
+
+    try:
+        await call_redis(store)
+    except RedisUnavailableError as e:
+        _log_unavailable("write", e)
@@ -1,20 +1,178 @@
+import asyncio
+import logging
 import os
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
 
 import redis.asyncio as redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Tight timeouts so an unhealthy Redis costs milliseconds per request, not seconds
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "0.2"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.2"))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "64"))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "0.05"))
+REDIS_BREAKER_FAILURES = int(os.getenv("REDIS_BREAKER_FAILURES", "5"))
+REDIS_BREAKER_RESET_SECONDS = float(os.getenv("REDIS_BREAKER_RESET_SECONDS", "5"))
+# The job queue moves whole chunks and runs Lua scripts over them, so it gets
+# its own client with looser timeouts and its own breaker
+JOB_REDIS_SOCKET_TIMEOUT = float(os.getenv("JOB_REDIS_SOCKET_TIMEOUT", "5"))
+JOB_REDIS_MAX_CONNECTIONS = int(os.getenv("JOB_REDIS_MAX_CONNECTIONS", "8"))
+
+T = TypeVar("T")
+
+# redis-py reports an exhausted connection pool as a plain ConnectionError
+_POOL_EXHAUSTED_MESSAGES = ("No connection available.", "Too many connections")
 
 _redis_client: redis.Redis | None = None
+_binary_redis_client: redis.Redis | None = None
+_job_redis_client: redis.Redis | None = None
+
+
+class RedisUnavailableError(Exception):
+    """Redis is unreachable or the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Stop calling a failing dependency and probe it again after a cool-down.
+
+    ``closed``: calls go through; consecutive failures are counted.
+    ``open``: calls are rejected until ``reset_seconds`` have passed.
+    ``half_open``: a single probe call is let through; its outcome closes or
+    re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            now = time.monotonic()
+            if self.state == "open" and now - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                self._probe_started = now
+                return True
+            # A probe that never reported back (e.g. cancelled) is replaced after a while
+            if self.state == "half_open" and now - self._probe_started >= self.reset_seconds:
+                self._probe_started = now
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != "closed":
+                logger.info("Redis reachable again, closing circuit breaker")
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning(f"Opening Redis circuit breaker after {self.failures} failures")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def status(self) -> dict[str, any]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures}
+
+
+redis_breaker = CircuitBreaker(REDIS_BREAKER_FAILURES, REDIS_BREAKER_RESET_SECONDS)
+job_redis_breaker = CircuitBreaker(REDIS_BREAKER_FAILURES, REDIS_BREAKER_RESET_SECONDS)
+
+
+async def call_redis(
+    operation: Callable[[], Awaitable[T]], breaker: CircuitBreaker | None = None
+) -> T:
+    """Run a Redis operation through a circuit breaker, by default ``redis_breaker``.
+
+    Connection problems and timeouts count as failures and surface as
+    ``RedisUnavailableError``, as does calling while the breaker is open. An
+    exhausted connection pool also surfaces as ``RedisUnavailableError`` but
+    is not a failure: it says this worker is busy, not that Redis is down.
+    """
+    breaker = breaker or redis_breaker
+    if not breaker.allow():
+        raise RedisUnavailableError("Redis circuit breaker is open")
+    try:
+        result = await operation()
+    except (RedisConnectionError, RedisTimeoutError, OSError, asyncio.TimeoutError) as e:
+        if not (isinstance(e, RedisConnectionError) and str(e) in _POOL_EXHAUSTED_MESSAGES):
+            breaker.record_failure()
+        raise RedisUnavailableError(str(e)) from e
+    breaker.record_success()
+    return result
+
+
+def _create_client(
+    decode_responses: bool,
+    socket_timeout: float = REDIS_SOCKET_TIMEOUT,
+    max_connections: int = REDIS_MAX_CONNECTIONS,
+) -> redis.Redis:
+    redis_url = os.getenv("REDIS_URL", "redis://redis:6379")
+    # A full pool makes the call wait briefly for a connection, then fail; the
+    # caller falls back to the local cache like for any other Redis error
+    pool = redis.BlockingConnectionPool.from_url(
+        redis_url,
+        decode_responses=decode_responses,
+        max_connections=max_connections,
+        timeout=REDIS_POOL_TIMEOUT,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+        socket_timeout=socket_timeout,
+    )
+    return redis.Redis.from_pool(pool)
 
 
 async def get_redis_client() -> redis.Redis:
     global _redis_client
     if _redis_client is None:
-        redis_url = os.getenv("REDIS_URL", "redis://redis:6379")
-        _redis_client = redis.from_url(redis_url, decode_responses=True)
+        _redis_client = _create_client(decode_responses=True)
     return _redis_client
 
 
+async def get_binary_redis_client() -> redis.Redis:
+    """Client returning raw bytes, for the binary-encoded result cache."""
+    global _binary_redis_client
+    if _binary_redis_client is None:
+        _binary_redis_client = _create_client(decode_responses=False)
+    return _binary_redis_client
+
+
+async def get_job_redis_client() -> redis.Redis:
+    """Client for the batch job queue; use it with ``job_redis_breaker``."""
+    global _job_redis_client
+    if _job_redis_client is None:
+        _job_redis_client = _create_client(
+            decode_responses=True,
+            socket_timeout=JOB_REDIS_SOCKET_TIMEOUT,
+            max_connections=JOB_REDIS_MAX_CONNECTIONS,
+        )
+    return _job_redis_client
+
+
 async def close_redis_client():
-    global _redis_client
+    global _redis_client, _binary_redis_client, _job_redis_client
     if _redis_client:
         await _redis_client.close()
         _redis_client = None
+    if _binary_redis_client:
+        await _binary_redis_client.close()
+        _binary_redis_client = None
+    if _job_redis_client:
+        await _job_redis_client.close()
+        _job_redis_client = None
@@ -0,0 +1,100 @@
+"""Compact binary encoding of cached model results.
+
+A payload starts with a codec version byte and a kind byte. Sentiment and
+emotion results are stored as the index of the predicted label followed by
+the probabilities as float32 in a fixed label order; the model produces
+float32 probabilities, so this is lossless. The response dicts, including the
+``probabilities`` copy kept for older clients, are rebuilt when read.
+Anything else is stored as JSON behind the same header.
+"""
+
+import json
+import struct
+
+CODEC_VERSION = 1
+
+KIND_JSON = 0
+KIND_SENTIMENT = 1
+KIND_EMOTION = 2
+# Sentiment answered by the first-stage cascade model rather than the transformer
+KIND_SENTIMENT_CASCADE = 3
+
+SENTIMENT_LABELS = ("positive", "neutral", "negative")
+EMOTION_LABELS = ("anger", "disgust", "fear", "joy", "neutral", "sadness", "surprise")
+
+# Results with any other keys (e.g. long-document windows) are stored as JSON
+_SENTIMENT_KEYS = {"sentiment", "scores", "confidence", "probabilities", "source"}
+_EMOTION_KEYS = {"emotion", "probabilities"}
+
+# version, kind, label index, probability count
+_HEADER = struct.Struct("<BBBB")
+
+
+def _pack(kind: int, label: str, labels: tuple[str, ...], probs: dict[str, float]) -> bytes:
+    values = [probs[name] for name in labels]
+    return _HEADER.pack(CODEC_VERSION, kind, labels.index(label), len(labels)) + struct.pack(
+        f"<{len(values)}f", *values
+    )
+
+
+def encode_result(result: dict) -> bytes:
+    """Encode a result dict for the cache."""
+    if (
+        "sentiment" in result
+        and result.keys() <= _SENTIMENT_KEYS
+        and tuple(result.get("scores", ())) == SENTIMENT_LABELS
+        and result["sentiment"] in SENTIMENT_LABELS
+        and result.get("source", "cascade") == "cascade"
+    ):
+        kind = KIND_SENTIMENT_CASCADE if "source" in result else KIND_SENTIMENT
+        return _pack(kind, result["sentiment"], SENTIMENT_LABELS, result["scores"])
+    if (
+        "emotion" in result
+        and result.keys() <= _EMOTION_KEYS
+        and tuple(result.get("probabilities", ())) == EMOTION_LABELS
+        and result["emotion"] in EMOTION_LABELS
+    ):
+        return _pack(KIND_EMOTION, result["emotion"], EMOTION_LABELS, result["probabilities"])
+    return bytes((CODEC_VERSION, KIND_JSON)) + json.dumps(result).encode()
+
+
+def decode_result(payload: bytes) -> dict:
+    """Rebuild the result dict from a cached payload.
+
+    Raises ``ValueError`` for any payload this codec cannot read: another codec
+    version, an unknown kind or a truncated value.
+    """
+    try:
+        return _decode(payload)
+    except (IndexError, struct.error) as e:
+        raise ValueError(f"Malformed cache payload: {e}") from e
+
+
+def _decode(payload: bytes) -> dict:
+    version, kind = payload[0], payload[1]
+    if version != CODEC_VERSION:
+        raise ValueError(f"Unsupported cache codec version: {version}")
+    if kind == KIND_JSON:
+        return json.loads(payload[2:])
+
+    _, _, label_index, count = _HEADER.unpack_from(payload)
+    values = struct.unpack_from(f"<{count}f", payload, _HEADER.size)
+
+    if kind in (KIND_SENTIMENT, KIND_SENTIMENT_CASCADE):
+        scores = dict(zip(SENTIMENT_LABELS, values, strict=True))
+        sentiment = SENTIMENT_LABELS[label_index]
+        result = {
+            "sentiment": sentiment,
+            "scores": scores,
+            "confidence": scores[sentiment],
+            "probabilities": dict(scores),
+        }
+        if kind == KIND_SENTIMENT_CASCADE:
+            result["source"] = "cascade"
+        return result
+    if kind == KIND_EMOTION:
+        return {
+            "emotion": EMOTION_LABELS[label_index],
+            "probabilities": dict(zip(EMOTION_LABELS, values, strict=True)),
+        }
+    raise ValueError(f"Unknown cache payload kind: {kind}")
@@ -0,0 +1,279 @@
+"""Single-flight coalescing of identical in-flight analyses.
+
+Requests are keyed by their result cache key. Within a worker, the first
+request for a key leads and the rest await its future. Across workers, the
+leader holds a short Redis lease while it computes; other workers poll the
+result cache, backing off between reads, until the result appears or the
+lease is released or expires. Leases for all keys of a request are taken in
+one pipeline, written back in one pipeline and released in one script call.
+
+If a leader is cancelled (its client went away), its followers do not fail
+with it: one of them takes over and computes the result.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+
+from app.utils.cache import cache_get_many, cache_set_many
+from app.utils.redis_client import RedisUnavailableError, call_redis, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+SINGLE_FLIGHT_LEASE_MS = int(os.getenv("SINGLE_FLIGHT_LEASE_MS", "10000"))
+SINGLE_FLIGHT_POLL_MS = int(os.getenv("SINGLE_FLIGHT_POLL_MS", "20"))
+SINGLE_FLIGHT_MAX_POLL_MS = int(os.getenv("SINGLE_FLIGHT_MAX_POLL_MS", "200"))
+
+# Delete each lease only if it still holds our token; another worker may own it by now
+_RELEASE_SCRIPT = """
+local released = 0
+for _, key in ipairs(KEYS) do
+    if redis.call('get', key) == ARGV[1] then
+        released = released + redis.call('del', key)
+    end
+end
+return released
+"""
+
+_inflight: dict[str, asyncio.Future] = {}
+_poll_reads = 0
+
+
+def get_single_flight_stats() -> dict[str, int]:
+    """Cache reads made while waiting for another worker; not counted as cache misses."""
+    return {"poll_reads": _poll_reads}
+
+
+def _lead(key: str) -> asyncio.Future:
+    future = asyncio.get_running_loop().create_future()
+    # Mark a failure as retrieved even when nobody followed this leader
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    _inflight[key] = future
+    return future
+
+
+def _finish(
+    key: str, future: asyncio.Future, result: any = None, error: BaseException | None = None
+) -> None:
+    if _inflight.get(key) is future:
+        del _inflight[key]
+    if future.done():
+        return
+    if isinstance(error, Exception):
+        future.set_exception(error)
+    elif error is not None:
+        future.cancel()
+    else:
+        future.set_result(result)
+
+
+def _leader_cancelled(future: asyncio.Future) -> bool:
+    """Whether a follower's CancelledError came from its leader rather than itself."""
+    return future.cancelled() and not asyncio.current_task().cancelling()
+
+
+async def _follow(followed: dict[str, asyncio.Future]) -> tuple[dict[str, any], list[str]]:
+    """Await followed futures; returns their results and the keys whose leader was cancelled."""
+    results = {}
+    orphaned = []
+    for key, future in followed.items():
+        try:
+            results[key] = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not _leader_cancelled(future):
+                raise
+            orphaned.append(key)
+        except Exception as e:
+            results[key] = e
+    return results, orphaned
+
+
+async def compute_once(key: str, compute: Callable[[], Awaitable[dict]]) -> dict:
+    """Compute and cache the result for ``key`` unless someone already is.
+
+    ``compute`` runs at most once per key across the workers sharing Redis, as
+    long as the leader finishes within the lease.
+    """
+    return (await compute_once_many({key: compute}))[key]
+
+
+async def compute_once_many(computes: dict[str, Callable[[], Awaitable[dict]]]) -> dict[str, dict]:
+    """``compute_once`` for several keys, sharing the Redis round trips between them.
+
+    The computations run concurrently. Raises the first failure, if any.
+    """
+    results = {}
+    pending = dict(computes)
+    while pending:
+        followed = {key: _inflight[key] for key in pending if key in _inflight}
+        leading = {key: _lead(key) for key in pending if key not in followed}
+
+        if leading:
+            try:
+                fresh = await _compute_across_workers(
+                    list(leading), lambda owned: _gather({key: computes[key] for key in owned})
+                )
+            except BaseException as e:
+                for key, future in leading.items():
+                    _finish(key, future, error=e)
+                raise
+            for key, future in leading.items():
+                if isinstance(fresh[key], Exception):
+                    _finish(key, future, error=fresh[key])
+                else:
+                    _finish(key, future, fresh[key])
+            results.update(fresh)
+
+        followed_results, orphaned = await _follow(followed)
+        results.update(followed_results)
+        pending = {key: computes[key] for key in orphaned}
+
+    for result in results.values():
+        if isinstance(result, Exception):
+            raise result
+    return results
+
+
+async def _compute_across_workers(
+    keys: list[str],
+    compute_owned: Callable[[list[str]], Awaitable[dict[str, any]]],
+    usable: Callable[[any], bool] | None = None,
+    computed: set[str] | None = None,
+) -> dict[str, any]:
+    """Lease ``keys`` in Redis, compute the ones we own and wait for the rest.
+
+    ``compute_owned`` gets the keys this worker leased and returns their results,
+    with failures as exceptions. Keys it computed are added to ``computed`` if
+    given. Results polled from other workers are ignored unless ``usable``.
+    """
+    redis_client = await get_redis_client()
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + SINGLE_FLIGHT_LEASE_MS / 1000
+    poll_interval = SINGLE_FLIGHT_POLL_MS / 1000
+    results = {}
+    pending = list(keys)
+
+    while pending and time.monotonic() < deadline:
+        try:
+            acquired = await call_redis(lambda: _acquire(redis_client, pending, token))
+        except RedisUnavailableError:
+            # No coordination without Redis; still coalesced within this worker
+            break
+
+        owned = [key for key, ok in zip(pending, acquired, strict=True) if ok]
+        if owned:
+            try:
+                results.update(await _compute_and_store(owned, compute_owned, computed))
+            finally:
+                await _release(redis_client, owned, token)
+            pending = [key for key in pending if key not in results]
+            if not pending:
+                break
+
+        # Other workers hold the remaining leases; wait for their results
+        await asyncio.sleep(poll_interval)
+        poll_interval = min(poll_interval * 2, SINGLE_FLIGHT_MAX_POLL_MS / 1000)
+        for key, result in zip(pending, await _poll(pending, usable), strict=True):
+            if result is not None:
+                results[key] = result
+        pending = [key for key in pending if key not in results]
+
+    if pending:
+        results.update(await _compute_and_store(pending, compute_owned, computed))
+    return results
+
+
+async def _acquire(redis_client, keys: list[str], token: str) -> list[bool]:
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.set(f"inflight:{key}", token, nx=True, px=SINGLE_FLIGHT_LEASE_MS)
+        return [bool(ok) for ok in await pipe.execute()]
+
+
+async def _poll(keys: list[str], usable: Callable[[any], bool] | None) -> list[dict | None]:
+    global _poll_reads
+    _poll_reads += len(keys)
+    return await cache_get_many(keys, record_stats=False, usable=usable)
+
+
+async def _compute_and_store(
+    keys: list[str],
+    compute_owned: Callable[[list[str]], Awaitable[dict[str, any]]],
+    computed: set[str] | None,
+) -> dict[str, any]:
+    """Compute ``keys`` and cache the successes in one pipeline."""
+    results = await compute_owned(keys)
+    if computed is not None:
+        computed.update(keys)
+    await cache_set_many({k: v for k, v in results.items() if not isinstance(v, Exception)})
+    return results
+
+
+async def _gather(computes: dict[str, Callable[[], Awaitable[dict]]]) -> dict[str, any]:
+    """Run the computations concurrently; failures are exceptions in their slots."""
+    rows = await asyncio.gather(
+        *(compute() for compute in computes.values()), return_exceptions=True
+    )
+    for row in rows:
+        if isinstance(row, BaseException) and not isinstance(row, Exception):
+            raise row
+    return dict(zip(computes, rows, strict=True))
+
+
+async def _release(redis_client, keys: list[str], token: str) -> None:
+    lease_keys = [f"inflight:{key}" for key in keys]
+    try:
+        await call_redis(
+            lambda: redis_client.eval(_RELEASE_SCRIPT, len(lease_keys), *lease_keys, token)
+        )
+    except RedisUnavailableError as e:
+        logger.warning(f"Failed to release single-flight leases {lease_keys}: {e}")
+
+
+async def compute_many_once(
+    items: dict[str, str],
+    compute_batch: Callable[[list[str]], Awaitable[list]],
+    led: set[str] | None = None,
+    usable: Callable[[any], bool] | None = None,
+) -> dict[str, any]:
+    """Batch form of ``compute_once``, keyed like ``{key: text}``.
+
+    Keys already in flight in this worker are awaited. Leases for the rest are
+    taken in one pipeline, the leased keys are computed together in one
+    ``compute_batch`` call, whose failed items are exceptions in their slots,
+    and cached in one pipeline; keys leased by other workers are polled for,
+    accepting only results that pass ``usable``. Returns ``{key: result or
+    exception}``. Keys this call computed itself are added to ``led`` if given.
+    """
+
+    async def compute_owned(owned: list[str]) -> dict[str, any]:
+        rows = await compute_batch([items[key] for key in owned])
+        return dict(zip(owned, rows, strict=True))
+
+    results = {}
+    pending = dict(items)
+    while pending:
+        followed = {key: _inflight[key] for key in pending if key in _inflight}
+        leading = {key: _lead(key) for key in pending if key not in followed}
+
+        if leading:
+            try:
+                fresh = await _compute_across_workers(list(leading), compute_owned, usable, led)
+            except BaseException as e:
+                for key, future in leading.items():
+                    _finish(key, future, error=e)
+                raise
+            for key, future in leading.items():
+                if isinstance(fresh[key], Exception):
+                    _finish(key, future, error=fresh[key])
+                else:
+                    _finish(key, future, fresh[key])
+            results.update(fresh)
+
+        followed_results, orphaned = await _follow(followed)
+        results.update(followed_results)
+        pending = {key: items[key] for key in orphaned}
+    return results
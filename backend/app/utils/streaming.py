@@ -0,0 +1,38 @@
+"""Streaming responses computed from a streamed request body."""
+
+import asyncio
+from collections.abc import AsyncIterator, Callable
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """A StreamingResponse whose content is produced while the request body is read.
+
+    Starlette's StreamingResponse watches for client disconnects by calling
+    ``receive`` alongside the response, which would swallow the request body
+    chunks the content is still reading. Here the watch starts only once the
+    body has been read; until then a disconnect surfaces through the body read.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        content: Callable[[AsyncIterator[bytes]], AsyncIterator[str | bytes]],
+        **kwargs,
+    ):
+        self._body_read = asyncio.Event()
+        super().__init__(content(self._read_body(request)), **kwargs)
+
+    async def _read_body(self, request: Request) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in request.stream():
+                yield chunk
+        finally:
+            self._body_read.set()
+
+    async def listen_for_disconnect(self, receive: Receive) -> None:
+        await self._body_read.wait()
+        await super().listen_for_disconnect(receive)
@@ -1,3 +1,4 @@
+import gc
 import multiprocessing
 import os
 
@@ -14,9 +15,35 @@ port = os.environ.get("PORT", os.environ.get("GUNICORN_PORT", "8000"))
 bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{port}")
 
 worker_class = "uvicorn.workers.UvicornWorker"
-preload_app = False  # Disable preload to avoid blocking startup with model loading
 timeout = 300  # Increased timeout for model loading
 
+# Share model weights across workers: with GUNICORN_SHARE_MODELS=1 the master loads
+# the models once and forks, so workers share the weight pages copy-on-write and
+# only grow by their activations. Off by default so startup is not blocked by loading.
+share_models = os.environ.get("GUNICORN_SHARE_MODELS", "0") == "1"
+preload_app = share_models
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported and before workers are forked."""
+    if not share_models:
+        return
+
+    from app.models.model_loader import preload_shared_models
+
+    server.log.info("Preloading models for copy-on-write sharing across workers")
+    try:
+        preload_shared_models()
+    except Exception as e:
+        # Workers fall back to loading their own copies in the app lifespan
+        server.log.warning(f"Failed to preload models, workers will load them: {e}")
+
+    # Move everything allocated so far out of the cyclic GC's reach. Otherwise each
+    # worker's first collection writes to every object header and copies the pages.
+    gc.collect()
+    gc.freeze()
+
+
 # Logging to stdout/stderr so containers capture logs
 accesslog = "-"
 errorlog = "-"
@@ -1,8 +1,66 @@
+import fakeredis
 import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
-from app.models.model_loader import load_models
+from app.models.model_loader import ModelNotReadyError, load_models
+from app.utils import cache, redis_client
+from app.utils.result_codec import EMOTION_LABELS
+
+
+class FakeBatchService:
+    """Stand-in for the sentiment and emotion services' ``analyze_batch``.
+
+    Records every batch it is given. With ``caching``, texts seen before are
+    answered from memory and only the rest are computed, and reported through
+    ``computed`` like the real services do. The next ``fail`` calls raise
+    ``ModelNotReadyError``.
+    """
+
+    def __init__(self, compute, caching: bool = False):
+        self.compute = compute
+        self.caching = caching
+        self.cache = {}
+        self.batches = []
+        self.computed_batches = []
+        self.fail = 0
+
+    async def analyze_batch(self, texts, computed=None):
+        self.batches.append(list(texts))
+        if self.fail:
+            self.fail -= 1
+            raise ModelNotReadyError("model not ready")
+        missing = [
+            text for text in dict.fromkeys(texts) if not self.caching or text not in self.cache
+        ]
+        if missing:
+            self.computed_batches.append(missing)
+            if computed is not None:
+                computed.update(texts.index(text) for text in missing)
+            self.cache.update({text: self.compute(text) for text in missing})
+        return [self.cache[text] for text in texts]
+
+
+def fake_sentiment(text):
+    """Negative for "terrible", a model failure for "broken", otherwise positive."""
+    if "broken" in text:
+        return RuntimeError("inference failed")
+    if "terrible" in text:
+        return {
+            "sentiment": "negative",
+            "scores": {"positive": 0.0, "neutral": 0.1, "negative": 0.9},
+        }
+    return {"sentiment": "positive", "scores": {"positive": 0.8, "neutral": 0.1, "negative": 0.1}}
+
+
+def fake_emotion(text):
+    """Fear for "terrible" or "kill", otherwise joy."""
+    probabilities = dict.fromkeys(EMOTION_LABELS, 0.0)
+    if "terrible" in text or "kill" in text:
+        probabilities.update(fear=0.9, sadness=0.1)
+        return {"emotion": "fear", "probabilities": probabilities}
+    probabilities.update(joy=0.8, sadness=0.2)
+    return {"emotion": "joy", "probabilities": probabilities}
 
 
 @pytest.fixture(scope="session")
@@ -15,3 +73,23 @@ def client():
         pass
     with TestClient(app) as c:
         yield c
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Point the Redis clients at one in-memory fakeredis server.
+
+    Yields the text client, which the job queue also uses; the binary client
+    shares its data.
+    """
+    server = fakeredis.FakeServer()
+    text_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    binary_client = fakeredis.FakeAsyncRedis(server=server)
+    monkeypatch.setattr(redis_client, "_redis_client", text_client)
+    monkeypatch.setattr(redis_client, "_binary_redis_client", binary_client)
+    monkeypatch.setattr(redis_client, "_job_redis_client", text_client)
+    monkeypatch.setattr(redis_client, "redis_breaker", redis_client.CircuitBreaker(5, 5))
+    monkeypatch.setattr(redis_client, "job_redis_breaker", redis_client.CircuitBreaker(5, 5))
+    cache._local_cache.clear()
+    yield text_client
+    cache._local_cache.clear()
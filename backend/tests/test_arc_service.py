@@ -0,0 +1,70 @@
+import asyncio
+
+import spacy
+
+from app.services import aspect_service
+from app.services.arc_service import EmotionalArcService
+from tests.conftest import FakeBatchService, fake_emotion, fake_sentiment
+
+
+def _service(monkeypatch) -> EmotionalArcService:
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    monkeypatch.setattr(aspect_service, "nlp", nlp)
+
+    service = EmotionalArcService.__new__(EmotionalArcService)
+    service.emotion_service = FakeBatchService(fake_emotion)
+    service.sentiment_service = FakeBatchService(fake_sentiment)
+    return service
+
+
+def test_every_sentence_scored_in_one_batch_with_offsets(monkeypatch):
+    service = _service(monkeypatch)
+    text = "What a lovely morning.  Then it rained! Still, a good day."
+
+    result = asyncio.run(service.analyze_arc(text))
+
+    assert result["total_sentences"] == 3
+    assert service.emotion_service.batches == [[s["text"] for s in result["sentences"]]]
+    assert service.sentiment_service.batches == []
+    for sentence in result["sentences"]:
+        assert text[sentence["start"] : sentence["end"]] == sentence["text"]
+        assert sentence["intensity"] == 0.8
+        assert sentence["sentiment"] is None
+    assert result["sentences"][1]["text"] == "Then it rained!"
+
+
+def test_include_sentiment(monkeypatch):
+    service = _service(monkeypatch)
+
+    result = asyncio.run(service.analyze_arc("Good. Bad.", include_sentiment=True))
+
+    assert len(service.sentiment_service.batches) == 1
+    assert [s["sentiment"] for s in result["sentences"]] == ["positive", "positive"]
+
+
+def test_unsplit_text_is_one_sentence(monkeypatch):
+    service = _service(monkeypatch)
+    monkeypatch.setattr(aspect_service, "nlp", spacy.blank("en"))
+
+    result = asyncio.run(service.analyze_arc("no boundaries here"))
+
+    assert [(s["start"], s["end"]) for s in result["sentences"]] == [(0, 18)]
+
+
+def test_arc_endpoint(client, monkeypatch):
+    from app.routers import sentiment as sentiment_router
+
+    service = _service(monkeypatch)
+    monkeypatch.setattr(sentiment_router, "get_arc_service", lambda: service)
+
+    response = client.post("/api/analysis/arc", json={"text": "  One. Two!  "})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["text"] == "One. Two!"
+    assert [(s["start"], s["end"], s["emotion"]) for s in data["sentences"]] == [
+        (0, 4, "joy"),
+        (5, 9, "joy"),
+    ]
+    assert client.post("/api/analysis/arc", json={"text": " "}).status_code == 422
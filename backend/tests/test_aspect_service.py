@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+import spacy
+
+from app.models.model_loader import ModelNotReadyError
+from app.services import aspect_service
+from app.services.aspect_service import AspectService
+
+
+class _FakeSentimentService:
+    def __init__(self):
+        self.batches = []
+
+    async def analyze_batch(self, texts):
+        self.batches.append(texts)
+        scores = {"positive": 0.7, "neutral": 0.2, "negative": 0.1}
+        return [{"sentiment": "positive", "scores": scores} for _ in texts]
+
+
+def test_aspect_prompts_are_scored_in_one_batch(monkeypatch):
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    monkeypatch.setattr(aspect_service, "nlp", nlp)
+
+    service = AspectService.__new__(AspectService)
+    service.sentiment_service = _FakeSentimentService()
+    text = "Great food tonight. Terrible service though. Lovely weather honestly."
+
+    result = asyncio.run(service.analyze_aspects(text))
+
+    assert len(service.sentiment_service.batches) == 1
+    assert len(service.sentiment_service.batches[0]) == result["total_aspects"] > 1
+    first = result["aspects"][0]
+    assert service.sentiment_service.batches[0][0] == f"{first['aspect']}: {first['context']}"
+    assert first["context"] == "Great food tonight."
+
+
+def test_bulk_scores_all_documents_in_one_batch(monkeypatch):
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    monkeypatch.setattr(aspect_service, "nlp", nlp)
+
+    service = AspectService.__new__(AspectService)
+    service.sentiment_service = _FakeSentimentService()
+    texts = ["Great food tonight. Terrible service though.", "ok", "Lovely weather honestly."]
+
+    results = asyncio.run(service.analyze_aspects_bulk(texts))
+
+    assert len(service.sentiment_service.batches) == 1
+    assert [r["text"] for r in results] == texts
+    assert results[1]["aspects"] == []
+    assert sum(r.get("total_aspects", 0) for r in results) == len(
+        service.sentiment_service.batches[0]
+    )
+    assert results[2]["aspects"][0]["context"] == "Lovely weather honestly."
+
+
+def test_failed_background_load_is_not_retried_on_the_request(monkeypatch):
+    def load_spacy_model():
+        raise AssertionError("loaded on the request path")
+
+    monkeypatch.setattr(aspect_service, "nlp", None)
+    monkeypatch.setattr(aspect_service, "_nlp_load_error", OSError("model missing"))
+    monkeypatch.setattr(aspect_service, "load_spacy_model", load_spacy_model)
+    monkeypatch.setattr(aspect_service, "get_sentiment_service", lambda: _FakeSentimentService())
+
+    with pytest.raises(ModelNotReadyError, match="failed to load: model missing"):
+        AspectService()
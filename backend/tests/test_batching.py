@@ -0,0 +1,179 @@
+"""Tests for the inference micro-batcher."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import torch
+import torch.nn.functional as F  # noqa: N812
+from transformers import BertTokenizerFast
+
+from app.services.batching import (
+    MicroBatcher,
+    analyze_cached_batch,
+    predict_proba,
+    predict_proba_bucketed,
+    predict_windows,
+)
+from app.utils.cache import cache_set
+
+
+def _recording_batch_fn(calls):
+    def batch_fn(texts):
+        calls.append(list(texts))
+        return [text.upper() for text in texts]
+
+    return batch_fn
+
+
+async def test_concurrent_requests_share_one_batch():
+    """Test that concurrent submissions are run as a single batch."""
+    calls = []
+    batcher = MicroBatcher(_recording_batch_fn(calls), max_batch_size=16, max_wait_ms=5)
+
+    results = await asyncio.gather(*(batcher.submit(f"text {i}") for i in range(5)))
+
+    assert results == [f"TEXT {i}" for i in range(5)]
+    assert len(calls) == 1
+    assert len(calls[0]) == 5
+
+
+async def test_batch_flushes_at_max_size():
+    """Test that batches never exceed the configured maximum size."""
+    calls = []
+    batcher = MicroBatcher(_recording_batch_fn(calls), max_batch_size=4, max_wait_ms=50)
+
+    results = await asyncio.gather(*(batcher.submit(str(i)) for i in range(10)))
+
+    assert results == [str(i) for i in range(10)]
+    assert [len(c) for c in calls] == [4, 4, 2]
+
+
+async def test_batch_errors_reach_every_caller():
+    """Test that a failed forward pass is raised to each waiting caller."""
+
+    def failing_batch_fn(texts):
+        raise RuntimeError("model exploded")
+
+    batcher = MicroBatcher(failing_batch_fn, max_batch_size=8, max_wait_ms=1)
+
+    results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+async def test_single_request_waits_at_most_max_wait():
+    """Test that a lone request is flushed after the wait window."""
+    batcher = MicroBatcher(lambda texts: texts, max_batch_size=16, max_wait_ms=1)
+
+    result = await asyncio.wait_for(batcher.submit("alone"), timeout=1)
+
+    assert result == "alone"
+
+
+@pytest.mark.parametrize("max_batch_size", [0, 1])
+async def test_batch_size_one_runs_each_request_alone(max_batch_size):
+    """Test that a batch size of one (or less) disables batching."""
+    calls = []
+    batcher = MicroBatcher(_recording_batch_fn(calls), max_batch_size=max_batch_size)
+
+    await asyncio.gather(batcher.submit("a"), batcher.submit("b"))
+
+    assert calls == [["a"], ["b"]]
+
+
+class _WordTokenizer:
+    """Whitespace tokenizer standing in for a Hugging Face tokenizer."""
+
+    pad_token_id = 0
+
+    def __call__(self, texts, truncation=True, max_length=512):
+        ids = [[len(word) for word in text.split()][:max_length] for text in texts]
+        return {"input_ids": ids, "attention_mask": [[1] * len(row) for row in ids]}
+
+
+class _CountingModel:
+    """Model whose logits encode the number of real tokens in each row."""
+
+    def __init__(self):
+        self.batch_shapes = []
+
+    def __call__(self, input_ids, attention_mask, **kwargs):
+        self.batch_shapes.append(tuple(input_ids.shape))
+        lengths = attention_mask.sum(dim=-1, keepdim=True).float()
+        return SimpleNamespace(logits=torch.cat([lengths, torch.zeros_like(lengths)], dim=-1))
+
+
+def test_bucketed_results_return_in_input_order():
+    """Test that length bucketing scatters rows back to their original positions."""
+    texts = ["a b c d e", "a", "a b c", "a b", "a b c d"]
+    model = _CountingModel()
+
+    rows = predict_proba_bucketed(_WordTokenizer(), model, texts, batch_size=2)
+
+    expected = F.softmax(torch.tensor([[float(len(t.split())), 0.0] for t in texts]), dim=-1)
+    assert torch.allclose(torch.tensor(rows), expected)
+    # Sorted buckets keep padding minimal: (1, 2), (3, 4), (5,)
+    assert model.batch_shapes == [(2, 2), (2, 4), (1, 5)]
+
+
+@pytest.fixture
+def fast_tokenizer(tmp_path):
+    vocab = tmp_path / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "one", "two", "three", "."]))
+    return BertTokenizerFast(vocab_file=str(vocab))
+
+
+def test_windows_cover_the_whole_text(fast_tokenizer):
+    """Test that overlapping windows span the text and are weighted by length."""
+    text = " ".join(["one two three ."] * 10)  # 40 tokens
+    model = _CountingModel()
+
+    scored = predict_windows(fast_tokenizer, model, text, max_length=12, stride=4, batch_size=8)
+
+    windows = scored["windows"]
+    assert windows[0]["start"] == 0
+    assert windows[-1]["end"] == len(text)
+    assert all(b["start"] < a["end"] for a, b in zip(windows, windows[1:]))
+    # 10 text tokens per window plus [CLS] and [SEP]; all windows run in one batch
+    assert model.batch_shapes == [(len(windows), 12)]
+
+    tokens = torch.tensor([float(w["tokens"]) for w in windows])
+    logits = torch.stack([tokens + 2, torch.zeros_like(tokens)], dim=-1)
+    combined = (logits * tokens.unsqueeze(-1)).sum(dim=0) / tokens.sum()
+    assert torch.allclose(torch.tensor(scored["probabilities"]), F.softmax(combined, dim=-1))
+
+
+def test_single_window_matches_predict_proba(fast_tokenizer):
+    """Test that a short text scores the same in long-document mode."""
+    scored = predict_windows(fast_tokenizer, _CountingModel(), "one two three")
+
+    assert len(scored["windows"]) == 1
+    assert (
+        scored["probabilities"]
+        == predict_proba(fast_tokenizer, _CountingModel(), ["one two three"])[0]
+    )
+
+
+def test_cached_batch_reports_only_positions_it_computed(fake_redis):
+    async def compute(texts):
+        await asyncio.sleep(0.01)
+        return [{"label": text} for text in texts]
+
+    async def run():
+        await cache_set("test:c", {"label": "c"})
+        # Another request is already computing "b"
+        other = asyncio.ensure_future(analyze_cached_batch(["b"], lambda t: f"test:{t}", compute))
+        await asyncio.sleep(0)
+        computed = set()
+        results = await analyze_cached_batch(
+            ["a", "b", "a", "c"], lambda t: f"test:{t}", compute, computed
+        )
+        await other
+        return results, computed
+
+    results, computed = asyncio.run(run())
+
+    assert [r["label"] for r in results] == ["a", "b", "a", "c"]
+    # "b" came from the other request, "c" from the cache, and the second "a" reuses the first
+    assert computed == {0}
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.batching import analyze_cached_batch
+from app.utils import cache
+from app.utils.cache import LocalCache, cache_get_many
+from app.utils.redis_client import get_binary_redis_client
+from app.utils.result_codec import CODEC_VERSION, decode_result
+
+
+def test_evicts_least_recently_used_entry():
+    cache = LocalCache(max_entries=2, max_bytes=1000)
+    cache.set("a", {"v": 1}, 10, ttl=60)
+    cache.set("b", {"v": 2}, 10, ttl=60)
+    assert cache.get("a") == {"v": 1}
+
+    cache.set("c", {"v": 3}, 10, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    assert cache.get("c") == {"v": 3}
+
+
+def test_evicts_to_stay_within_byte_budget():
+    cache = LocalCache(max_entries=100, max_bytes=25)
+    cache.set("a", {"v": 1}, 10, ttl=60)
+    cache.set("b", {"v": 2}, 10, ttl=60)
+    cache.set("c", {"v": 3}, 10, ttl=60)
+
+    assert len(cache) == 2
+    assert cache.bytes == 20
+    assert cache.get("a") is None
+
+
+def test_expired_entries_are_misses():
+    cache = LocalCache(max_entries=10, max_bytes=1000)
+    cache.set("a", {"v": 1}, 10, ttl=0.01)
+    cache.set("b", {"v": 2}, 10, ttl=0)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert cache.bytes == 0
+
+
+@pytest.mark.parametrize(
+    "payload", [bytes((CODEC_VERSION + 1, 0)) + b"{}", b"\x01", bytes((CODEC_VERSION, 1, 0))]
+)
+def test_decode_rejects_unreadable_payloads(payload):
+    with pytest.raises(ValueError):
+        decode_result(payload)
+
+
+def test_undecodable_entries_are_recomputed(fake_redis):
+    calls = []
+
+    async def compute(texts):
+        calls.append(list(texts))
+        return [{"label": text} for text in texts]
+
+    async def run():
+        binary_client = await get_binary_redis_client()
+        await binary_client.set("test:old", bytes((CODEC_VERSION + 1, 0)) + b"{}")
+        await binary_client.set("test:cut", bytes((CODEC_VERSION, 1, 0)))
+        misses = cache.get_cache_stats()["redis"]["misses"]
+        results = await analyze_cached_batch(["old", "cut"], lambda t: f"test:{t}", compute)
+        cache._local_cache.clear()
+        return (
+            results,
+            cache.get_cache_stats()["redis"]["misses"] - misses,
+            await cache_get_many(["test:old", "test:cut"]),
+        )
+
+    results, misses, rewritten = asyncio.run(run())
+
+    assert calls == [["old", "cut"]]
+    assert results == [{"label": "old"}, {"label": "cut"}]
+    assert misses == 2
+    assert rewritten == results
@@ -0,0 +1,116 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.models import ngram_model
+from app.models.ngram_model import HashedNgramModel
+from app.services import sentiment_service
+from app.services.sentiment_service import SentimentService, build_sentiment_result
+from app.tools import cascade as cascade_tool
+from app.tools.cascade import evaluate
+from app.utils.result_codec import SENTIMENT_LABELS, decode_result, encode_result
+
+POSITIVE = {"positive": 0.9, "neutral": 0.08, "negative": 0.02}
+NEGATIVE = {"positive": 0.02, "neutral": 0.08, "negative": 0.9}
+
+
+def _trained_model() -> HashedNgramModel:
+    texts = ["love it", "great day", "love this great song", "hate it", "awful day", "hate this"]
+    targets = [[s[label] for label in SENTIMENT_LABELS] for s in [POSITIVE] * 3 + [NEGATIVE] * 3]
+    return HashedNgramModel(SENTIMENT_LABELS, n_features=2**12).fit(texts, targets, epochs=50)
+
+
+def test_model_learns_and_round_trips(tmp_path):
+    model = _trained_model()
+    probs = model.predict_proba(["love it", "hate it", ""])
+    assert probs.shape == (3, 3)
+    assert np.allclose(probs.sum(axis=1), 1.0)
+    assert probs[0].argmax() == SENTIMENT_LABELS.index("positive")
+    assert probs[1].argmax() == SENTIMENT_LABELS.index("negative")
+
+    path = tmp_path / "cascade.npz"
+    model.save(str(path))
+    loaded = HashedNgramModel.load(str(path))
+    assert loaded.labels == model.labels
+    assert np.allclose(loaded.predict_proba(["love it", "hate it"]), probs[:2])
+
+
+def test_confident_texts_skip_the_transformer(monkeypatch):
+    monkeypatch.setattr(ngram_model, "_sentiment_cascade", _trained_model())
+    monkeypatch.setattr(ngram_model, "_sentiment_cascade_loaded", True)
+    monkeypatch.setattr(sentiment_service, "SENTIMENT_CASCADE_THRESHOLD", 0.6)
+
+    escalated = []
+
+    def transformer(texts):
+        escalated.extend(texts)
+        return [sentiment_service.build_sentiment_result(NEGATIVE) for _ in texts]
+
+    service = SentimentService.__new__(SentimentService)
+    results = service._with_cascade(["love it", "the meeting is at noon", "hate it"], transformer)
+
+    assert escalated == ["the meeting is at noon"]
+    assert [r["sentiment"] for r in results] == ["positive", "negative", "negative"]
+    assert set(results[0]["scores"]) == set(SENTIMENT_LABELS)
+
+
+def test_evaluate_reports_short_circuit_rate():
+    model = _trained_model()
+    report = evaluate(
+        model, ["love it", "hate it", "zzz"], [POSITIVE, NEGATIVE, NEGATIVE], [0.0, 0.6, 1.0]
+    )
+
+    assert report[0]["short_circuited"] == 1.0
+    assert report[-1]["short_circuited"] == 0.0
+    assert report[-1]["overall_agreement"] == 1.0
+    assert report[1]["agreement_when_answered"] == 1.0
+
+
+def test_cascade_answers_are_tagged_and_expire_with_the_settings(monkeypatch):
+    monkeypatch.setattr(ngram_model, "_sentiment_cascade", _trained_model())
+    monkeypatch.setattr(ngram_model, "_sentiment_cascade_loaded", True)
+    monkeypatch.setattr(sentiment_service, "SENTIMENT_CASCADE_THRESHOLD", 0.6)
+
+    service = SentimentService.__new__(SentimentService)
+    answer = service._with_cascade(["love it"], lambda texts: [])[0]
+    cached = decode_result(encode_result(answer))
+
+    assert cached == answer and cached["source"] == "cascade"
+    assert sentiment_service.cached_sentiment_usable(cached)
+    assert sentiment_service.cached_sentiment_usable(build_sentiment_result(NEGATIVE))
+
+    monkeypatch.setattr(sentiment_service, "SENTIMENT_CASCADE_THRESHOLD", 0.9999)
+    assert not sentiment_service.cached_sentiment_usable(cached)
+
+    monkeypatch.setattr(sentiment_service, "SENTIMENT_CASCADE_THRESHOLD", 0.6)
+    monkeypatch.setattr(ngram_model, "_sentiment_cascade", None)
+    assert not sentiment_service.cached_sentiment_usable(cached)
+
+
+def test_reference_scores_skip_cascade_answers(monkeypatch):
+    cascade_answer = {**build_sentiment_result(POSITIVE), "source": "cascade"}
+
+    async def cache_get_many(keys):
+        return [build_sentiment_result(NEGATIVE), cascade_answer, None]
+
+    monkeypatch.setattr(cascade_tool, "cache_get_many", cache_get_many)
+    scores = cascade_tool.reference_scores(["a", "b", "c"])
+
+    assert scores == [NEGATIVE, None, None]
+
+
+def test_cascade_stats_are_consistent_across_threads(monkeypatch):
+    monkeypatch.setattr(ngram_model, "_sentiment_cascade", _trained_model())
+    monkeypatch.setattr(ngram_model, "_sentiment_cascade_loaded", True)
+    monkeypatch.setattr(sentiment_service, "SENTIMENT_CASCADE_THRESHOLD", 0.6)
+    before = sentiment_service.get_cascade_stats()
+
+    service = SentimentService.__new__(SentimentService)
+    texts = ["love it", "hate it", "the meeting is at noon"]
+    transformer = lambda rest: [build_sentiment_result(NEGATIVE) for _ in rest]  # noqa: E731
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: service._with_cascade(texts, transformer), range(200)))
+
+    after = sentiment_service.get_cascade_stats()
+    assert after["answered"] - before["answered"] == 400
+    assert after["escalated"] - before["escalated"] == 200
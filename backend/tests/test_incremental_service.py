@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+import spacy
+
+from app.services import aspect_service
+from app.services.incremental_service import IncrementalAnalysisService
+from app.services.risk_service import RiskDetectionService
+from tests.conftest import FakeBatchService, fake_emotion, fake_sentiment
+
+
+@pytest.fixture
+def service(monkeypatch):
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    monkeypatch.setattr(aspect_service, "nlp", nlp)
+
+    service = IncrementalAnalysisService.__new__(IncrementalAnalysisService)
+    service.sentiment_service = FakeBatchService(fake_sentiment, caching=True)
+    service.emotion_service = FakeBatchService(fake_emotion, caching=True)
+    service.risk_service = RiskDetectionService()
+    return service
+
+
+def test_only_edited_sentences_are_recomputed(service):
+    text = "A nuclear strike would be terrible. The park is lovely. We had lunch."
+    first = asyncio.run(service.analyze_document(text))
+
+    assert (first["sentences_recomputed"], first["sentences_reused"]) == (3, 0)
+
+    edited = asyncio.run(service.analyze_document(text.replace("lovely", "quiet")))
+
+    assert (edited["sentences_recomputed"], edited["sentences_reused"]) == (1, 2)
+    assert service.sentiment_service.computed_batches[-1] == ["The park is quiet."]
+    assert service.emotion_service.computed_batches[-1] == ["The park is quiet."]
+
+
+def test_document_results_aggregate_sentences(service):
+    text = "A nuclear strike would be terrible. The park is lovely."
+    result = asyncio.run(service.analyze_document(text))
+
+    first, second = result["sentences"]
+    assert text[first["start"] : first["end"]] == first["text"]
+    assert "nuclear_threat" in first["risk_flags"] and second["risk_flags"] == []
+    assert result["risk_analysis"]["flags"] == first["risk_flags"]
+    assert result["risk_analysis"]["risk_level"] in ("medium", "high")
+
+    # Length-weighted: the longer negative sentence outweighs the positive one
+    weight = len(first["text"]) / (len(first["text"]) + len(second["text"]))
+    assert result["sentiment"]["scores"]["negative"] == pytest.approx(
+        0.9 * weight + 0.1 * (1 - weight)
+    )
+    assert result["emotion"]["emotion"] == "fear"
+
+
+def test_repeated_sentences_count_once(service):
+    result = asyncio.run(service.analyze_document("Nice day. Nice day. Something new."))
+
+    assert result["total_sentences"] == 3
+    assert (result["sentences_recomputed"], result["sentences_reused"]) == (2, 1)
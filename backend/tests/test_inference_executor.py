@@ -0,0 +1,72 @@
+"""Tests for the bounded inference executor."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services.inference_executor import InferenceExecutor, InferenceQueueFullError
+
+
+@pytest.fixture
+def executor():
+    executor = InferenceExecutor(threads=1, max_queue=1)
+    yield executor
+    executor.shutdown()
+
+
+async def test_runs_work_off_the_event_loop(executor):
+    """Test that jobs run on an inference thread, not the event loop thread."""
+    thread_name = await executor.run(lambda: threading.current_thread().name)
+
+    assert thread_name.startswith("inference")
+
+
+async def test_full_queue_rejects_immediately(executor):
+    """Test that work beyond threads + queue size is refused instead of queued."""
+    release = threading.Event()
+
+    running = asyncio.ensure_future(executor.run(release.wait))
+    queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(InferenceQueueFullError):
+        await executor.run(lambda: "rejected")
+
+    release.set()
+    assert await running is True
+    assert await queued == "queued"
+
+
+async def test_event_loop_stays_responsive_during_inference(executor):
+    """Test that other coroutines progress while a job blocks its thread."""
+    release = threading.Event()
+    job = asyncio.ensure_future(executor.run(release.wait))
+
+    await asyncio.sleep(0.01)
+    assert not job.done()
+
+    release.set()
+    assert await job is True
+
+
+async def test_cancelled_callers_keep_running_jobs_counted(executor):
+    """Test that a job still blocking its thread holds its slot after its caller is cancelled."""
+    release = threading.Event()
+    running = asyncio.ensure_future(executor.run(release.wait))
+    queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+    await asyncio.sleep(0.01)
+
+    running.cancel()
+    queued.cancel()
+    await asyncio.gather(running, queued, return_exceptions=True)
+
+    # The queued job never started, so its slot is free; the running one is not
+    accepted = asyncio.ensure_future(executor.run(lambda: "accepted"))
+    await asyncio.sleep(0)
+    with pytest.raises(InferenceQueueFullError):
+        await executor.run(lambda: "rejected")
+
+    release.set()
+    assert await accepted == "accepted"
+    assert executor._outstanding == 0
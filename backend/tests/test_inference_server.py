@@ -0,0 +1,121 @@
+import asyncio
+import socketserver
+import threading
+
+import pytest
+
+from app.models.model_loader import ModelNotReadyError
+from app.services.inference_client import InferenceClient
+from app.services.inference_executor import InferenceQueueFullError
+from app.services.inference_server import InferenceServer
+
+
+async def _submit(text: str) -> dict:
+    return {"label": text.upper()}
+
+
+async def _bulk(texts: list[str]) -> list:
+    return [ValueError("bad text") if text == "bad" else {"label": text} for text in texts]
+
+
+async def _full(texts: list[str]) -> list:
+    raise InferenceQueueFullError("Inference queue is full")
+
+
+async def _loading(text: str) -> dict:
+    raise ModelNotReadyError("Sentiment model not loaded")
+
+
+async def _loading_bulk(texts: list[str]) -> list:
+    return [ModelNotReadyError("Sentiment model not loaded") for _ in texts]
+
+
+async def _slow(text: str) -> dict:
+    await asyncio.sleep(1)
+    return {"label": text}
+
+
+async def _long(text: str) -> dict:
+    return {"label": text, "windows": [{"start": 0, "end": len(text)}]}
+
+
+async def _with_server(tmp_path, check, timeout=5):
+    socket_path = str(tmp_path / "inference.sock")
+    server = InferenceServer(
+        {
+            "sentiment": (_submit, _bulk),
+            "emotion": (_submit, _full),
+            "loading": (_loading, _loading_bulk),
+            "slow": (_slow, _bulk),
+        },
+        {"sentiment": _long},
+    )
+    unix_server = await asyncio.start_unix_server(server.handle_connection, path=socket_path)
+    async with unix_server:
+        await check(InferenceClient([socket_path], timeout=timeout))
+
+
+def test_round_trip_single_and_bulk(tmp_path):
+    async def check(client):
+        assert await client.infer("sentiment", ["a", "b"]) == [{"label": "A"}, {"label": "B"}]
+        results = await client.infer("sentiment", ["ok", "bad"], bulk=True)
+        assert results[0] == {"label": "ok"}
+        assert isinstance(results[1], RuntimeError)
+
+    asyncio.run(_with_server(tmp_path, check))
+
+
+def test_long_document_mode(tmp_path):
+    async def check(client):
+        assert await client.infer("sentiment", ["abc"], long=True) == [
+            {"label": "abc", "windows": [{"start": 0, "end": 3}]}
+        ]
+        with pytest.raises(RuntimeError, match="No long-document mode"):
+            await client.infer("emotion", ["abc"], long=True)
+
+    asyncio.run(_with_server(tmp_path, check))
+
+
+def test_queue_full_is_raised_on_client(tmp_path):
+    async def check(client):
+        with pytest.raises(InferenceQueueFullError):
+            await client.infer("emotion", ["a"], bulk=True)
+
+    asyncio.run(_with_server(tmp_path, check))
+
+
+def test_unreachable_server_is_not_ready(tmp_path):
+    client = InferenceClient([str(tmp_path / "missing.sock")], timeout=1)
+    with pytest.raises(ModelNotReadyError):
+        asyncio.run(client.infer("sentiment", ["a"]))
+
+
+def test_remote_not_ready_and_slow_answers_map_to_503_errors(tmp_path):
+    async def check(client):
+        with pytest.raises(ModelNotReadyError):
+            await client.infer("loading", ["a"])
+        results = await client.infer("loading", ["a"], bulk=True)
+        assert isinstance(results[0], ModelNotReadyError)
+        with pytest.raises(InferenceQueueFullError):
+            await client.infer("slow", ["a"])
+
+    asyncio.run(_with_server(tmp_path, check, timeout=0.2))
+
+
+class _SilentHandler(socketserver.BaseRequestHandler):
+    """Reads the ping and closes the connection without answering."""
+
+    def handle(self):
+        self.request.recv(1024)
+
+
+def test_wait_until_ready_gives_up_on_a_server_that_never_answers(tmp_path):
+    socket_path = str(tmp_path / "silent.sock")
+    server = socketserver.UnixStreamServer(socket_path, _SilentHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with pytest.raises(ModelNotReadyError, match="before answering"):
+            InferenceClient([socket_path], timeout=1).wait_until_ready(deadline_seconds=0.5)
+    finally:
+        server.shutdown()
+        server.server_close()
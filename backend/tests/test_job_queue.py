@@ -0,0 +1,274 @@
+import asyncio
+import json
+import os
+import signal
+
+import pytest
+from pydantic import ValidationError
+
+from app.models.schemas import JobRequest
+from app.services import job_service, job_worker, stream_service
+from app.services.job_service import (
+    JobInputError,
+    JobNotFoundError,
+    JobQueue,
+    decode_results,
+    encode_results,
+)
+from app.services.job_worker import JobWorker
+from tests.conftest import FakeBatchService, fake_emotion, fake_sentiment
+
+
+async def _rows(texts):
+    for index, text in enumerate(texts):
+        yield index, f"row-{index}", text
+
+
+@pytest.fixture
+def services(monkeypatch):
+    sentiment = FakeBatchService(fake_sentiment)
+    emotion = FakeBatchService(fake_emotion)
+    monkeypatch.setattr(stream_service, "get_sentiment_service", lambda: sentiment)
+    monkeypatch.setattr(stream_service, "get_emotion_service", lambda: emotion)
+    return sentiment, emotion
+
+
+@pytest.fixture
+def queue(fake_redis):
+    return JobQueue(fake_redis, chunk_size=4)
+
+
+async def _drain(worker):
+    while await worker.process_next():
+        pass
+
+
+def test_job_runs_to_completion(queue, services):
+    texts = [f"text {i}" for i in range(9)] + ["  ", "I want to kill myself"]
+
+    async def run():
+        job_id = await queue.create_job(_rows(texts), include_risk=True)
+        queued = await queue.get_status(job_id)
+        await _drain(JobWorker(queue))
+        return (
+            queued,
+            await queue.get_status(job_id),
+            await queue.get_results(job_id, 2, 4),
+            [r async for r in queue.iter_results(job_id)],
+        )
+
+    queued, status, page, everything = asyncio.run(run())
+
+    assert (queued["status"], queued["chunks"], queued["total"]) == ("queued", 3, 11)
+    assert status["status"] == "completed" and status["progress"] == 1.0
+    assert (status["processed"], status["errors"]) == (10, 1)
+    assert [r["index"] for r in page] == [2, 3, 4, 5]
+    assert [r["index"] for r in everything] == list(range(11))
+    assert everything[0]["id"] == "row-0" and everything[0]["emotion"] == "joy"
+    assert "error" in everything[9]
+    assert everything[10]["risk_analysis"]["has_risk"]
+
+
+def test_failed_chunks_are_retried_then_marked_failed(queue, services, monkeypatch):
+    monkeypatch.setattr(job_service, "JOB_MAX_ATTEMPTS", 2)
+    sentiment, _ = services
+    sentiment.fail = 3
+
+    async def run():
+        job_id = await queue.create_job(_rows(["a", "b", "c"]))
+        worker = JobWorker(queue)
+        await _drain(worker)
+        failed = await queue.get_status(job_id)
+
+        assert await queue.retry_failed(job_id) == 1
+        await _drain(worker)
+        return failed, await queue.get_status(job_id)
+
+    failed, retried = asyncio.run(run())
+
+    assert failed["status"] == "failed" and failed["chunks_failed"] == 1
+    assert failed["last_error"] == "model not ready"
+    assert retried["status"] == "completed" and retried["processed"] == 3
+
+
+def test_expired_lease_is_requeued(queue, services, monkeypatch):
+    monkeypatch.setattr(job_service, "JOB_LEASE_SECONDS", -1)
+
+    async def run():
+        job_id = await queue.create_job(_rows(["a"]))
+        # A worker claims the chunk and dies before finishing it
+        assert (await queue.claim())["attempt"] == 1
+        assert await queue.claim() is None
+        assert await queue.requeue_expired() == 1
+
+        monkeypatch.setattr(job_service, "JOB_LEASE_SECONDS", 300)
+        claim = await queue.claim()
+        await queue.complete_chunk(job_id, claim["chunk"], [{"index": 0, "error": "empty"}])
+        return claim, await queue.get_status(job_id)
+
+    claim, status = asyncio.run(run())
+    assert claim["attempt"] == 2
+    assert status["status"] == "completed"
+    assert status["last_error"] == "Worker lease expired"
+
+
+def test_oversized_job_is_rejected_and_cleaned_up(queue, monkeypatch):
+    monkeypatch.setattr(job_service, "JOB_MAX_TEXTS", 5)
+
+    async def run():
+        with pytest.raises(JobInputError):
+            await queue.create_job(_rows(["x"] * 6))
+        with pytest.raises(JobInputError):
+            await queue.create_job(_rows([]))
+        with pytest.raises(JobNotFoundError):
+            await queue.get_status("missing")
+        return await queue._client.keys()
+
+    assert asyncio.run(run()) == []
+
+
+def test_results_round_trip_compactly():
+    records = [
+        {
+            "index": 0,
+            "id": 12,
+            "sentiment": "positive",
+            "scores": fake_sentiment("")["scores"],
+            "emotion": "joy",
+            "probabilities": fake_emotion("")["probabilities"],
+            "risk_analysis": {
+                "has_risk": True,
+                "risk_level": "high",
+                "risk_score": 0.9,
+                "flags": ["self_harm"],
+                "recommendations": [],
+            },
+        },
+        {"index": 1, "error": "Text cannot be empty or whitespace only"},
+    ]
+    decoded = decode_results(encode_results(records))
+
+    assert decoded[1] == records[1]
+    assert {k: v for k, v in decoded[0].items() if k != "risk_analysis"} == {
+        k: v for k, v in records[0].items() if k != "risk_analysis"
+    }
+    assert decoded[0]["risk_analysis"]["risk_level"] == "high"
+    assert decoded[0]["risk_analysis"]["recommendations"]
+
+
+def test_rows_the_model_fails_on_are_recorded_not_retried(queue, services):
+    async def run():
+        job_id = await queue.create_job(_rows(["fine", "this one is broken"]))
+        await _drain(JobWorker(queue))
+        return await queue.get_status(job_id), await queue.get_results(job_id, 0, 10)
+
+    status, results = asyncio.run(run())
+
+    assert status["status"] == "completed"
+    assert (status["processed"], status["errors"]) == (1, 1)
+    assert results[1]["error"] == "inference failed"
+
+
+def test_chunk_completed_by_a_late_worker_is_not_claimed_or_failed(queue, services, monkeypatch):
+    monkeypatch.setattr(job_service, "JOB_MAX_ATTEMPTS", 1)
+    monkeypatch.setattr(job_service, "JOB_LEASE_SECONDS", -1)
+
+    async def run():
+        job_id = await queue.create_job(_rows(["a"]))
+        slow = await queue.claim()
+        # The lease runs out, so the chunk is queued again, then the slow worker finishes
+        monkeypatch.setattr(job_service, "JOB_MAX_ATTEMPTS", 2)
+        assert await queue.requeue_expired() == 1
+        await queue.complete_chunk(job_id, slow["chunk"], [{"index": 0, "error": "empty"}])
+        claimed = await queue.claim()
+        # A release for a lease that is gone does nothing
+        await queue.fail_chunk(job_id, slow["chunk"], "too late")
+        return claimed, await queue.get_status(job_id)
+
+    claimed, status = asyncio.run(run())
+
+    assert claimed is None
+    assert status["status"] == "completed"
+    assert (status["chunks_completed"], status["chunks_failed"]) == (1, 0)
+
+
+def test_worker_stops_on_sigterm(fake_redis):
+    async def run():
+        asyncio.get_running_loop().call_later(0.05, os.kill, os.getpid(), signal.SIGTERM)
+        await asyncio.wait_for(job_worker._serve(), 5)
+
+    asyncio.run(run())
+
+
+@pytest.fixture
+def jobs_client(client, fake_redis, services):
+    return client
+
+
+def _run_workers(client):
+    client.portal.call(_drain, JobWorker(JobQueue(chunk_size=2)))
+
+
+def test_job_endpoints(jobs_client):
+    created = jobs_client.post(
+        "/api/jobs", json={"texts": ["one", "two", "three", "I want to kill myself", "five"]}
+    )
+    assert created.status_code == 202
+    job_id = created.json()["job_id"]
+    assert created.json()["status"] == "queued"
+
+    _run_workers(jobs_client)
+
+    status = jobs_client.get(f"/api/jobs/{job_id}").json()
+    assert status["status"] == "completed" and status["processed"] == 5
+
+    page = jobs_client.get(f"/api/jobs/{job_id}/results", params={"offset": 1, "limit": 2}).json()
+    assert [r["index"] for r in page["results"]] == [1, 2]
+    assert page["next_offset"] == 3
+    last = jobs_client.get(f"/api/jobs/{job_id}/results", params={"offset": 3, "limit": 2}).json()
+    assert [r["index"] for r in last["results"]] == [3, 4]
+    assert last["next_offset"] is None
+
+    streamed = jobs_client.get(f"/api/jobs/{job_id}/results/stream")
+    assert streamed.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in streamed.text.splitlines()]
+    assert [r["index"] for r in records] == list(range(5))
+
+    assert jobs_client.get("/api/jobs/missing").status_code == 404
+    assert jobs_client.get("/api/jobs/missing/results/stream").status_code == 404
+
+
+def test_job_request_limits(jobs_client):
+    too_long = "x" * (stream_service.MAX_TEXT_LENGTH + 1)
+    assert jobs_client.post("/api/jobs", json={"texts": ["fine", too_long]}).status_code == 422
+    assert jobs_client.post("/api/jobs", json={"texts": []}).status_code == 422
+    with pytest.raises(ValidationError):
+        JobRequest(texts=["x"] * (job_service.JOB_MAX_TEXTS + 1))
+
+
+def test_job_upload_and_retry(jobs_client, services, monkeypatch):
+    monkeypatch.setattr(job_service, "JOB_MAX_ATTEMPTS", 1)
+    sentiment, _ = services
+    sentiment.fail = 1
+
+    body = 'id,text\n7,"first, with a comma"\n8,second\n'
+    created = jobs_client.post("/api/jobs/upload", files={"file": ("texts.csv", body, "text/csv")})
+    assert created.status_code == 202
+    job_id = created.json()["job_id"]
+    assert created.json()["total"] == 2
+
+    _run_workers(jobs_client)
+    failed = jobs_client.get(f"/api/jobs/{job_id}").json()
+    assert failed["status"] == "failed" and failed["last_error"] == "model not ready"
+
+    retried = jobs_client.post(f"/api/jobs/{job_id}/retry")
+    assert retried.status_code == 200 and retried.json()["chunks_failed"] == 0
+
+    _run_workers(jobs_client)
+    results = jobs_client.get(f"/api/jobs/{job_id}/results").json()["results"]
+    assert [(r["id"], r["sentiment"]) for r in results] == [("7", "positive"), ("8", "positive")]
+
+    empty = jobs_client.post(
+        "/api/jobs/upload", files={"file": ("texts.csv", "text\n", "text/csv")}
+    )
+    assert empty.status_code == 400
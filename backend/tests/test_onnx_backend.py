@@ -0,0 +1,85 @@
+"""Parity tests for the ONNX Runtime inference backend."""
+
+import pytest
+import torch
+from transformers import RobertaConfig, RobertaForSequenceClassification
+
+from app.models import onnx_backend
+
+pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+
+
+@pytest.fixture
+def torch_model():
+    """A tiny randomly initialised RoBERTa classifier with sentiment labels."""
+    torch.manual_seed(0)
+    config = RobertaConfig(
+        vocab_size=100,
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        num_labels=3,
+        id2label={0: "negative", 1: "neutral", 2: "positive"},
+        label2id={"negative": 0, "neutral": 1, "positive": 2},
+    )
+    return RobertaForSequenceClassification(config).eval()
+
+
+@pytest.fixture
+def padded_batch():
+    """Token ids for three texts of different lengths, right-padded like the tokenizer."""
+    input_ids = torch.randint(3, 100, (3, 12))
+    attention_mask = torch.ones_like(input_ids)
+    for row, length in enumerate([12, 7, 3]):
+        input_ids[row, length:] = 1  # RoBERTa pad token id
+        attention_mask[row, length:] = 0
+    return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+
+@pytest.mark.parametrize("quantization", ["none", "int8"])
+def test_onnx_labels_match_torch(torch_model, padded_batch, tmp_path, monkeypatch, quantization):
+    """Test that the ONNX backend predicts the same labels as PyTorch."""
+    monkeypatch.setattr(onnx_backend, "ONNX_CACHE_DIR", tmp_path)
+
+    onnx_model = onnx_backend.load_onnx_classifier(torch_model, "test/tiny-roberta", quantization)
+    with torch.inference_mode():
+        expected = torch_model(**padded_batch).logits
+    actual = onnx_model(**padded_batch).logits
+
+    assert onnx_model.config.id2label == torch_model.config.id2label
+    assert torch.equal(actual.argmax(dim=-1), expected.argmax(dim=-1))
+    if quantization == "none":
+        assert torch.allclose(actual, expected, atol=1e-4)
+
+
+def test_exported_graph_is_reused(torch_model, padded_batch, tmp_path, monkeypatch):
+    """Test that a second load reuses the cached export and optimized graph."""
+    monkeypatch.setattr(onnx_backend, "ONNX_CACHE_DIR", tmp_path)
+
+    onnx_backend.load_onnx_classifier(torch_model, "test/tiny-roberta")
+    (cache_dir,) = {p.parent for p in tmp_path.rglob("model.onnx")}
+    cached = sorted(p.name for p in cache_dir.iterdir())
+    second = onnx_backend.load_onnx_classifier(torch_model, "test/tiny-roberta")
+
+    assert cache_dir.parent == tmp_path / "test--tiny-roberta"
+    assert cache_dir.name.endswith(f"-opset{onnx_backend.ONNX_OPSET}")
+    assert cached[0] == "model.onnx" and cached[1].startswith("model.optimized.ort-")
+    assert sorted(p.name for p in cache_dir.iterdir()) == cached
+    assert second(**padded_batch).logits.shape == (3, 3)
+
+
+def test_new_revision_or_opset_is_exported_again(torch_model, tmp_path, monkeypatch):
+    """Test that the export cache is keyed by model revision and opset."""
+    monkeypatch.setattr(onnx_backend, "ONNX_CACHE_DIR", tmp_path)
+
+    first = onnx_backend.export_onnx(torch_model, "test/tiny-roberta")
+    torch_model.config._commit_hash = "abc123"
+    second = onnx_backend.export_onnx(torch_model, "test/tiny-roberta")
+    monkeypatch.setattr(onnx_backend, "ONNX_OPSET", 15)
+    third = onnx_backend.export_onnx(torch_model, "test/tiny-roberta")
+
+    assert second.parent.name == "abc123-opset14"
+    assert third.parent.name == "abc123-opset15"
+    assert len({first, second, third}) == 3
@@ -0,0 +1,82 @@
+import asyncio
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.models.model_loader import ModelNotReadyError
+from app.services import parse_worker
+from app.services.inference_executor import InferenceQueueFullError
+from app.services.parse_pool import ParsePool, ParseQueueFullError
+
+
+class _FailingExecutor:
+    """Accepts ``accept`` submissions, then raises ``error``."""
+
+    def __init__(self, accept, error):
+        self.accept = accept
+        self.error = error
+        self.shut_down = False
+
+    def submit(self, fn, *args):
+        if self.accept == 0:
+            raise self.error
+        self.accept -= 1
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def test_rejects_work_beyond_pool_and_queue_without_starting_processes():
+    pool = ParsePool(processes=1, max_queue=1, chunk_size=2)
+    try:
+        # Six texts are three chunks; only two may be outstanding
+        with pytest.raises(ParseQueueFullError):
+            asyncio.run(pool.parse(["text"] * 6))
+        assert pool._outstanding == 0
+    finally:
+        pool.shutdown()
+
+
+def test_queue_full_maps_to_service_unavailable():
+    # Routers answer 503 for InferenceQueueFullError and its subclasses
+    assert issubclass(ParseQueueFullError, InferenceQueueFullError)
+
+
+def test_failed_submit_gives_back_its_reservation(monkeypatch):
+    monkeypatch.setattr(parse_worker, "parse_texts", lambda texts, batch_size: [])
+    pool = ParsePool(processes=1, max_queue=4, chunk_size=1)
+    pool.shutdown()
+    pool._executor = _FailingExecutor(1, RuntimeError("cannot schedule new futures"))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(pool.parse(["a", "b", "c"]))
+    assert pool._outstanding == 0
+
+
+def test_broken_pool_is_replaced():
+    pool = ParsePool(processes=1, max_queue=1)
+    pool.shutdown()
+    broken = pool._executor = _FailingExecutor(0, BrokenProcessPool("a process died"))
+    try:
+        with pytest.raises(ModelNotReadyError):
+            asyncio.run(pool.parse(["text"]))
+        assert broken.shut_down and pool._executor is not broken
+        assert pool._outstanding == 0
+    finally:
+        pool.shutdown()
+
+
+def test_spawned_pool_parses_like_in_process():
+    texts = ["The battery life is great. The screen is dim.", "Support never answered my emails."]
+    parse_worker.init_worker()
+    expected = parse_worker.parse_texts(texts, 1)
+
+    pool = ParsePool(processes=1, max_queue=1, chunk_size=1)
+    try:
+        assert asyncio.run(pool.parse(texts)) == expected
+    finally:
+        pool.shutdown()
@@ -0,0 +1,42 @@
+import pickle
+
+import spacy
+
+from app.services.parsed_document import ParsedDocument, parse_document
+
+
+def _nlp():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    return nlp
+
+
+def test_sentence_lookup_matches_spacy_sentences():
+    text = "The battery is great. The screen cracked after a week.  Support was slow!"
+    doc = _nlp()(text)
+    document = parse_document(_nlp(), text)
+
+    for offset in range(len(text) + 1):
+        expected = next(
+            (s.text for s in doc.sents if s.start_char <= offset <= s.end_char),
+            None,
+        )
+        assert document.sentence_at(offset) == expected
+
+
+def test_pipeline_without_parser_has_no_noun_chunks():
+    document = parse_document(_nlp(), "Great food. Terrible service.")
+
+    assert document.noun_chunks == []
+    assert document.sentence_starts == [0, 12]
+
+
+def test_document_is_plain_data():
+    document = ParsedDocument(
+        text="Apple ships.",
+        entities=[("Apple", "ORG", 0, 5)],
+        sentence_starts=[0],
+        sentence_ends=[12],
+    )
+
+    assert pickle.loads(pickle.dumps(document)) == document
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from app.services.job_service import JobQueue
+from app.utils import redis_client
+from app.utils.redis_client import CircuitBreaker, RedisUnavailableError, call_redis
+
+
+def test_breaker_opens_after_threshold_and_probes_after_reset():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    # reset_seconds=0: the next call is let through as a half-open probe
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.status() == {"state": "closed", "consecutive_failures": 0}
+
+
+def test_open_breaker_rejects_without_calling_redis(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    monkeypatch.setattr(redis_client, "redis_breaker", breaker)
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        raise RedisConnectionError("connection refused")
+
+    with pytest.raises(RedisUnavailableError):
+        asyncio.run(call_redis(failing))
+    with pytest.raises(RedisUnavailableError):
+        asyncio.run(call_redis(failing))
+
+    assert len(calls) == 1
+    assert breaker.state == "open"
+
+
+def test_exhausted_pool_is_not_a_breaker_failure(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    monkeypatch.setattr(redis_client, "redis_breaker", breaker)
+
+    async def exhausted():
+        raise RedisConnectionError("No connection available.")
+
+    for _ in range(3):
+        with pytest.raises(RedisUnavailableError):
+            asyncio.run(call_redis(exhausted))
+
+    assert breaker.status() == {"state": "closed", "consecutive_failures": 0}
+
+
+def test_clients_wait_briefly_for_a_pooled_connection():
+    client = redis_client._create_client(decode_responses=True)
+    pool = client.connection_pool
+
+    assert pool.max_connections == redis_client.REDIS_MAX_CONNECTIONS
+    assert pool.timeout == redis_client.REDIS_POOL_TIMEOUT
+
+
+def test_job_queue_failures_stay_off_the_cache_breaker(monkeypatch):
+    cache_breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    job_breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    monkeypatch.setattr(redis_client, "redis_breaker", cache_breaker)
+    monkeypatch.setattr(redis_client, "job_redis_breaker", job_breaker)
+
+    class _SlowRedis:
+        async def hgetall(self, key):
+            raise RedisTimeoutError("Timeout reading from socket")
+
+    with pytest.raises(RedisUnavailableError):
+        asyncio.run(JobQueue(_SlowRedis()).get_status("job"))
+
+    assert job_breaker.state == "open"
+    assert cache_breaker.state == "closed"
+
+
+def test_job_client_has_looser_timeouts(monkeypatch):
+    monkeypatch.setattr(redis_client, "_job_redis_client", None)
+    monkeypatch.setattr(redis_client, "_redis_client", None)
+    client = asyncio.run(redis_client.get_job_redis_client())
+    kwargs = client.connection_pool.connection_kwargs
+
+    assert kwargs["socket_timeout"] == redis_client.JOB_REDIS_SOCKET_TIMEOUT
+    assert redis_client.JOB_REDIS_SOCKET_TIMEOUT > redis_client.REDIS_SOCKET_TIMEOUT
+    assert client is not asyncio.run(redis_client.get_redis_client())
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+import torch
+
+from app.utils.result_codec import decode_result, encode_result
+
+
+def _float32(values):
+    return torch.tensor(values, dtype=torch.float32).tolist()
+
+
+def test_sentiment_round_trip_is_exact_and_compact():
+    positive, neutral, negative = _float32([0.81, 0.12, 0.07])
+    scores = {"positive": positive, "neutral": neutral, "negative": negative}
+    result = {
+        "sentiment": "positive",
+        "scores": scores,
+        "confidence": positive,
+        "probabilities": dict(scores),
+    }
+
+    payload = encode_result(result)
+
+    assert decode_result(payload) == result
+    assert len(payload) * 5 < len(json.dumps(result))
+
+
+def test_emotion_round_trip_is_exact():
+    labels = ["anger", "disgust", "fear", "joy", "neutral", "sadness", "surprise"]
+    probabilities = dict(zip(labels, _float32([0.05, 0.05, 0.1, 0.6, 0.1, 0.05, 0.05])))
+    result = {"emotion": "joy", "probabilities": probabilities}
+
+    assert decode_result(encode_result(result)) == result
+
+
+def test_other_results_fall_back_to_json():
+    result = {"emotion": "LABEL_3", "probabilities": {"LABEL_3": 1.0}}
+    assert decode_result(encode_result(result)) == result
+
+
+def test_results_with_extra_fields_keep_them():
+    labels = ["anger", "disgust", "fear", "joy", "neutral", "sadness", "surprise"]
+    probabilities = dict(zip(labels, _float32([0.05, 0.05, 0.1, 0.6, 0.1, 0.05, 0.05])))
+    result = {"emotion": "joy", "probabilities": probabilities, "windows": [{"start": 0}]}
+
+    assert decode_result(encode_result(result)) == result
+
+
+def test_unknown_version_is_rejected():
+    with pytest.raises(ValueError):
+        decode_result(b"\x09\x00{}")
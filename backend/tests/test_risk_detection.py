@@ -146,3 +146,29 @@ def test_sentiment_score_modifier(risk_service):
 
     # High negative confidence should add to risk score
     assert result["risk_score"] > 0.2
+
+
+def test_batch_matches_single_detection(risk_service):
+    """Test that batch scoring gives the same results as per-text detection."""
+    texts = [
+        "The nuclear threshold has been met according to intelligence reports.",
+        "I feel hopeless and worthless, everything is terrible and awful.",
+        "Those people are vermin and should be eliminated.",
+        "The meeting is scheduled for tomorrow at 3 PM.",
+    ]
+    cases = [
+        (text, sentiment, emotion, scores)
+        for text in texts
+        for sentiment in ["positive", "neutral", "negative"]
+        for emotion in ["anger", "disgust", "sadness", "joy"]
+        for scores in [None, {"negative": 0.65}, {"negative": 0.75}, {"negative": 0.9}]
+    ]
+
+    results = risk_service.detect_risks_batch(*(list(column) for column in zip(*cases)))
+
+    assert results == [risk_service.detect_risks(*case) for case in cases]
+
+
+def test_batch_empty(risk_service):
+    """Test that an empty batch returns no results."""
+    assert risk_service.detect_risks_batch([], [], []) == []
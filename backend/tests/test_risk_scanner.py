@@ -0,0 +1,70 @@
+"""Tests for the literal prefilter in front of the risk patterns."""
+
+import pytest
+
+from app.services import risk_service
+from app.services.risk_service import RiskDetectionService, pattern_prefixes
+from app.tools.risk_benchmark import RISK_CORPUS, compare
+
+
+@pytest.fixture(scope="module")
+def services():
+    return RiskDetectionService(prefilter=False), RiskDetectionService()
+
+
+def test_pattern_prefixes():
+    assert pattern_prefixes(r"\bnuclear\b") == {"nuclear"}
+    assert pattern_prefixes(r"\b(nukes?|h-bomb)\b") == {"nuke", "h-bomb"}
+    assert pattern_prefixes(r"\b(kill|hurt) (you|them)") == {
+        "kill you",
+        "kill them",
+        "hurt you",
+        "hurt them",
+    }
+    assert pattern_prefixes(r"\bWar\b") == {"war"}
+    # Nothing literal to require
+    assert pattern_prefixes(r"\w+ threat") is None
+    assert pattern_prefixes(r"(a|\w)bc") is None
+
+
+def test_every_risk_pattern_has_a_prefix(services):
+    _, prefiltered = services
+    for category, prefixes in prefiltered.pattern_prefixes.items():
+        assert all(p is not None for p in prefixes), category
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        *RISK_CORPUS,
+        "",
+        "NUCLEAR WAR IS COMING, I WANT TO KILL MYSELF",
+        "Nuclear\nstrike\tplanned",
+        # Dotless i and long s match ASCII letters under IGNORECASE
+        "the nucleı threat, kıll them all",
+        "ſuicide and ſelf harm",
+    ],
+)
+def test_prefilter_matches_full_scan(services, text):
+    full, prefiltered = services
+    text_lower = text.lower()
+    assert prefiltered.count_matches(text_lower) == full.count_matches(text_lower)
+    for emotion in ["anger", "disgust", "fear", "sadness", "joy"]:
+        assert prefiltered.detect_risks(text, "negative", emotion) == full.detect_risks(
+            text, "negative", emotion
+        )
+
+
+def test_scans_every_pattern_without_the_regex_parser(services, monkeypatch):
+    full, _ = services
+    monkeypatch.setattr(risk_service, "sre_parse", None)
+    unparsed = RiskDetectionService()
+
+    assert all(p is None for prefixes in unparsed.pattern_prefixes.values() for p in prefixes)
+    text_lower = "nuclear war is coming, i want to kill myself"
+    assert unparsed.count_matches(text_lower) == full.count_matches(text_lower)
+
+
+def test_benchmark_reports_no_mismatches():
+    report = compare(RISK_CORPUS[:5], repeats=1)
+    assert report["mismatches"] == 0
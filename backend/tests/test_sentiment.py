@@ -42,3 +42,45 @@ def test_analyze_sentiment_whitespace_only(client):
 def test_analyze_sentiment_missing_field(client):
     response = client.post("/api/analyze", json={})
     assert response.status_code == 422
+
+
+def test_readiness_reports_components(client):
+    response = client.get("/readiness")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] in ["ready", "not_ready"]
+    assert set(data["components"]) == {"sentiment", "emotion", "spacy"}
+    for component in data["components"].values():
+        assert component["state"] in ["pending", "loading", "warming", "ready", "failed"]
+
+
+def test_bulk_with_risk(client, monkeypatch):
+    from app.routers import sentiment as sentiment_router
+
+    class _FakeService:
+        def __init__(self, result):
+            self.result = result
+
+        async def analyze_batch(self, texts):
+            return [self.result if text != "broken" else RuntimeError("x") for text in texts]
+
+    sentiment = {
+        "sentiment": "negative",
+        "scores": {"positive": 0.05, "neutral": 0.05, "negative": 0.9},
+    }
+    emotion = {"emotion": "fear", "probabilities": {"fear": 1.0}}
+    monkeypatch.setattr(sentiment_router, "get_sentiment_service", lambda: _FakeService(sentiment))
+    monkeypatch.setattr(sentiment_router, "get_emotion_service", lambda: _FakeService(emotion))
+
+    texts = ["A nuclear strike is being prepared.", "broken", "Nuclear war and a bomb threat."]
+    response = client.post("/api/analysis/bulk", json={"texts": texts, "include_risk": True})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["successful"] == 2 and data["failed"] == 1
+    assert all("nuclear_threat" in item["risk_analysis"]["flags"] for item in data["results"])
+    assert data["flag_counts"]["nuclear_threat"] == 2
+
+    response = client.post("/api/analysis/bulk", json={"texts": texts[:1]})
+    assert response.json()["flag_counts"] is None
+    assert response.json()["results"][0]["risk_analysis"] is None
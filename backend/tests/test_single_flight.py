@@ -0,0 +1,203 @@
+import asyncio
+
+from app.services.batching import analyze_cached_batch
+from app.utils import cache, single_flight
+from app.utils.redis_client import get_binary_redis_client
+from app.utils.result_codec import encode_result
+
+
+def test_concurrent_identical_requests_compute_once(monkeypatch):
+    calls = []
+
+    async def fake_across_workers(keys, compute_owned, usable=None, computed=None):
+        return await compute_owned(keys)
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"sentiment": "positive"}
+
+    monkeypatch.setattr(single_flight, "_compute_across_workers", fake_across_workers)
+
+    async def run():
+        return await asyncio.gather(
+            *(single_flight.compute_once("sentiment:v4:abc", compute) for _ in range(10))
+        )
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(result == {"sentiment": "positive"} for result in results)
+    assert not single_flight._inflight
+
+
+def test_batch_follows_in_flight_keys_and_keeps_failures(monkeypatch):
+    batches = []
+
+    async def fake_across_workers(keys, compute_owned, usable=None, computed=None):
+        return await compute_owned(keys)
+
+    async def compute_single():
+        await asyncio.sleep(0.01)
+        return {"label": "single"}
+
+    async def compute_batch(texts):
+        batches.append(texts)
+        return [ValueError("bad") if text == "bad" else {"label": text} for text in texts]
+
+    monkeypatch.setattr(single_flight, "_compute_across_workers", fake_across_workers)
+
+    async def run():
+        single = asyncio.ensure_future(single_flight.compute_once("k1", compute_single))
+        await asyncio.sleep(0)
+        batch = await single_flight.compute_many_once(
+            {"k1": "one", "k2": "two", "k3": "bad"}, compute_batch
+        )
+        return await single, batch
+
+    single, batch = asyncio.run(run())
+
+    assert batches == [["two", "bad"]]
+    assert single == batch["k1"] == {"label": "single"}
+    assert batch["k2"] == {"label": "two"}
+    assert isinstance(batch["k3"], ValueError)
+
+
+def test_worker_waits_for_the_lease_holder_without_counting_misses(fake_redis, monkeypatch):
+    monkeypatch.setattr(single_flight, "SINGLE_FLIGHT_POLL_MS", 1)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"label": "mine"}
+
+    async def other_worker():
+        # Holds the lease, then publishes its result and releases
+        await asyncio.sleep(0.05)
+        binary_client = await get_binary_redis_client()
+        await binary_client.set("k1", encode_result({"label": "theirs"}))
+        await fake_redis.delete("inflight:k1")
+
+    async def run():
+        await fake_redis.set("inflight:k1", "other-token")
+        misses = cache.get_cache_stats()["redis"]["misses"]
+        polls = single_flight.get_single_flight_stats()["poll_reads"]
+        result, _ = await asyncio.gather(single_flight.compute_once("k1", compute), other_worker())
+        return (
+            result,
+            cache.get_cache_stats()["redis"]["misses"] - misses,
+            single_flight.get_single_flight_stats()["poll_reads"] - polls,
+        )
+
+    result, misses, polls = asyncio.run(run())
+
+    assert result == {"label": "theirs"}
+    assert not calls
+    assert misses == 0 and polls > 0
+
+
+def test_cached_batch_waits_for_another_workers_lease(fake_redis, monkeypatch):
+    monkeypatch.setattr(single_flight, "SINGLE_FLIGHT_POLL_MS", 1)
+    batches = []
+
+    async def compute_batch(texts):
+        batches.append(texts)
+        return [{"label": "mine", "fresh": True} for _ in texts]
+
+    async def other_worker():
+        await asyncio.sleep(0.05)
+        binary_client = await get_binary_redis_client()
+        await binary_client.set("test:a", encode_result({"label": "theirs", "fresh": True}))
+        await fake_redis.delete("inflight:test:a")
+
+    async def run():
+        # A stale entry is left at the key while the other worker recomputes it
+        binary_client = await get_binary_redis_client()
+        await binary_client.set("test:a", encode_result({"label": "stale"}))
+        await fake_redis.set("inflight:test:a", "other-token")
+        computed = set()
+        results, _ = await asyncio.gather(
+            analyze_cached_batch(
+                ["a", "b"],
+                lambda t: f"test:{t}",
+                compute_batch,
+                computed,
+                usable=lambda r: r.get("fresh", False),
+            ),
+            other_worker(),
+        )
+        return results, computed, await fake_redis.keys("inflight:*")
+
+    results, computed, leases = asyncio.run(run())
+
+    assert batches == [["b"]]
+    assert results == [{"label": "theirs", "fresh": True}, {"label": "mine", "fresh": True}]
+    assert computed == {1}
+    assert leases == []
+
+
+def test_leases_are_batched_and_released_by_token(fake_redis):
+    async def run():
+        await fake_redis.set("inflight:taken", "other-token")
+        acquired = await single_flight._acquire(fake_redis, ["free", "taken"], "mine")
+        # Only the lease that still carries our token is deleted
+        await single_flight._release(fake_redis, ["free", "taken"], "mine")
+        return (
+            acquired,
+            await fake_redis.get("inflight:free"),
+            await fake_redis.get("inflight:taken"),
+        )
+
+    acquired, free, taken = asyncio.run(run())
+
+    assert acquired == [True, False]
+    assert free is None
+    assert taken == "other-token"
+
+
+def test_computed_results_are_cached_and_leases_released(fake_redis):
+    async def compute(label):
+        return {"label": label}
+
+    async def run():
+        results = await single_flight.compute_once_many(
+            {"k1": lambda: compute("one"), "k2": lambda: compute("two")}
+        )
+        cache._local_cache.clear()
+        return (
+            results,
+            await cache.cache_get_many(["k1", "k2"]),
+            await fake_redis.keys("inflight:*"),
+        )
+
+    results, cached, leases = asyncio.run(run())
+
+    assert results == {"k1": {"label": "one"}, "k2": {"label": "two"}}
+    assert cached == [{"label": "one"}, {"label": "two"}]
+    assert leases == []
+
+
+def test_follower_takes_over_from_a_cancelled_leader(fake_redis):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"label": "done"}
+
+    async def run():
+        leader = asyncio.ensure_future(single_flight.compute_once("k1", compute))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(single_flight.compute_once("k1", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        result = await follower
+        return leader.cancelled(), result, await fake_redis.keys("inflight:*")
+
+    leader_cancelled, result, leases = asyncio.run(run())
+
+    assert leader_cancelled
+    assert result == {"label": "done"}
+    assert len(calls) == 2
+    assert leases == []
+    assert not single_flight._inflight
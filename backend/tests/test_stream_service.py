@@ -0,0 +1,180 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app.services.stream_service import (
+    StreamAnalyzer,
+    parse_csv,
+    parse_ndjson,
+    read_lines,
+    stream_batches,
+)
+from app.utils.streaming import BodyStreamingResponse
+from tests.conftest import FakeBatchService, fake_emotion, fake_sentiment
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def _collect(iterator):
+    return [item async for item in iterator]
+
+
+async def _items(n):
+    for i in range(n):
+        yield i, None, f"text {i}"
+
+
+def _analyzer(**kwargs):
+    analyzer = StreamAnalyzer.__new__(StreamAnalyzer)
+    analyzer.include_risk = kwargs.get("include_risk", False)
+    analyzer.raise_errors = kwargs.get("raise_errors", False)
+    analyzer.batch_size = kwargs.get("batch_size", 2)
+    analyzer.max_in_flight = kwargs.get("max_in_flight", 2)
+    analyzer.sentiment_service = FakeBatchService(fake_sentiment)
+    analyzer.emotion_service = FakeBatchService(fake_emotion)
+    return analyzer
+
+
+def test_lines_split_across_chunks():
+    lines = asyncio.run(_collect(read_lines(_chunks(b'{"text": "a', b'b"}\n"cd"\r\n', b'"e"'))))
+
+    assert lines == ['{"text": "ab"}', '"cd"', '"e"']
+
+
+def test_overlong_lines_become_errors():
+    chunks = _chunks(b'"short"\n"', b"x" * 9, b'"\n', b"y" * 20, b'\n"ok"\n', b"z" * 11)
+    lines = asyncio.run(_collect(read_lines(chunks, max_line_bytes=10)))
+
+    assert lines[0] == '"short"' and lines[3] == '"ok"'
+    assert all(isinstance(line, ValueError) for line in (lines[1], lines[2], lines[4]))
+    assert len(lines) == 5
+
+
+def test_ndjson_rows():
+    lines = _chunks(b'{"text": "first", "id": 7}\n\n"second"\nnot json\n{"body": "x"}\n')
+    items = asyncio.run(_collect(parse_ndjson(read_lines(lines))))
+
+    assert items[:2] == [(0, 7, "first"), (1, None, "second")]
+    assert [index for index, _, _ in items[2:]] == [2, 3]
+    assert all(isinstance(error, ValueError) for _, _, error in items[2:])
+
+
+def test_csv_rows_with_quoted_newlines():
+    body = b'id,text\n1,plain\n2,"two\nlines, with a comma"\n3,"say ""hi"""\n'
+    items = asyncio.run(_collect(parse_csv(read_lines(_chunks(body)))))
+
+    assert items == [
+        (0, "1", "plain"),
+        (1, "2", "two\nlines, with a comma"),
+        (2, "3", 'say "hi"'),
+    ]
+
+
+def test_in_flight_window_bounds_concurrency():
+    running = 0
+    peak = 0
+
+    async def process(batch):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        # Later batches finish first
+        await asyncio.sleep(0.01 / (batch[0][0] + 1))
+        running -= 1
+        return [{"index": index} for index, _, _ in batch]
+
+    async def run(ordered):
+        return await _collect(stream_batches(_items(20), process, 3, 2, ordered))
+
+    ordered = asyncio.run(run(True))
+    assert [r["index"] for r in ordered] == list(range(20))
+    assert peak == 2
+
+    unordered = asyncio.run(run(False))
+    assert sorted(r["index"] for r in unordered) == list(range(20))
+    assert [r["index"] for r in unordered] != list(range(20))
+
+
+def test_input_is_pulled_only_while_the_window_has_room():
+    pulled = []
+    release = asyncio.Event()
+
+    async def items():
+        for i in range(10):
+            pulled.append(i)
+            yield i, None, str(i)
+
+    async def process(batch):
+        await release.wait()
+        return [{"index": index} for index, _, _ in batch]
+
+    async def run():
+        stream = stream_batches(items(), process, 2, 2)
+        first = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.01)
+        # Two batches in flight and the next one is being held back
+        assert len(pulled) == 4
+        release.set()
+        return [await first] + await _collect(stream)
+
+    records = asyncio.run(run())
+    assert [r["index"] for r in records] == list(range(10))
+
+
+def test_analyzer_records_results_and_errors():
+    analyzer = _analyzer(include_risk=True)
+    items = _chunks(
+        (0, "a", "A lovely day"),
+        (1, None, "   "),
+        (2, None, "this one is broken"),
+        (3, None, ValueError("bad row")),
+        (4, None, "I want to kill myself"),
+    )
+    records = asyncio.run(_collect(analyzer.analyze(items)))
+
+    assert [r["index"] for r in records] == [0, 1, 2, 3, 4]
+    assert records[0]["id"] == "a"
+    assert records[0]["sentiment"] == "positive" and records[0]["emotion"] == "joy"
+    assert "error" in records[1] and "error" in records[3]
+    assert records[2]["error"] == "inference failed"
+    assert records[4]["risk_analysis"]["has_risk"]
+    # Blank and unreadable rows never reach the models
+    assert sum(len(batch) for batch in analyzer.sentiment_service.batches) == 3
+
+
+def test_body_streaming_response_reads_the_whole_body():
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        async def lines(body):
+            async for line in read_lines(body):
+                yield line.upper() + "\n"
+
+        return BodyStreamingResponse(request, lines, media_type="text/plain")
+
+    async def body():
+        for i in range(50):
+            yield f"line {i}\n".encode()
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/echo", content=body())
+
+    response = asyncio.run(run())
+    assert response.text.splitlines() == [f"LINE {i}" for i in range(50)]
+
+
+def test_csv_unterminated_quotes_become_errors():
+    body = b'text\n"never closed\nswallowed\nstill swallowed\nafter\n"dangling\n'
+    items = asyncio.run(_collect(parse_csv(read_lines(_chunks(body)), max_record_chars=30)))
+
+    assert [index for index, _, _ in items] == [0, 1, 2]
+    assert isinstance(items[0][2], ValueError)
+    assert items[1] == (1, None, "after")
+    assert "Unterminated" in str(items[2][2])
@@ -1,11 +1,17 @@
 import { useState } from 'react';
-import type { SentimentResponse, EmotionResponse, AspectAnalysisResponse } from '../types';
+import type {
+  SentimentResponse,
+  EmotionResponse,
+  AspectAnalysisResponse,
+  EmotionalArcResponse,
+} from '../types';
 
 interface AdvancedInsightsPanelProps {
   text: string;
   sentiment: SentimentResponse;
   emotion: EmotionResponse;
   aspects: AspectAnalysisResponse;
+  arc?: EmotionalArcResponse | null;
 }
 
 export default function AdvancedInsightsPanel({
@@ -13,17 +19,12 @@ export default function AdvancedInsightsPanel({
   sentiment,
   emotion,
   aspects,
+  arc,
 }: AdvancedInsightsPanelProps): JSX.Element {
   const [expandedSection, setExpandedSection] = useState<string | null>('emotional-arc');
 
-  // Calculate emotional arc (simplified - emotion intensity over sentences)
-  const sentences = text.split(/[.!?]+/).filter(s => s.trim().length > 0);
-  const emotionalArc = sentences.map((_, idx) => {
-    // Simplified: assume emotion intensity varies slightly across sentences
-    const baseIntensity = Math.max(...Object.values(emotion.probabilities));
-    const variation = Math.sin((idx / sentences.length) * Math.PI * 2) * 0.1;
-    return Math.max(0, Math.min(1, baseIntensity + variation));
-  });
+  // Emotional arc: dominant emotion of each sentence, scored by the backend
+  const arcSentences = arc?.sentences ?? [];
 
   // Derive rhetorical intent (heuristic-based)
   const lowerText = text.toLowerCase();
@@ -67,19 +68,25 @@ export default function AdvancedInsightsPanel({
         </button>
         {expandedSection === 'emotional-arc' && (
           <div className="px-4 pb-4 border-t border-gray-600">
-            <div className="mt-4 h-32 flex items-end gap-1">
-              {emotionalArc.map((intensity, idx) => (
-                <div
-                  key={idx}
-                  className="flex-1 bg-gradient-to-t from-blue-500 to-purple-500 rounded-t transition-all duration-300"
-                  style={{ height: `${intensity * 100}%` }}
-                  title={`Sentence ${idx + 1}: ${(intensity * 100).toFixed(0)}%`}
-                />
-              ))}
-            </div>
-            <p className="text-xs text-gray-400 mt-2">
-              Emotion intensity progression across {sentences.length} sentence{sentences.length !== 1 ? 's' : ''}
-            </p>
+            {arcSentences.length > 0 ? (
+              <>
+                <div className="mt-4 h-32 flex items-end gap-1">
+                  {arcSentences.map((sentence) => (
+                    <div
+                      key={sentence.index}
+                      className="flex-1 bg-gradient-to-t from-blue-500 to-purple-500 rounded-t transition-all duration-300"
+                      style={{ height: `${sentence.intensity * 100}%` }}
+                      title={`Sentence ${sentence.index + 1} (${sentence.emotion}, ${(sentence.intensity * 100).toFixed(0)}%): ${sentence.text}`}
+                    />
+                  ))}
+                </div>
+                <p className="text-xs text-gray-400 mt-2">
+                  Dominant emotion across {arcSentences.length} sentence{arcSentences.length !== 1 ? 's' : ''}
+                </p>
+              </>
+            ) : (
+              <p className="text-sm text-gray-400 mt-4">Emotional arc is unavailable for this text.</p>
+            )}
           </div>
         )}
       </div>
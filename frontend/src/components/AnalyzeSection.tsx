@@ -1,5 +1,5 @@
 import { useState, FormEvent } from 'react';
-import { analyzeSentiment, analyzeEmotion, analyzeAspects, fetchUrlContent } from '../services/api';
+import { analyzeSentiment, analyzeEmotion, analyzeAspects, analyzeArc, fetchUrlContent } from '../services/api';
 import type { ComprehensiveAnalysis } from '../types';
 import EmotionSpectrum from './EmotionSpectrum';
 import AspectSummary from './AspectSummary';
@@ -92,10 +92,12 @@ export default function AnalyzeSection({ onAnalysisComplete, onError }: AnalyzeS
     try {
       // For single text, analyze everything
       if (texts.length === 1) {
-        const [sentiment, emotion, aspects] = await Promise.all([
+        const [sentiment, emotion, aspects, arc] = await Promise.all([
           analyzeSentiment(texts[0]),
           analyzeEmotion(texts[0]),
           analyzeAspects(texts[0]),
+          // The arc is optional; the rest of the analysis is still shown without it
+          analyzeArc(texts[0]).catch(() => null),
         ]);
 
         const comprehensive: ComprehensiveAnalysis = {
@@ -103,6 +105,7 @@ export default function AnalyzeSection({ onAnalysisComplete, onError }: AnalyzeS
           sentiment,
           emotion,
           aspects,
+          arc,
           timestamp: Date.now(),
         };
 
@@ -110,10 +113,11 @@ export default function AnalyzeSection({ onAnalysisComplete, onError }: AnalyzeS
         onAnalysisComplete(comprehensive);
       } else {
         // For batch, analyze first text comprehensively, others with sentiment+emotion
-        const [firstSentiment, firstEmotion, firstAspects] = await Promise.all([
+        const [firstSentiment, firstEmotion, firstAspects, firstArc] = await Promise.all([
           analyzeSentiment(texts[0]),
           analyzeEmotion(texts[0]),
           analyzeAspects(texts[0]),
+          analyzeArc(texts[0]).catch(() => null),
         ]);
 
         const comprehensive: ComprehensiveAnalysis = {
@@ -122,6 +126,7 @@ export default function AnalyzeSection({ onAnalysisComplete, onError }: AnalyzeS
           sentiment: firstSentiment,
           emotion: firstEmotion,
           aspects: firstAspects,
+          arc: firstArc,
           timestamp: Date.now(),
         };
 
@@ -275,6 +280,7 @@ export default function AnalyzeSection({ onAnalysisComplete, onError }: AnalyzeS
                 sentiment={analysis.sentiment}
                 emotion={analysis.emotion}
                 aspects={analysis.aspects}
+                arc={analysis.arc}
               />
             </div>
           </div>
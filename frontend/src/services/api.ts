@@ -7,6 +7,7 @@ import type {
   BulkAnalysisRequest,
   BulkAnalysisResponse,
   AspectAnalysisResponse,
+  EmotionalArcResponse,
   ApiError,
 } from '../types';
 
@@ -99,6 +100,25 @@ export const analyzeAspects = async (
   }
 };
 
+export const analyzeArc = async (
+  text: string
+): Promise<EmotionalArcResponse> => {
+  try {
+    const response = await api.post<EmotionalArcResponse>('/analysis/arc', {
+      text,
+    } as SentimentRequest);
+    return response.data;
+  } catch (error) {
+    if (axios.isAxiosError(error)) {
+      const axiosError = error as AxiosError<ApiError>;
+      throw new Error(
+        axiosError.response?.data?.detail || 'Failed to analyze emotional arc'
+      );
+    }
+    throw error;
+  }
+};
+
 export interface UrlFetchResponse {
   url: string;
   text: string;
@@ -112,6 +112,24 @@ export interface AspectAnalysisResponse {
   total_aspects: number;
 }
 
+export interface ArcSentence {
+  index: number;
+  text: string;
+  start: number;
+  end: number;
+  emotion: string;
+  probabilities: EmotionResponse['probabilities'];
+  intensity: number;
+  sentiment: 'positive' | 'negative' | 'neutral' | null;
+  sentiment_scores: SentimentResponse['scores'] | null;
+}
+
+export interface EmotionalArcResponse {
+  text: string;
+  sentences: ArcSentence[];
+  total_sentences: number;
+}
+
 // Enhanced analysis result combining all analyses
 export interface ComprehensiveAnalysis {
   text: string;
@@ -119,6 +137,7 @@ export interface ComprehensiveAnalysis {
   sentiment: SentimentResponse;
   emotion: EmotionResponse;
   aspects: AspectAnalysisResponse;
+  arc?: EmotionalArcResponse | null;
   timestamp: number;
 }
 